@@ -42,33 +42,47 @@ Resources:
 python 3.9 documentation: https://docs.python.org/3.9/
 pygame documentation: https://www.pygame.org/docs/
 """
-from modules.gui import GUI
-from modules.gui import colours
-from modules.input import InputHandler
-from modules.playfield import Playfield
-from modules.timer import Timer
+import argparse
+import sys
+import time
+from functools import partial
 
-import pygame
 
-
-def main():
+def main(playfield_width: int = 20, playfield_height: int = 20):
     """
     Initiate Conway's Game Of Life (GoL).
 
     Proxy to the game logic.
     """
+    # pygame is only pulled in for the interactive game, the headless runner must not import it
+    import pygame
+    from modules.gui import GUI, Label
+    from modules.gui import colours
+    from modules.input import IDLE_TIMEOUT, InputHandler
+    from modules.playfield import Playfield
+    from modules.simulation import get_engine
+    from modules.stepper import SimulationThread
+    from modules.timer import Timer
+
     # define window size and initialize GUI class
     window_size = window_width, window_height = 1280, 840
     gui = GUI("Conway's Game Of Life", window_size, 60)
 
     # setup playfield to with and height given
-    playfield_size = playfield_width, playfield_height = 20, 20
-    playfield = Playfield(playfield_size, window_size)
+    playfield = Playfield((playfield_width, playfield_height), window_size)
+    viewport = playfield.viewport
 
     # initialize the handler for input and the timer
     timer = Timer()
     handler = InputHandler()
 
+    # the background worker steps the playfield in continuous run mode, independent of the frame rate
+    stepper = SimulationThread(playfield.field,
+                               partial(get_engine(playfield.engine), rule=playfield.rule, boundary=playfield.boundary),
+                               generations_per_second=30)
+    stepper.start()
+    generation = 0
+
     # define UI buttons
     button_list = [gui.add_button('Clear',
                                   colours.white,
@@ -78,6 +92,10 @@ def main():
                                   colours.white,
                                   window_height + 10, 110,
                                   hover_colour=colours.medium_grey),
+                   gui.add_button('Run / Pause',
+                                  colours.white,
+                                  window_height + 10, 160,
+                                  hover_colour=colours.medium_grey),
                    gui.add_button('x +',
                                   colours.white,
                                   window_height + 10, 210, 60,
@@ -93,22 +111,63 @@ def main():
                    gui.add_button('y -',
                                   colours.white,
                                   window_width - 70, 260, 60,
+                                  hover_colour=colours.medium_grey),
+                   gui.add_button('Profile CSV',
+                                  colours.white,
+                                  window_height + 10, 510,
+                                  hover_colour=colours.medium_grey),
+                   gui.add_button('Fit view',
+                                  colours.white,
+                                  window_height + 10, 560,
                                   hover_colour=colours.medium_grey)]
 
+    # labels of the readouts, each one only drawn again when its text changed
+    size_label = Label(gui, colours.white, window_height + 80, 210, 280, 90)
+    fps_label = Label(gui, colours.white, window_height + 10, 10)
+    generation_label = Label(gui, colours.white, window_height + 10, 310)
+    frame_label = Label(gui, colours.white, window_height + 10, 360)
+    phase_label = Label(gui, colours.white, window_height + 10, 410)
+    ui_label = Label(gui, colours.white, window_height + 10, 460)
+    # buttons drawn hovered last frame, they are only drawn again when that changes
+    hovered = None
+
+    # keys panning the view by a quarter of its size and zooming it
+    pan_keys = {pygame.K_LEFT: (1, 0), pygame.K_RIGHT: (-1, 0), pygame.K_UP: (0, 1), pygame.K_DOWN: (0, -1)}
+    zoom_keys = {pygame.K_PLUS: 1, pygame.K_EQUALS: 1, pygame.K_KP_PLUS: 1, pygame.K_MINUS: -1, pygame.K_KP_MINUS: -1}
+
+    # the first frame draws the whole window
+    full_redraw = True
+    # something changed since the last frame drawn, kept until a frame is drawn as slow frames skip drawing
+    changed = True
+    drawn_size = (playfield.width, playfield.height)
+
     # setting up game loop
     while handler.running():
+        # paused with everything drawn nothing changes without input, sleep until some arrives instead of drawing
+        if not changed and not stepper.running():
+            handler.wait(IDLE_TIMEOUT)
+            timer.wake()
+
         # poll for input
-        result = handler.poll()
+        with timer.phase('poll'):
+            result = handler.poll()
+        frame_generation = generation
+
+        # the window was uncovered or restored, what was drawn into it before is gone
+        if result.exposed:
+            full_redraw = True
+
+        # any change made to the playfield here restarts the background worker from it
+        edited = False
 
         # handle left button clicks
         if handler.button_pressed() and not handler.locked() and result.event_button == 1:
             handler.lock()
             # set / unset single cells
-            if 0 < result.event_x < (playfield.width * playfield.cell_size) and\
-                    0 < result.event_y < (playfield.height * playfield.cell_size):
-                cell_x = result.event_x // playfield.cell_size
-                cell_y = result.event_y // playfield.cell_size
-                playfield.flip_cell(cell_x, cell_y)
+            cell = viewport.cell_at(result.event_x - 10, result.event_y - 10)
+            if cell is not None:
+                playfield.flip_cell(*cell)
+                edited = True
             # process all buttons for input actions
             for button in button_list:
                 if button.bottom_x > result.event_x > button.top_x and\
@@ -116,59 +175,145 @@ def main():
                     # menu clear
                     if button.label == 'Clear':
                         playfield.clear()
+                        edited = True
                     # menu random
                     if button.label == 'Random':
                         playfield.randomize()
+                        edited = True
+                    # continuous run mode
+                    if button.label == 'Run / Pause':
+                        if not stepper.running():
+                            stepper.load(playfield.field, generation)
+                        stepper.toggle()
                     # x +
                     if button.label == 'x +':
                         _current = playfield.get_size()
                         playfield.resize(_current.width + 1, _current.height)
+                        edited = True
                     # x -
                     if button.label == 'x -':
                         _current = playfield.get_size()
                         playfield.resize(_current.width - 1, _current.height)
+                        edited = True
                     # y +
                     if button.label == 'y +':
                         _current = playfield.get_size()
                         playfield.resize(_current.width, _current.height + 1)
+                        edited = True
                     # y -
                     if button.label == 'y -':
                         _current = playfield.get_size()
                         playfield.resize(_current.width, _current.height - 1)
+                        edited = True
+                    # dump the frame timings for offline analysis
+                    if button.label == 'Profile CSV':
+                        timer.to_csv(time.strftime('profile-%Y%m%d-%H%M%S.csv'))
+                    # show the whole playfield again
+                    if button.label == 'Fit view':
+                        viewport.fit()
+
+        # zoom at the mouse pointer with the wheel and pan by dragging with the middle button held
+        if result.wheel and viewport.cell_at(result.x - 10, result.y - 10) is not None:
+            viewport.zoom(result.wheel, result.x - 10, result.y - 10)
+        if result.drag_x or result.drag_y:
+            viewport.pan(result.drag_x, result.drag_y)
+
+        # the arrow keys pan and plus and minus zoom at the centre of the view
+        if handler.key_pressed() and not handler.locked():
+            handler.lock()
+            if result.event_key in pan_keys:
+                viewport.pan(pan_keys[result.event_key][0] * viewport.width / 4,
+                             pan_keys[result.event_key][1] * viewport.height / 4)
+            if result.event_key in zoom_keys:
+                viewport.zoom(zoom_keys[result.event_key])
 
         # handle right button clicks, i.e. simulate (one mouseclick equals one generation change)
-        if handler.button_pressed() and not handler.locked() and result.event_button == 3:
+        if handler.button_pressed() and not handler.locked() and result.event_button == 3 and not stepper.running():
             handler.lock()
-            playfield.simulate()
+            with timer.phase('simulate'):
+                playfield.simulate()
+            generation += 1
+            edited = True
 
-        if not timer.poll(gui.frame_limit):
-            # flush window and surface
-            gui.flush()
-            playfield.flush_surface()
+        with timer.phase('simulate'):
+            if edited:
+                stepper.load(playfield.field, generation)
 
-            # draw buttons
-            for button in button_list:
-                if button.bottom_x > result.x > button.top_x and\
-                        button.bottom_y > result.y > button.top_y:
-                    gui.add_surface(button.hover_surface, (button.top_x, button.top_y))
-                else:
-                    gui.add_surface(button.surface, (button.top_x, button.top_y))
+            # take over the latest generation finished by the background worker
+            if stepper.running():
+                generation, playfield.field = stepper.acquire()
+
+        # frames without input and without a new generation would look exactly like the last one drawn
+        changed = changed or full_redraw or edited or bool(result.events) or generation != frame_generation
+        if not timer.poll(gui.frame_limit) and changed:
+            # only the window areas collected here are pushed to the screen
+            dirty_rects = []
+
+            # flush window and surface on the first frame or after the playfield size changed
+            if full_redraw or (playfield.width, playfield.height) != drawn_size:
+                gui.flush()
+                playfield.flush_surface()
+                drawn_size = (playfield.width, playfield.height)
+                full_redraw = True
+
+            with timer.phase('buttons'):
+                # draw buttons, only those whose hover state changed unless everything is redrawn
+                hovering = [button.bottom_x > result.x > button.top_x and button.bottom_y > result.y > button.top_y
+                            for button in button_list]
+                for index, button in enumerate(button_list):
+                    if full_redraw or hovered is None or hovering[index] != hovered[index]:
+                        gui.add_surface(button.hover_surface if hovering[index] else button.surface,
+                                        (button.top_x, button.top_y))
+                        dirty_rects.append(button.rect)
+                hovered = hovering
+
+            with timer.phase('update_surface'):
+                # drawing playfield, only the changed cells
+                for rect in playfield.update_surface():
+                    gui.add_surface(playfield.surface, (10, 10), rect)
+                    dirty_rects.append(rect.move(10, 10))
+
+            with timer.phase('buttons'):
+                frame_time = timer.percentiles()
+                labels = [(size_label, f'Playfield: x: {playfield.width} y: {playfield.height}'),
+                          # output fps
+                          (fps_label, f'FPS: {1 / timer.last_frame_time():.1f}'),
+                          # output generations per second of the background worker
+                          (generation_label, f'Generation: {generation}  Gen/s: {stepper.rate():.0f}'),
+                          # output frame time percentiles and where the time of a frame goes
+                          (frame_label, f'Frame ms p50: {frame_time.p50 * 1000:.1f}  '
+                                        f'p95: {frame_time.p95 * 1000:.1f}  '
+                                        f'p99: {frame_time.p99 * 1000:.1f}'),
+                          (phase_label, f'p95 ms poll: {timer.percentiles("poll").p95 * 1000:.1f}  '
+                                        f'sim: {timer.percentiles("simulate").p95 * 1000:.1f}  '
+                                        f'draw: {timer.percentiles("update_surface").p95 * 1000:.1f}'),
+                          (ui_label, f'p95 ms ui: {timer.percentiles("buttons").p95 * 1000:.1f}  '
+                                     f'flip: {timer.percentiles("flip").p95 * 1000:.1f}  '
+                                     f'Gen/s: {timer.generations_per_second():.1f}')]
+                for label, text in labels:
+                    label_rect = label.draw(text, full_redraw)
+                    if label_rect is not None:
+                        dirty_rects.append(label_rect)
 
-            # drawing playfield
-            playfield.update_surface()
-            gui.add_surface(playfield.surface, (10, 10))
+            # push the screen buffer, the whole window only when everything was redrawn
+            with timer.phase('flip'):
+                gui.update(None if full_redraw else dirty_rects)
+            full_redraw = False
+            changed = False
 
-            gui.add_button(f'Playfield: x: {playfield.width} y: {playfield.height}',
-                           colours.white,
-                           window_height + 80, 210, 280, 90)
-            # output fps
-            gui.add_button(f'FPS: {(1 // timer.last_frame_time() )}',
-                           colours.white,
-                           window_height + 10, 10)
+        # close the frame in the profiler with the generations it advanced
+        timer.frame(max(generation - frame_generation, 0))
 
-            # flip screen buffer
-            pygame.display.flip()
+    stepper.stop()
 
 
 if __name__ == '__main__':
-    main()
+    # python -m game_of_life run [options] runs simulations without a window
+    if sys.argv[1:2] == ['run']:
+        from modules.headless import cli
+        sys.exit(cli(sys.argv[2:]))
+    _parser = argparse.ArgumentParser(description="Conway's Game Of Life")
+    _parser.add_argument('--width', type=int, default=20, help='playfield width in cells')
+    _parser.add_argument('--height', type=int, default=20, help='playfield height in cells')
+    _arguments = _parser.parse_args()
+    main(_arguments.width, _arguments.height)
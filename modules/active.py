@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - active
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 16:30
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Active region tracking simulation.
+
+The playfield is split into square tiles and a bitmap remembers which tiles changed in the previous generation. A
+cell can only change if something in its neighbourhood changed, so only tiles touching a change are evaluated and
+everything else is carried forward unchanged.
+"""
+from collections import namedtuple
+from typing import Dict, Optional, Union
+
+from modules.boundary import pad_array, validate_boundary
+from modules.rules import CONWAY, Rule, parse_rule
+from modules.vectorized import padded_simulation
+
+import numpy
+
+TileStatistics = namedtuple('TileStatistics', ['evaluated', 'skipped', 'total_evaluated', 'total_skipped'])
+
+
+class ActiveRegionSimulation:
+    """Playfield which re-evaluates only the tiles next to last generations changes."""
+
+    def __init__(self,
+                 playfield,
+                 tile_size: int = 32,
+                 rule: Union[str, Rule] = CONWAY,
+                 boundary: str = 'dead',
+                 ):
+        """Initialize the simulation, every tile starts out dirty."""
+        self.rule = parse_rule(rule)
+        self.boundary = validate_boundary(boundary)
+        self.tile_size = tile_size
+        self.field = numpy.array(playfield, dtype=numpy.uint8)
+        _height, _width = self.field.shape
+        self._tiles_y = -(-_height // tile_size)
+        self._tiles_x = -(-_width // tile_size)
+        self.dirty = numpy.ones((self._tiles_y, self._tiles_x), dtype=bool)
+        self._evaluated = 0
+        self._skipped = 0
+        self._total_evaluated = 0
+        self._total_skipped = 0
+
+    def mark_cell(self, cell_x: int, cell_y: int):
+        """Mark the tile holding a cell as changed."""
+        self.dirty[cell_y // self.tile_size, cell_x // self.tile_size] = True
+
+    def flip_cell(self, cell_x: int, cell_y: int):
+        """Flip a cell from set to unset and vice versa."""
+        self.field[cell_y, cell_x] ^= 1
+        self.mark_cell(cell_x, cell_y)
+
+    def load(self, playfield):
+        """Take over an externally modified playfield, marking the tiles which differ from the own state."""
+        _playfield = numpy.asarray(playfield, dtype=numpy.uint8)
+        _changed = _playfield != self.field
+        if _changed.any():
+            self.dirty |= self._tile_any(_changed)
+            numpy.copyto(self.field, _playfield)
+
+    def _tile_any(self, cells: numpy.ndarray) -> numpy.ndarray:
+        """Reduce a cell mask to a tile mask, a tile is set if any of its cells is."""
+        _height, _width = cells.shape
+        _padded = numpy.zeros((self._tiles_y * self.tile_size, self._tiles_x * self.tile_size), dtype=bool)
+        _padded[:_height, :_width] = cells
+        _tiles = _padded.reshape(self._tiles_y, self.tile_size, self._tiles_x, self.tile_size)
+        return numpy.asarray(_tiles.any(axis=(1, 3)))
+
+    def _active_tiles(self) -> numpy.ndarray:
+        """Return the dirty tiles grown by one tile in every direction, across the edges as the boundary mode says."""
+        if 0 in self.rule.birth:
+            # dead cells without any neighbours come alive, no tile is ever stable
+            return numpy.ones_like(self.dirty)
+        _padded = pad_array(self.dirty, self.boundary)
+        _active = numpy.zeros_like(self.dirty)
+        for _dy in range(3):
+            for _dx in range(3):
+                _active |= _padded[_dy:_dy + self._tiles_y, _dx:_dx + self._tiles_x]
+        return _active
+
+    def simulate(self):
+        """Simulate one generation step evaluating only active tiles."""
+        _size = self.tile_size
+        _height, _width = self.field.shape
+        _active = self._active_tiles()
+        _padded = pad_array(self.field, self.boundary)
+        _next = self.field.copy()
+        _dirty = numpy.zeros_like(self.dirty)
+        for _tile_y, _tile_x in zip(*numpy.nonzero(_active)):
+            _y0 = _tile_y * _size
+            _x0 = _tile_x * _size
+            _y1 = min(_y0 + _size, _height)
+            _x1 = min(_x0 + _size, _width)
+            # step the tile together with a one cell halo, the ghost cells of the padded field at the playfield edge
+            _tile = padded_simulation(_padded[_y0:_y1 + 2, _x0:_x1 + 2], self.rule)
+            if not numpy.array_equal(_tile, self.field[_y0:_y1, _x0:_x1]):
+                _next[_y0:_y1, _x0:_x1] = _tile
+                _dirty[_tile_y, _tile_x] = True
+        self.field = _next
+        self.dirty = _dirty
+        self._evaluated = int(_active.sum())
+        self._skipped = _active.size - self._evaluated
+        self._total_evaluated += self._evaluated
+        self._total_skipped += self._skipped
+
+    def statistics(self) -> TileStatistics:
+        """Return tiles evaluated and skipped in the last step and in total."""
+        return TileStatistics(self._evaluated, self._skipped, self._total_evaluated, self._total_skipped)
+
+
+# simulation reused by the active engine as long as the playfield size does not change
+_engine: Dict[str, ActiveRegionSimulation] = {}
+
+
+def active_statistics() -> Optional[TileStatistics]:
+    """Return the tile counters of the active engine or None if it has not run yet."""
+    if 'simulation' not in _engine:
+        return None
+    return _engine['simulation'].statistics()
+
+
+def active_simulation(playfield, rule: Union[str, Rule] = CONWAY, boundary: str = 'dead') -> numpy.ndarray:
+    """
+    Simulate a playfield for one generation step skipping stable and empty tiles.
+
+    Drop-in backend for modules.simulation.simulation, changes made to the playfield between calls are found by
+    comparing it against the last generation.
+    """
+    _playfield = numpy.asarray(playfield, dtype=numpy.uint8)
+    _rule = parse_rule(rule)
+    _simulation = _engine.get('simulation')
+    if _simulation is None or _simulation.field.shape != _playfield.shape or \
+            (_simulation.rule, _simulation.boundary) != (_rule, boundary):
+        _simulation = _engine['simulation'] = ActiveRegionSimulation(_playfield, rule=_rule, boundary=boundary)
+    else:
+        _simulation.load(_playfield)
+    _simulation.simulate()
+    return _simulation.field.copy()
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - benchmark
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 18:10
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Headless benchmarks.
+
+The suite times the simulation, the playfield factories and serialization and the renderer over a matrix of sizes and
+densities. Every case is repeated until its rounds or its time budget are used up and summarized like pytest-benchmark
+does, results are written to JSON so runs on different commits can be compared.
+"""
+import argparse
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+from contextlib import suppress
+from typing import Callable, Dict, Iterable, List, Optional
+
+# render without opening a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from modules import core  # noqa: E402
+from modules.playfield import Playfield, generate_seeded_playfield, serialize_playfield  # noqa: E402
+from modules.simulation import simulation  # noqa: E402
+
+import numpy  # noqa: E402
+
+RenderResult = namedtuple('RenderResult', ['size', 'renderer', 'frame_time'])
+BenchmarkResult = namedtuple('BenchmarkResult', ['name',
+                                                 'size',
+                                                 'density',
+                                                 'rounds',
+                                                 'minimum',
+                                                 'maximum',
+                                                 'mean',
+                                                 'median',
+                                                 'stddev',
+                                                 ])
+
+BENCHMARK_SIZES = (64, 256, 1024, 4096)
+BENCHMARK_DENSITIES = (0.1, 0.3, 0.5)
+
+
+def render_benchmark(sizes: Iterable[int] = (20, 50, 100, 200),
+                     frames: int = 20,
+                     surface_size: int = 840,
+                     ) -> List[RenderResult]:
+    """Time full playfield redraws of the cell by cell and the pixel array renderer."""
+    _results = []
+    for _size in sizes:
+        _playfield = Playfield((_size, _size), (surface_size, surface_size))
+        _field = (numpy.random.default_rng(_size).random((_size, _size)) < 0.3).astype(numpy.uint8)
+        for _renderer, _render in (('cells', _playfield.render_cells), ('array', _playfield.render_array)):
+            _render(_field)
+            _start = time.perf_counter()
+            for _ in range(frames):
+                _render(_field)
+            _results.append(RenderResult(_size, _renderer, (time.perf_counter() - _start) / frames))
+    return _results
+
+
+def _measure(_function: Callable, _arguments: tuple, _rounds: int, _max_time: float) -> List[float]:
+    """Time a function up to the given rounds, stopping early once the time budget is spent but after one round."""
+    _timings: List[float] = []
+    _deadline = time.perf_counter() + _max_time
+    while len(_timings) < _rounds:
+        _start = time.perf_counter()
+        _function(*_arguments)
+        _timings.append(time.perf_counter() - _start)
+        if _start + _timings[-1] >= _deadline:
+            break
+    return _timings
+
+
+def _summarize(_name: str, _size: int, _density: float, _timings: List[float]) -> BenchmarkResult:
+    """Summarize the timings of a benchmark case."""
+    return BenchmarkResult(_name,
+                           _size,
+                           _density,
+                           len(_timings),
+                           min(_timings),
+                           max(_timings),
+                           statistics.mean(_timings),
+                           statistics.median(_timings),
+                           statistics.stdev(_timings) if len(_timings) > 1 else 0.0)
+
+
+def _redraw(_playfield: Playfield):
+    """Redraw the whole playfield."""
+    _playfield.invalidate_surface()
+    _playfield.update_surface()
+
+
+def suite_benchmark(sizes: Iterable[int] = BENCHMARK_SIZES,
+                    densities: Iterable[float] = BENCHMARK_DENSITIES,
+                    rounds: int = 5,
+                    max_time: float = 1.0,
+                    ) -> List[BenchmarkResult]:
+    """Time simulation, generate_seeded_playfield, serialize_playfield and update_surface on square playfields."""
+    _results = []
+    for _size in sizes:
+        # one pixel per cell at least, otherwise update_surface has nothing to draw
+        _playfield = Playfield((_size, _size), (max(840, _size + 20), max(840, _size + 20)))
+        for _density in densities:
+            _cells = int(_size * _size * _density)
+            _field = generate_seeded_playfield(_size, _size, _cells, _size)
+            _playfield.field = numpy.array(_field, dtype=numpy.uint8)
+            _cases = (('simulation', simulation, (_field,)),
+                      ('generate_seeded_playfield', generate_seeded_playfield, (_size, _size, _cells)),
+                      ('serialize_playfield', serialize_playfield, (_field,)),
+                      ('update_surface', _redraw, (_playfield,)))
+            for _name, _function, _arguments in _cases:
+                _timings = _measure(_function, _arguments, rounds, max_time)
+                _results.append(_summarize(_name, _size, _density, _timings))
+    return _results
+
+
+def write_results(results: List[BenchmarkResult], filename: str) -> bool:
+    """Write benchmark results to JSON together with the commit and interpreter they were measured on."""
+    _commit = None
+    with suppress(FileNotFoundError):
+        _commit = core.bash_command(['git', 'rev-parse', 'HEAD'])
+    return core.dict_to_json({'commit': _commit.strip() if _commit else None,
+                              'python': platform.python_version(),
+                              'machine': platform.machine(),
+                              'results': [_result._asdict() for _result in results],
+                              }, filename)
+
+
+def compare_results(baseline: str, results: List[BenchmarkResult]) -> Dict[tuple, float]:
+    """Return the median time of each case relative to a baseline JSON file, above one means slower."""
+    _baseline = {(_entry['name'], _entry['size'], _entry['density']): _entry['median']
+                 for _entry in core.json_to_dict(baseline)['results']}
+    return {(_result.name, _result.size, _result.density): _result.median / _baseline[_result[:3]]
+            for _result in results if _baseline.get(_result[:3])}
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks from the command line."""
+    _parser = argparse.ArgumentParser(prog='jarvis bench', description='Time engines, factories and renderers.')
+    _parser.add_argument('--sizes', type=int, nargs='+', default=BENCHMARK_SIZES, help='square playfield sizes')
+    _parser.add_argument('--densities', type=float, nargs='+', default=BENCHMARK_DENSITIES, help='live cell shares')
+    _parser.add_argument('--rounds', type=int, default=5, help='maximum rounds per case')
+    _parser.add_argument('--max-time', type=float, default=1.0, help='time budget in seconds per case')
+    _parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    _parser.add_argument('--compare', default=None, help='JSON file of an earlier run to compare against')
+    _parser.add_argument('--render', action='store_true', help='compare the cell and the array renderer instead')
+    _arguments = _parser.parse_args(argv)
+    if _arguments.render:
+        for _render in render_benchmark():
+            print(f'size: {_render.size:>5}  renderer: {_render.renderer:<6}  '
+                  f'frame time: {_render.frame_time * 1000:8.3f} ms')
+        return 0
+    _results = suite_benchmark(_arguments.sizes, _arguments.densities, _arguments.rounds, _arguments.max_time)
+    _ratios = compare_results(_arguments.compare, _results) if _arguments.compare else {}
+    for _result in _results:
+        _ratio = f'  x{_ratios[_result[:3]]:.2f}' if _result[:3] in _ratios else ''
+        print(f'{_result.name:<26} size: {_result.size:>5}  density: {_result.density:.2f}  '
+              f'rounds: {_result.rounds:>3}  min: {_result.minimum * 1000:10.3f} ms  '
+              f'median: {_result.median * 1000:10.3f} ms  stddev: {_result.stddev * 1000:8.3f} ms{_ratio}')
+    if _arguments.output:
+        write_results(_results, _arguments.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(cli())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - blocked
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 18.10.26 - 04:20
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Time blocked simulation of large playfields.
+
+Stepping a playfield larger than the CPU caches one generation at a time streams the whole playfield through memory
+for every generation. Here the playfield is cut into tiles and every tile is advanced depth generations in a row while
+it is in cache. A cell depends on cells at most one cell away per generation, so a tile cut out together with a halo of
+depth cells is enough to compute depth generations of it, the halo shrinking by one cell every generation.
+"""
+import time
+from collections import namedtuple
+from typing import Iterable, List, Tuple, Union
+
+from modules.boundary import pad_array, validate_boundary
+from modules.rules import CONWAY, Rule, parse_rule
+from modules.vectorized import padded_simulation, vectorized_simulation
+
+import numpy
+
+BlockingResult = namedtuple('BlockingResult', ['depth', 'seconds', 'speedup'])
+
+# a tile of this many cells a side, its halo and the temporaries of a generation step stay within a typical L2 cache
+TILE_SIZE = 512
+
+# generations computed per pass over the playfield, deeper blocks recompute more halo cells
+BLOCK_DEPTH = 8
+
+
+def _advance_tile(window: numpy.ndarray, depth: int, rule: Rule, beyond: Tuple[int, int, int, int]) -> numpy.ndarray:
+    """
+    Advance a tile surrounded by a halo of depth cells depth generations, returns the tile alone.
+
+    beyond are the rows above and below and the columns left and right of the window reaching past a dead boundary,
+    the cells there have to stay dead in every generation.
+    """
+    _top, _bottom, _left, _right = beyond
+    for _ in range(depth - 1):
+        window = padded_simulation(window, rule)
+        # the window lost one cell on every side, so did the part beyond the playfield
+        _top, _bottom, _left, _right = max(_top - 1, 0), max(_bottom - 1, 0), max(_left - 1, 0), max(_right - 1, 0)
+        window[:_top] = 0
+        window[window.shape[0] - _bottom:] = 0
+        window[:, :_left] = 0
+        window[:, window.shape[1] - _right:] = 0
+    return padded_simulation(window, rule)
+
+
+def blocked_simulation(playfield,
+                       rule: Union[str, Rule] = CONWAY,
+                       boundary: str = 'dead',
+                       generations: int = 1,
+                       tile_size: int = TILE_SIZE,
+                       depth: int = BLOCK_DEPTH,
+                       ) -> numpy.ndarray:
+    """
+    Simulate a playfield for a number of generation steps, tile by tile and depth generations per pass.
+
+    Drop-in backend for modules.simulation.simulation, the result is cell for cell identical to stepping the
+    playfield generation by generation.
+    """
+    if generations < 0:
+        raise ValueError('generations must not be negative')
+    if tile_size < 1 or depth < 1:
+        raise ValueError('tile_size and depth must be positive')
+    _rule = parse_rule(rule)
+    validate_boundary(boundary)
+    _field = numpy.array(playfield, dtype=numpy.uint8)
+    _height, _width = _field.shape
+    while generations > 0:
+        _depth = min(depth, generations)
+        if _height <= tile_size and _width <= tile_size:
+            # a single tile gains nothing from the halo, step it the plain way
+            for _ in range(_depth):
+                _field = vectorized_simulation(_field, _rule, boundary)
+            generations -= _depth
+            continue
+        _padded = pad_array(_field, boundary, _depth)
+        _next = numpy.empty_like(_field)
+        for _y in range(0, _height, tile_size):
+            _y_end = min(_y + tile_size, _height)
+            for _x in range(0, _width, tile_size):
+                _x_end = min(_x + tile_size, _width)
+                # ghost cells of the other boundaries are real cells somewhere on the playfield and evolve as such
+                _beyond = (max(_depth - _y, 0), max(_y_end + _depth - _height, 0),
+                           max(_depth - _x, 0), max(_x_end + _depth - _width, 0)) if boundary == 'dead' else (0,) * 4
+                _window = _padded[_y:_y_end + 2 * _depth, _x:_x_end + 2 * _depth]
+                _next[_y:_y_end, _x:_x_end] = _advance_tile(_window, _depth, _rule, _beyond)
+        _field = _next
+        generations -= _depth
+    return _field
+
+
+def blocking_benchmark(size: int = 4096,
+                       generations: int = 16,
+                       depths: Iterable[int] = (1, 2, 4, 8, 16),
+                       ) -> List[BlockingResult]:
+    """Time blocked stepping of a random field for each depth against stepping one vectorized generation at a time."""
+    _playfield = (numpy.random.default_rng(0).random((size, size)) < 0.3).astype(numpy.uint8)
+    _start = time.perf_counter()
+    _field = _playfield
+    for _ in range(generations):
+        _field = vectorized_simulation(_field)
+    _single_step = time.perf_counter() - _start
+    _results = []
+    for _depth in depths:
+        _start = time.perf_counter()
+        blocked_simulation(_playfield, generations=generations, depth=_depth)
+        _seconds = time.perf_counter() - _start
+        _results.append(BlockingResult(_depth, _seconds, _single_step / _seconds))
+    return _results
+
+
+if __name__ == '__main__':
+    for _result in blocking_benchmark():
+        print(f'depth: {_result.depth:>3}  seconds: {_result.seconds:8.3f}  speedup: {_result.speedup:5.2f}')
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - boundary
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 18.10.26 - 02:15
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Playfield boundary modes.
+
+The engines never look at coordinates outside the playfield, instead the playfield is surrounded by a ring of ghost
+cells filled according to the boundary mode before a generation step:
+
+dead     ghost cells are dead, the classic bounded playfield
+torus    ghost cells repeat the opposite edge, the playfield wraps around
+reflect  ghost cells mirror the adjacent edge cell
+"""
+from typing import Dict, List, Literal, Sequence
+
+import numpy
+
+BOUNDARIES = ('dead', 'torus', 'reflect')
+
+# numpy.pad modes filling the ghost cells of each boundary
+_PAD_MODES: Dict[str, Literal['constant', 'wrap', 'symmetric']] = {'dead': 'constant',
+                                                                   'torus': 'wrap',
+                                                                   'reflect': 'symmetric'}
+
+
+def validate_boundary(boundary: str) -> str:
+    """Return the boundary mode, raising ValueError for unknown ones."""
+    if boundary not in BOUNDARIES:
+        raise ValueError(f'Unknown boundary {boundary!r}: must be one of {", ".join(BOUNDARIES)}')
+    return boundary
+
+
+def pad_rows(playfield: Sequence[Sequence[int]], boundary: str = 'dead') -> List[List[int]]:
+    """Return a list of lists playfield surrounded by one ring of ghost cells."""
+    validate_boundary(boundary)
+    # arrays give up their cells as python ints, indexing the lookup tables with numpy scalars is a lot slower
+    _rows = playfield.tolist() if isinstance(playfield, numpy.ndarray) else [list(_row) for _row in playfield]
+    if boundary == 'torus':
+        _rows = [_rows[-1]] + _rows + [_rows[0]]
+        return [[_row[-1]] + _row + [_row[0]] for _row in _rows]
+    if boundary == 'reflect':
+        _rows = [_rows[0]] + _rows + [_rows[-1]]
+        return [[_row[0]] + _row + [_row[-1]] for _row in _rows]
+    _dead = [0] * len(_rows[0])
+    return [[0] + _row + [0] for _row in [_dead] + _rows + [_dead]]
+
+
+def pad_array(playfield: numpy.ndarray, boundary: str = 'dead', width: int = 1) -> numpy.ndarray:
+    """Return an array surrounded by width rings of ghost cells, leading axes of a stack of playfields are kept."""
+    _widths = [(0, 0)] * (playfield.ndim - 2) + [(width, width)] * 2
+    return numpy.pad(playfield, _widths, mode=_PAD_MODES[validate_boundary(boundary)])
+
+
+def fill_ghost_cells(padded: numpy.ndarray, boundary: str = 'dead'):
+    """Fill the ring of ghost cells around the inside of a padded 2-D array in place, without allocating."""
+    validate_boundary(boundary)
+    if boundary == 'dead':
+        padded[0] = padded[-1] = 0
+        padded[:, 0] = padded[:, -1] = 0
+    elif boundary == 'torus':
+        padded[0] = padded[-2]
+        padded[-1] = padded[1]
+        # the columns go second, so the corners take the cells diagonally across
+        padded[:, 0] = padded[:, -2]
+        padded[:, -1] = padded[:, 1]
+    else:
+        padded[0] = padded[1]
+        padded[-1] = padded[-2]
+        padded[:, 0] = padded[:, 1]
+        padded[:, -1] = padded[:, -2]
+
+
+def halo_rows(playfield: numpy.ndarray, start: int, end: int, boundary: str = 'dead', width: int = 1) -> numpy.ndarray:
+    """Return rows [start - width, end + width) of a 2-D array, rows outside the playfield filled as ghost rows."""
+    # padding the row numbers like the cells gives the source row of every ghost row, -1 for dead ones
+    _indices = numpy.pad(numpy.arange(1, playfield.shape[0] + 1), width, mode=_PAD_MODES[validate_boundary(boundary)])
+    _indices = _indices[start:end + 2 * width] - 1
+    _rows = playfield[_indices]
+    _rows[_indices < 0] = 0
+    return _rows
+
+
+if __name__ == '__main__':
+    pass
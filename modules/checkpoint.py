@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - checkpoint
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 23:10
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Periodic checkpoints for long runs.
+
+Checkpoints are binary snapshots written by a background thread, the stepping loop only hands over a copy of the
+playfield. Every file is written to a temporary name and renamed into place, so a run dying mid-write never leaves a
+truncated checkpoint behind.
+"""
+import glob
+import os
+import threading
+import time
+from typing import List, Optional
+
+from modules.packed import PackedField
+from modules.snapshot import save_snapshot
+from modules.sparse import SparseField
+
+import numpy
+
+CHECKPOINT_EXTENSION = '.gol'
+
+
+def checkpoint_name(directory: str, prefix: str, generation: int) -> str:
+    """Return the file name of the checkpoint of a generation."""
+    return os.path.join(directory, f'{prefix}-gen-{generation:012d}{CHECKPOINT_EXTENSION}')
+
+
+def list_checkpoints(directory: str, prefix: str) -> List[str]:
+    """Return the checkpoints of a run, oldest first."""
+    return sorted(glob.glob(os.path.join(glob.escape(directory), f'{glob.escape(prefix)}-gen-'
+                                         f'{"[0-9]" * 12}{CHECKPOINT_EXTENSION}')))
+
+
+def latest_checkpoint(directory: str, prefix: str) -> Optional[str]:
+    """Return the most recent checkpoint of a run or None if there is none."""
+    _checkpoints = list_checkpoints(directory, prefix)
+    return _checkpoints[-1] if _checkpoints else None
+
+
+def _copy_field(_playfield):
+    """Take a private copy of any playfield representation, the caller is free to keep stepping the original."""
+    if isinstance(_playfield, PackedField):
+        return PackedField(_playfield.width, _playfield.words.copy())
+    if isinstance(_playfield, SparseField):
+        return _playfield.to_playfield()
+    return numpy.array(_playfield, dtype=numpy.uint8)
+
+
+class Checkpointer:
+    """
+    Write checkpoints every n generations or t seconds on a background thread.
+
+    Only the latest pending checkpoint is kept, if the disk falls behind older pending ones are dropped instead of
+    stalling the simulation.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 prefix: str = 'checkpoint',
+                 every_generations: int = 0,
+                 every_seconds: float = 0.0,
+                 keep: int = 3,
+                 compress: bool = False,
+                 ):
+        """Initialize the checkpointer and start its writer thread."""
+        if every_generations < 0 or every_seconds < 0:
+            raise ValueError('Checkpoint intervals must not be negative')
+        if keep < 1:
+            raise ValueError('At least one checkpoint must be kept')
+        self.directory = directory
+        self.prefix = prefix
+        self.every_generations = every_generations
+        self.every_seconds = every_seconds
+        self.keep = keep
+        self.compress = compress
+        self.written: List[str] = []
+        self._last_time = time.monotonic()
+        # field, generation, rule, engine and boundary of the checkpoint waiting for the writer thread
+        self._pending: Optional[tuple] = None
+        self._busy = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        """Support the with statement."""
+        return self
+
+    def __exit__(self, *_exc_info):
+        """Write the last pending checkpoint and stop the writer thread."""
+        self.close()
+
+    def due(self, generation: int) -> bool:
+        """Return True if a checkpoint is due at a generation."""
+        if self.every_generations and generation % self.every_generations == 0:
+            return True
+        return bool(self.every_seconds) and time.monotonic() - self._last_time >= self.every_seconds
+
+    def submit(self,
+               playfield,
+               generation: int,
+               rule: str = 'B3/S23',
+               engine: str = 'reference',
+               boundary: str = 'dead',
+               ):
+        """Hand a copy of the playfield over to the writer thread, returns without waiting for the disk."""
+        self._raise_error()
+        _field = _copy_field(playfield)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('Checkpointer is closed')
+            if not self._thread.is_alive():
+                raise RuntimeError('Checkpoint writer thread is gone')
+            self._pending = (_field, generation, rule, engine, boundary)
+            self._last_time = time.monotonic()
+            self._condition.notify_all()
+
+    def maybe_checkpoint(self,
+                         playfield,
+                         generation: int,
+                         rule: str = 'B3/S23',
+                         engine: str = 'reference',
+                         boundary: str = 'dead',
+                         ) -> bool:
+        """Submit a checkpoint if one is due, returns True if it was submitted."""
+        if not self.due(generation):
+            return False
+        self.submit(playfield, generation, rule, engine, boundary)
+        return True
+
+    def flush(self):
+        """Block until every submitted checkpoint is on disk."""
+        with self._condition:
+            # a writer thread which died nothing notifies about, so look at it every now and then
+            while not self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout=0.1):
+                if not self._thread.is_alive():
+                    break
+        self._raise_error()
+        if self._pending is not None:
+            raise RuntimeError('Checkpoint writer thread is gone')
+
+    def close(self):
+        """Write the last pending checkpoint and stop the writer thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self._raise_error()
+
+    def _raise_error(self):
+        """Re-raise an error of the writer thread in the calling thread."""
+        if self._error is not None:
+            _error, self._error = self._error, None
+            raise _error
+
+    def _run(self):
+        """Write pending checkpoints until closed."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                _pending, self._pending = self._pending, None
+                self._busy = True
+            try:
+                self._write(*_pending)
+            except BaseException as _error:  # noqa: B036
+                # raised in the stepping thread on its next call, core bails out on errors with SystemExit
+                self._error = _error
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _write(self, _field, _generation: int, _rule: str, _engine: str, _boundary: str):
+        """Write a single checkpoint and remove the ones no longer kept."""
+        _filename = checkpoint_name(self.directory, self.prefix, _generation)
+        save_snapshot(_filename, _field, _generation, _rule, _engine, self.compress, _boundary)
+        self.written.append(_filename)
+        for _stale in list_checkpoints(self.directory, self.prefix)[:-self.keep]:
+            os.remove(_stale)
+
+
+if __name__ == '__main__':
+    pass
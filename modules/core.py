@@ -17,14 +17,20 @@ Just a set of small helper functions collected and made over the years.
 import datetime
 import json
 import logging
+import mmap
 import os
 import subprocess
+import tempfile
 import time
 from contextlib import suppress
-from typing import Any, List, Optional
+from typing import Any, Callable, IO, Optional, Union
 
 __version__ = '0.0.19'
 
+# umask of the process, read once at import as reading it means setting it, which would race with writer threads
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
 
 def bash_command(command: list) -> Optional[str]:
     """
@@ -113,7 +119,7 @@ def dict_get_key_by_value(dict_item: dict, value) -> Optional[str]:
     return None
 
 
-def dict_get_value_by_key(dict_item: dict, key: str) -> Optional[Any[bool, int, float, str, list[Any], dict]]:
+def dict_get_value_by_key(dict_item: dict, key: str) -> Optional[Any]:
     """
     Find a value to a key if present, returns key or None otherwise.
 
@@ -173,27 +179,37 @@ def json_to_dict(filename: str) -> dict:
         return _dict_item
 
 
-def dict_to_json(dict_item: dict, filename: str) -> bool:
+def atomic_write(filename: str, writer: Callable[[IO], Any], binary: bool = False) -> bool:
     """
-    Save a dictionary into a json file.
+    Write a file through a temporary file in the same directory which is then renamed over the target.
 
-    :param dict_item: Dictionary containing the data.
-    :param filename: File name for the json file (can contain a path).
+    Note: A crash while writing leaves the previous file untouched. Bails out on permission error. The file keeps the
+    mode of the file it replaces, a new file gets the mode open() would give it.
+
+    :param filename: File name for the file (can contain a path).
+    :param writer: A callable receiving the open temporary file and writing the content.
+    :param binary: Open the temporary file in binary mode.
     :return bool: Returns True on success.
     """
+    _directory = os.path.dirname(filename) or '.'
     try:
-        with open(filename, mode='x') as _file:
-            json.dump(dict_item, _file, indent=2, sort_keys=True)
-    except FileExistsError:
+        _mode = os.stat(filename).st_mode & 0o7777
+    except FileNotFoundError:
+        _mode = 0o666 & ~_UMASK
+    try:
+        _descriptor, _temporary = tempfile.mkstemp(dir=_directory, prefix=f'.{os.path.basename(filename)}.')
         try:
-            os.remove(filename)
-            with open(filename, mode='w') as _file:
-                json.dump(dict_item, _file, indent=2, sort_keys=True)
-        except PermissionError as _error:
-            print(f'{datetime.datetime.today()} {_error}')
-            exit(1)
-        else:
-            return True
+            with open(_descriptor, mode='wb' if binary else 'w') as _file:
+                writer(_file)
+                _file.flush()
+                os.fsync(_file.fileno())
+            # mkstemp creates the file readable by its owner only
+            os.chmod(_temporary, _mode)
+            os.replace(_temporary, filename)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(_temporary)
+            raise
     except PermissionError as _error:
         print(f'{datetime.datetime.today()} {_error}')
         exit(1)
@@ -201,6 +217,19 @@ def dict_to_json(dict_item: dict, filename: str) -> bool:
         return True
 
 
+def dict_to_json(dict_item: dict, filename: str) -> bool:
+    """
+    Save a dictionary into a json file.
+
+    Note: The file is replaced atomically, readers see either the old or the new content.
+
+    :param dict_item: Dictionary containing the data.
+    :param filename: File name for the json file (can contain a path).
+    :return bool: Returns True on success.
+    """
+    return atomic_write(filename, lambda _file: json.dump(dict_item, _file, indent=2, sort_keys=True))
+
+
 def asc_to_list(filename: str) -> list:
     """
     Load a text file and return a list, each line a single item stripped clean of newline on success.
@@ -317,29 +346,14 @@ def list_to_asc(list_item: list, filename: str) -> bool:
     """
     Save a list into an asc file.
 
+    Note: The file is replaced atomically, readers see either the old or the new content.
+
     :param list_item: List containing the data.
     :param filename: File name for the asc file (can contain a path).
     :return bool: Returns True on success.
     """
     list_item = list_append_all_newline(list_item)
-    try:
-        with open(filename, mode='x') as _file:
-            _file.writelines(list_item)
-    except FileExistsError:
-        try:
-            os.remove(filename)
-            with open(filename, mode='w') as _file:
-                _file.writelines(list_item)
-        except PermissionError as _error:
-            print(f'{datetime.datetime.today()} {_error}')
-            exit(1)
-        else:
-            return True
-    except PermissionError as _error:
-        print(f'{datetime.datetime.today()} {_error}')
-        exit(1)
-    else:
-        return True
+    return atomic_write(filename, lambda _file: _file.writelines(list_item))
 
 
 def dict_to_asc(dict_item: dict, filename: str) -> bool:
@@ -373,43 +387,53 @@ def setup_logger(logger_name: str, log_file_name: str, level: int = logging.DEBU
         _logger.addHandler(_stream_handler)
 
 
-def raw_to_file(filename: str, raw: str) -> bool:
+def raw_to_file(filename: str, raw: Union[str, bytes]) -> bool:
     """
     Save raw data to file.
 
+    Note: The file is replaced atomically, readers see either the old or the new content.
+
     :param filename: the path to be saved to.
-    :param raw: The content for the file.
+    :param raw: The content for the file, bytes are written in binary mode.
     :return bool: True on success.
     """
+    _binary = isinstance(raw, (bytes, bytearray, memoryview))
+    return atomic_write(filename, lambda _file: _file.write(raw), binary=_binary)
+
+
+def file_to_raw(filename: str, binary: bool = False) -> Union[str, bytes]:
+    """
+    Load a file and returns its raw content.
+
+    :param filename: File name as a string (can include a path).
+    :param binary: Return bytes instead of text.
+    :return: containing the raw file data on success.
+    """
     try:
-        with open(filename, mode='x') as _file:
-            _file.write(raw)
-    except FileExistsError:
-        try:
-            os.remove(filename)
-            _file.write(raw)
-        except PermissionError as _error:
-            print(f'{datetime.datetime.today()} {_error}')
-            exit(1)
-        else:
-            return True
+        with open(filename, mode='rb' if binary else 'r') as _file:
+            _raw = _file.read()
+    except FileNotFoundError as _error:
+        print(f'{datetime.datetime.today()} {_error}')
+        exit(1)
     except PermissionError as _error:
         print(f'{datetime.datetime.today()} {_error}')
         exit(1)
     else:
-        return True
+        return _raw
 
 
-def file_to_raw(filename: str) -> Optional[Any[bool, int, float, List[Any], dict]]:
+def file_to_mmap(filename: str) -> mmap.mmap:
     """
-    Load a file and returns its raw content.
+    Map a file read-only into memory instead of reading it.
+
+    Note: Only the pages actually accessed are loaded, which makes opening huge files instant.
 
     :param filename: File name as a string (can include a path).
-    :return: containing the raw file data on success.
+    :return mmap: A read-only memory map of the file on success.
     """
     try:
-        with open(filename, mode='r') as _file:
-            _raw = _file.read()
+        with open(filename, mode='rb') as _file:
+            _map = mmap.mmap(_file.fileno(), 0, access=mmap.ACCESS_READ)
     except FileNotFoundError as _error:
         print(f'{datetime.datetime.today()} {_error}')
         exit(1)
@@ -417,7 +441,7 @@ def file_to_raw(filename: str) -> Optional[Any[bool, int, float, List[Any], dict
         print(f'{datetime.datetime.today()} {_error}')
         exit(1)
     else:
-        return _raw
+        return _map
 
 
 def dir_create(path: str) -> bool:
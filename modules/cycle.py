@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - cycle
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 23:50
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Still life and oscillator detection.
+
+Every generation is reduced to a 64 bit Zobrist hash, the XOR of one random key per live cell. Going from one
+generation to the next only the keys of the changed cells are XORed in, the changed cells are found by comparing with
+the previous generation in a buffer kept for it. A bounded table of recent hashes reveals repeated states. A repeated
+hash alone could be a collision, so the playfield is kept whenever its hash repeats, and a cycle is only reported once
+that exact playfield came back.
+"""
+from collections import deque, namedtuple
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy
+
+Cycle = namedtuple('Cycle', ['start', 'period'])
+
+
+class ZobristHash:
+    """Zobrist hashing of playfields of a fixed size."""
+
+    def __init__(self, height: int, width: int, seed: int = 0):
+        """Draw one random key per cell."""
+        self.shape = (height, width)
+        self._keys = numpy.random.default_rng(seed).integers(0, 1 << 64, (height, width), numpy.uint64)
+
+    def compute(self, playfield: numpy.ndarray) -> int:
+        """Return the hash of a whole playfield."""
+        return int(numpy.bitwise_xor.reduce(self._keys[playfield != 0]))
+
+    def toggle(self, value: int, changed: numpy.ndarray) -> int:
+        """Return the hash after flipping the cells set in the changed mask."""
+        return value ^ int(numpy.bitwise_xor.reduce(self._keys[changed]))
+
+    def update(self, value: int, previous: numpy.ndarray, current: numpy.ndarray) -> int:
+        """Return the hash of the current playfield from the hash of the previous one, touching changed cells only."""
+        return self.toggle(value, previous != current)
+
+
+class CycleDetector:
+    """Detect the first generation repeating an earlier one within a bounded history."""
+
+    def __init__(self, history: int = 1024, seed: int = 0):
+        """Initialize the detector, history bounds the number of generations remembered and so the longest period."""
+        if history < 1:
+            raise ValueError('history must be positive')
+        self.history = history
+        self._seed = seed
+        self._hasher: Optional[ZobristHash] = None
+        self._previous: Optional[numpy.ndarray] = None
+        self._changed: Optional[numpy.ndarray] = None
+        self._value = 0
+        # generation a hash was first seen at, and the hashes in the order they were seen
+        self._seen: Dict[int, int] = {}
+        self._order: Deque[int] = deque()
+        # generation and playfield of hashes seen again, the next repetition is checked against the playfield
+        self._repeated: Dict[int, Tuple[int, numpy.ndarray]] = {}
+        self.cycle: Optional[Cycle] = None
+
+    def reset(self):
+        """Forget every generation seen so far, needed after the playfield was edited."""
+        self._previous = None
+        self._seen.clear()
+        self._order.clear()
+        self._repeated.clear()
+        self.cycle = None
+
+    def _hash(self, playfield: numpy.ndarray) -> int:
+        """Return the hash of a playfield, updated from the changes to the previous one if it has the same size."""
+        if self._previous is None or self._changed is None or self._previous.shape != playfield.shape:
+            _height, _width = playfield.shape
+            if self._hasher is None or self._hasher.shape != playfield.shape:
+                self._hasher = ZobristHash(_height, _width, self._seed)
+            self.reset()
+            self._previous = numpy.array(playfield, dtype=numpy.uint8)
+            self._changed = numpy.empty(playfield.shape, dtype=bool)
+            return self._hasher.compute(self._previous)
+        assert self._hasher is not None
+        numpy.not_equal(self._previous, playfield, out=self._changed)
+        numpy.copyto(self._previous, playfield, casting='unsafe')
+        return self._hasher.toggle(self._value, self._changed)
+
+    def observe(self, playfield, generation: int) -> Optional[Cycle]:
+        """
+        Record a generation, returns the cycle once the playfield repeats a remembered generation.
+
+        The period is confirmed cell for cell, which takes a second repetition: an oscillator of period p starting at
+        generation s is reported at generation s + 2 * p.
+        """
+        _current = numpy.asarray(playfield)
+        self._value = self._hash(_current)
+        _start = self._seen.get(self._value)
+        if _start is None:
+            self._seen[self._value] = generation
+            self._order.append(self._value)
+            if len(self._order) > self.history:
+                _dropped = self._order.popleft()
+                del self._seen[_dropped]
+                self._repeated.pop(_dropped, None)
+            return None
+        _repeated = self._repeated.get(self._value)
+        if _repeated is not None and numpy.array_equal(_repeated[1], _current):
+            self.cycle = Cycle(_start, generation - _repeated[0])
+            return self.cycle
+        # first repetition or a hash collision, keep this playfield to check the next repetition against
+        self._repeated[self._value] = (generation, numpy.array(_current, dtype=numpy.uint8))
+        return None
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - ensemble
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 18.10.26 - 03:05
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Batched simulation of many independent playfields.
+
+Parameter sweeps run thousands of small soups, stepping them one by one spends most of the time in the interpreter.
+An ensemble stacks K playfields of the same size into one (K, height, width) array and steps all of them with a single
+call of the vectorized kernel. Every field reports its population, and once it repeats one of its last few generations
+it counts as settled: it is no longer simulated, its cycle is just carried forward.
+"""
+from collections import deque, namedtuple
+from typing import Union
+
+from modules.boundary import validate_boundary
+from modules.field import Seed
+from modules.rules import CONWAY, Rule, parse_rule
+from modules.vectorized import vectorized_simulation
+
+import numpy
+
+# populations is a (generations + 1, K) array, settled_at and periods hold -1 and 0 for fields which never settled
+EnsembleResult = namedtuple('EnsembleResult', ['generations', 'populations', 'settled_at', 'periods'])
+
+
+def generate_ensemble(count: int, height: int, width: int, density: float, seed: Seed = None) -> numpy.ndarray:
+    """
+    Create a (count, height, width) stack of seeded playfields.
+
+    Every field has exactly int(height * width * density) live cells like generate_seeded_playfield, the cells of
+    each field are an independent permutation of the same flat row of cells.
+    """
+    if count < 1:
+        raise ValueError('An ensemble needs at least one playfield')
+    if not 0.0 <= density <= 1.0:
+        raise ValueError('density out of range: must be in the range [0, 1]')
+    _cells = numpy.zeros((count, height * width), dtype=numpy.uint8)
+    _cells[:, :int(height * width * density)] = 1
+    return numpy.random.default_rng(seed).permuted(_cells, axis=1).reshape(count, height, width)
+
+
+class Ensemble:
+    """Stack of independent playfields stepped together."""
+
+    def __init__(self,
+                 fields,
+                 rule: Union[str, Rule] = CONWAY,
+                 boundary: str = 'dead',
+                 max_period: int = 2,
+                 ):
+        """Initialize the ensemble, max_period is the longest cycle recognized as settled."""
+        self.fields = numpy.array(fields, dtype=numpy.uint8)
+        if self.fields.ndim != 3:
+            raise ValueError('An ensemble is a (count, height, width) stack of playfields')
+        if max_period < 1:
+            raise ValueError('max_period must be positive')
+        self.rule = parse_rule(rule)
+        self.boundary = validate_boundary(boundary)
+        self.max_period = max_period
+        self.generation = 0
+        self.settled_at = numpy.full(len(self.fields), -1, dtype=numpy.int64)
+        self.periods = numpy.zeros(len(self.fields), dtype=numpy.int64)
+        # the current generation last, the one max_period - 1 steps back first
+        self._history = deque([self.fields], maxlen=max_period)
+
+    def __len__(self) -> int:
+        """Return the number of playfields."""
+        return len(self.fields)
+
+    @property
+    def populations(self) -> numpy.ndarray:
+        """Return the number of live cells of every playfield."""
+        return numpy.count_nonzero(self.fields, axis=(1, 2))
+
+    @property
+    def settled(self) -> numpy.ndarray:
+        """Return the mask of playfields which settled into a still life or oscillator."""
+        return self.settled_at >= 0
+
+    def step(self) -> numpy.ndarray:
+        """Simulate every playfield for one generation step, returns the populations."""
+        _active = numpy.flatnonzero(self.settled_at < 0)
+        _everything = len(_active) == len(self.fields)
+        # only the unsettled fields go through the kernel, gathering them is skipped as long as that is all of them
+        _current = self.fields if _everything else self.fields[_active]
+        _stepped = vectorized_simulation(_current, self.rule, self.boundary) if len(_active) else _current
+        if _everything:
+            _next = _stepped
+        else:
+            _next = numpy.empty_like(self.fields)
+            _next[_active] = _stepped
+            # a settled field of period p is in the state it was in p generations ago
+            for _period in range(1, self.max_period + 1):
+                _carried = self.periods == _period
+                if _carried.any():
+                    _next[_carried] = self._history[-_period][_carried]
+
+        self.generation += 1
+        _unsettled = numpy.ones(len(_active), dtype=bool)
+        for _period in range(1, len(self._history) + 1):
+            if _period == 1:
+                _earlier = _current
+            elif _everything:
+                _earlier = self._history[-_period]
+            else:
+                _earlier = self._history[-_period][_active]
+            _repeats = _unsettled & (_stepped == _earlier).all(axis=(1, 2))
+            self.settled_at[_active[_repeats]] = self.generation - _period
+            self.periods[_active[_repeats]] = _period
+            _unsettled &= ~_repeats
+
+        self._history.append(_next)
+        self.fields = _next
+        return self.populations
+
+    def run(self, generations: int) -> EnsembleResult:
+        """Simulate every playfield for a number of generations and record their populations."""
+        _populations = numpy.empty((generations + 1, len(self.fields)), dtype=numpy.int64)
+        _populations[0] = self.populations
+        for _generation in range(1, generations + 1):
+            _populations[_generation] = self.step()
+        return EnsembleResult(self.generation, _populations, self.settled_at.copy(), self.periods.copy())
+
+
+if __name__ == '__main__':
+    pass
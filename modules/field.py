@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - field
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 11.01.22 - 22:55
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Playfield factories and serialization.
+
+Kept free of pygame so headless tools can use them, modules.playfield re-exports everything.
+"""
+
+import re
+from collections import namedtuple
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from modules.packed import PackedField, pack_playfield, unpack_row
+from modules.sparse import SparseField
+
+import numpy
+
+# a row of a pattern as its index and the (x, length) runs of live cells in it
+PatternRow = Tuple[int, List[Tuple[int, int]]]
+
+Pattern = namedtuple('Pattern', ['width', 'height', 'rule', 'rows'])
+
+# seed of the random factories, an int or a numpy Generator, None draws fresh entropy
+Seed = Union[None, int, numpy.random.Generator]
+
+# run length encoded files wrap their lines at this length
+RLE_LINE_LENGTH = 70
+
+
+def _validate_dimensions(_playfield_height: int, _playfield_width: int):
+    """Raise ValueError for playfield dimensions the factories cannot create."""
+    if _playfield_height <= 0 or _playfield_width <= 0:
+        raise ValueError('Height and width must be positive')
+
+    if _playfield_height == 1 and _playfield_width == 1:
+        raise ValueError('At least one dimension must be greater than one')
+
+
+def generate_playfield(_playfield_height: int, _playfield_width: int) -> List[List[int]]:
+    """
+    Create a matrix from lists, with the specified height and width.
+
+    int _playfield_width : matrix size in x direction
+    int _playfield_height : matrix size in y direction
+    return : list[list[], ...] as a matrix
+    """
+    _validate_dimensions(_playfield_height, _playfield_width)
+
+    return [[0 for _ in range(_playfield_width)] for __ in range(_playfield_height)]
+
+
+Cell = namedtuple('Cell', ['row', 'cell'])
+
+
+def serialize_playfield(_playfield: List[List[int]]) -> str:
+    """Create a string representation of the playfield."""
+    _max_width = 3
+    _field = []
+    if not isinstance(_playfield, list):
+        raise ValueError('_playfield is not a list')
+    for _row in _playfield:
+        if not isinstance(_row, list):
+            raise ValueError('_playfield is not a list of lists')
+        _field.append(''.join([str(_cell).ljust(_max_width) for _cell in _row]).strip())
+
+    return '\n'.join(_field)
+
+
+def generate_seeded_playfield(
+    _playfield_height: int,
+    _playfield_width: int,
+    _number_of_seeded_cells: int,
+    _seed: Seed = None,
+) -> List[List[int]]:
+    """
+    Create a playfield with exactly _number_of_seeded_cells live cells at random positions.
+
+    _seed makes the playfield reproducible, it is an int seed or a numpy Generator to draw from.
+    """
+    _validate_dimensions(_playfield_height, _playfield_width)
+
+    # Cast to int to be sure
+    _number_of_seeded_cells = int(_number_of_seeded_cells)
+
+    # Validate the _number_of_seeded_cells input
+    _playfield_size = _playfield_height * _playfield_width
+    if _number_of_seeded_cells < 0:
+        raise ValueError(f'_number_of_seeded_cells too small: must be in the range [0, {_playfield_size}]')
+
+    if _number_of_seeded_cells > (_playfield_height * _playfield_width):
+        raise ValueError(f'_number_of_seeded_cells too large: must be in the range [0, {_playfield_size}]')
+
+    # Set a random choice of flat indices in one go instead of sampling a list of all cells
+    _cells = numpy.zeros(_playfield_size, dtype=numpy.uint8)
+    _cells[numpy.random.default_rng(_seed).choice(_playfield_size, _number_of_seeded_cells, replace=False)] = 1
+    return _cells.reshape(_playfield_height, _playfield_width).tolist()
+
+
+def generate_random_playfield(
+    _playfield_height: int,
+    _playfield_width: int,
+    _density: float,
+    _seed: Seed = None,
+) -> List[List[int]]:
+    """Create a playfield every cell of which is alive with probability _density."""
+    _validate_dimensions(_playfield_height, _playfield_width)
+    if not 0.0 <= _density <= 1.0:
+        raise ValueError('_density out of range: must be in the range [0, 1]')
+
+    _random = numpy.random.default_rng(_seed).random((_playfield_height, _playfield_width))
+    return (_random < _density).astype(numpy.uint8).tolist()
+
+
+def deserialize_playfield(_serialized: str) -> List[List[int]]:
+    """Create a playfield from the string representation made by serialize_playfield."""
+    _playfield = [[int(_cell) for _cell in _line.split()] for _line in _serialized.splitlines() if _line.strip()]
+    if not _playfield:
+        raise ValueError('_serialized holds no playfield')
+    if any(len(_row) != len(_playfield[0]) for _row in _playfield):
+        raise ValueError('_serialized rows differ in length')
+    return _playfield
+
+
+def _iter_rows(_playfield) -> Iterator[numpy.ndarray]:
+    """Yield the rows of any playfield representation one at a time as uint8 arrays."""
+    if isinstance(_playfield, PackedField):
+        for _row in range(_playfield.words.shape[0]):
+            yield unpack_row(_playfield, _row)
+    elif isinstance(_playfield, SparseField):
+        _width, _height = _playfield_size(_playfield)
+        _live: dict = {}
+        for _x, _y in _playfield.cells:
+            _live.setdefault(_y, []).append(_x)
+        for _row in range(_height):
+            _cells = numpy.zeros(_width, dtype=numpy.uint8)
+            _cells[_live.get(_row, [])] = 1
+            yield _cells
+    else:
+        for _row in _playfield:
+            yield numpy.asarray(_row, dtype=numpy.uint8)
+
+
+def _playfield_size(_playfield) -> Tuple[int, int]:
+    """Return width and height of any playfield representation."""
+    if isinstance(_playfield, PackedField):
+        return _playfield.width, _playfield.words.shape[0]
+    if isinstance(_playfield, SparseField):
+        if _playfield.width is None or _playfield.height is None:
+            raise ValueError('An unbounded field has no size to write')
+        return _playfield.width, _playfield.height
+    return len(_playfield[0]), len(_playfield)
+
+
+def _live_runs(_row: numpy.ndarray) -> List[Tuple[int, int]]:
+    """Return the (x, length) runs of live cells in a row."""
+    _edges = numpy.flatnonzero(numpy.diff(numpy.concatenate(([0], _row != 0, [0])).astype(numpy.int8)))
+    return [(int(_start), int(_end - _start)) for _start, _end in zip(_edges[0::2], _edges[1::2])]
+
+
+def write_rle(_playfield, _stream: IO[str], _rule: str = 'B3/S23'):
+    """
+    Write a playfield as run length encoded pattern.
+
+    Rows are encoded one after another and output lines are written as soon as they are full, so the extra memory
+    needed does not depend on the playfield size.
+    """
+    _width, _height = _playfield_size(_playfield)
+    _stream.write(f'x = {_width}, y = {_height}, rule = {_rule}\n')
+    _line: List[str] = []
+    _line_length = 0
+
+    def _emit(_token: str):
+        nonlocal _line_length
+        if _line_length + len(_token) > RLE_LINE_LENGTH:
+            _stream.write(''.join(_line) + '\n')
+            _line.clear()
+            _line_length = 0
+        _line.append(_token)
+        _line_length += len(_token)
+
+    def _run(_count: int, _tag: str) -> str:
+        return f'{_count}{_tag}' if _count > 1 else _tag
+
+    _last_row = 0
+    for _y, _row in enumerate(_iter_rows(_playfield)):
+        _runs = _live_runs(_row)
+        if not _runs:
+            continue
+        if _y > _last_row:
+            _emit(_run(_y - _last_row, '$'))
+        _last_row = _y
+        _x = 0
+        for _start, _length in _runs:
+            if _start > _x:
+                _emit(_run(_start - _x, 'b'))
+            _emit(_run(_length, 'o'))
+            _x = _start + _length
+    _emit('!')
+    _stream.write(''.join(_line) + '\n')
+
+
+def write_cells(_playfield, _stream: IO[str], _name: Optional[str] = None):
+    """Write a playfield in plaintext .cells format, one row at a time."""
+    if _name is not None:
+        _stream.write(f'!Name: {_name}\n')
+    for _row in _iter_rows(_playfield):
+        _stream.write(numpy.where(_row != 0, ord('O'), ord('.')).astype(numpy.uint8).tobytes().decode('ascii'))
+        _stream.write('\n')
+
+
+def _parse_rle_rows(_lines: Iterator[str], _width: int, _height: int) -> Iterator[PatternRow]:
+    """Yield the rows holding live cells from the body of a run length encoded pattern."""
+    _y = 0
+    _x = 0
+    _runs: List[Tuple[int, int]] = []
+    _count = ''
+    for _line in _lines:
+        _line = _line.strip()
+        if _line.startswith('#'):
+            continue
+        for _char in _line:
+            if _char.isdigit():
+                _count += _char
+                continue
+            _number = int(_count) if _count else 1
+            _count = ''
+            if _char in 'b.':
+                _x += _number
+            elif _char == '$' or _char == '!':
+                if _runs:
+                    yield _y, _runs
+                    _runs = []
+                if _char == '!':
+                    return
+                _y += _number
+                _x = 0
+            elif _char.isalpha():
+                if _x + _number > _width or _y >= _height:
+                    raise ValueError(f'Pattern exceeds its size of {_width} x {_height}')
+                _runs.append((_x, _number))
+                _x += _number
+    if _runs:
+        yield _y, _runs
+
+
+def read_rle(_stream: Iterable[str]) -> Pattern:
+    """
+    Read a run length encoded pattern.
+
+    The header is read right away, the rows are a generator which parses the rest of the stream lazily and only
+    yields rows holding live cells.
+    """
+    _lines = iter(_stream)
+    for _line in _lines:
+        if _line.startswith('#') or not _line.strip():
+            continue
+        _header = dict(re.findall(r'(\w+)\s*=\s*([^,\s]+)', _line))
+        if 'x' not in _header or 'y' not in _header:
+            raise ValueError(f'Invalid run length encoded header: {_line.strip()}')
+        _width = int(_header['x'])
+        _height = int(_header['y'])
+        return Pattern(_width, _height, _header.get('rule', 'B3/S23'), _parse_rle_rows(_lines, _width, _height))
+    raise ValueError('No run length encoded header found')
+
+
+def _parse_cells_rows(_stream: Iterable[str], _size: List[int]) -> Iterator[PatternRow]:
+    """Yield every row of a plaintext pattern, keeping track of the longest line in _size."""
+    _y = 0
+    for _line in _stream:
+        if _line.startswith('!'):
+            continue
+        _row = numpy.frombuffer(_line.rstrip('\r\n').encode('ascii'), dtype=numpy.uint8)
+        _size[0] = max(_size[0], len(_row))
+        yield _y, _live_runs((_row != ord('.')) & (_row != ord(' ')))
+        _y += 1
+
+
+def read_cells(_stream: Iterable[str]) -> Pattern:
+    """
+    Read a plaintext .cells pattern.
+
+    The format has no header, so width and height are None and every line is yielded as a row including empty ones.
+    """
+    return Pattern(None, None, 'B3/S23', _parse_cells_rows(_stream, [0]))
+
+
+def load_pattern(_stream: Iterable[str], _format: str = 'rle', _representation: str = 'list'):
+    """
+    Load a pattern file row by row into a playfield representation.
+
+    _format is 'rle' or 'cells', _representation one of 'list', 'array', 'packed' or 'sparse'.
+    """
+    if _format == 'rle':
+        _width, _height, _, _rows = read_rle(_stream)
+    elif _format == 'cells':
+        # only the runs are kept until the size is known
+        _size = [0]
+        _rows = list(_parse_cells_rows(_stream, _size))
+        _width = max(_size[0], 1)
+        _height = len(_rows)
+    else:
+        raise ValueError(f'Unknown pattern format {_format!r}')
+    if _representation == 'sparse':
+        return SparseField(_width, _height, ((_x + _offset, _y)
+                                             for _y, _runs in _rows
+                                             for _x, _length in _runs
+                                             for _offset in range(_length)))
+    if _representation == 'packed':
+        _words = numpy.zeros((_height, -(-_width // 64)), dtype=numpy.uint64)
+        _cells = numpy.zeros(_width, dtype=numpy.uint8)
+        for _y, _runs in _rows:
+            _cells[:] = 0
+            for _x, _length in _runs:
+                _cells[_x:_x + _length] = 1
+            _words[_y] = pack_playfield(_cells[numpy.newaxis]).words[0]
+        return PackedField(_width, _words)
+    if _representation == 'array':
+        _array = numpy.zeros((_height, _width), dtype=numpy.uint8)
+        for _y, _runs in _rows:
+            for _x, _length in _runs:
+                _array[_y, _x:_x + _length] = 1
+        return _array
+    if _representation == 'list':
+        _playfield = [[0] * _width for _ in range(_height)]
+        for _y, _runs in _rows:
+            for _x, _length in _runs:
+                _playfield[_y][_x:_x + _length] = [1] * _length
+        return _playfield
+    raise ValueError(f'Unknown playfield representation {_representation!r}')
+
+
+if __name__ == '__main__':
+    pass
@@ -10,8 +10,8 @@
 # ---------------------------------------------------------------------------
 
 """GUI class."""
-from collections import namedtuple
-from typing import Tuple
+from collections import OrderedDict, namedtuple
+from typing import Any, Callable, Hashable, List, Optional, Tuple
 
 from modules.colour import Colour
 
@@ -20,6 +20,80 @@ import pygame
 # initialize colour class
 colours = Colour()
 
+Button = namedtuple('Button', ['label',
+                               'colour',
+                               'top_x',
+                               'top_y',
+                               'bottom_x',
+                               'bottom_y',
+                               'surface',
+                               'hover_surface',
+                               'rect',
+                               ])
+
+# rendered buttons and labels kept around, enough for every static widget plus a good many label texts
+SURFACE_CACHE_SIZE = 256
+
+
+class SurfaceCache:
+    """Rendered surfaces by key, evicting the least recently used once full."""
+
+    def __init__(self, capacity: int = SURFACE_CACHE_SIZE):
+        """Initialize an empty cache holding up to capacity entries."""
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return True if an entry is cached under key."""
+        return key in self._entries
+
+    def get(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        """Return the entry cached under key, rendering and caching it first if there is none."""
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        _entry = self._entries[key] = render()
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        return _entry
+
+
+class Label:
+    """Text widget at a fixed place in the window, rendered again only when its text changes."""
+
+    def __init__(self,
+                 gui: 'GUI',
+                 colour: Tuple[int, int, int] = colours.black,
+                 top_x: int = 0,
+                 top_y: int = 0,
+                 width: int = 420,
+                 height: int = 40,
+                 ):
+        """Initialize the label, nothing is drawn before the first call to draw."""
+        self._gui = gui
+        self.colour = colour
+        self.rect = pygame.Rect(top_x, top_y, width, height)
+        self.text: Optional[str] = None
+
+    def draw(self, text: str, force: bool = False) -> Optional[pygame.Rect]:
+        """Draw the label if its text changed or if forced, returns the window area drawn or None."""
+        if text == self.text and not force:
+            return None
+        self.text = text
+        _surface, _ = self._gui.render_button(text, self.colour, self.rect.width, self.rect.height)
+        self._gui.window.blit(_surface, self.rect.topleft)
+        return self.rect
+
 
 class GUI:
     """GUI class contains everything belonging to output and the window."""
@@ -42,29 +116,27 @@ class GUI:
         self._flush_colour = colours.black
         # setup font
         self.font = pygame.font.SysFont('Arial', 20, False, False)
+        # rendered button and label surfaces keyed by their looks
+        self.surface_cache = SurfaceCache()
 
     def flush(self):
         """Fill the whole window output screen with a chosen colour."""
         # flush output
         self.window.fill(self._flush_colour)
 
-    def add_button(self,
-                   label: str,
-                   colour: Tuple[int, int, int] = colours.black,
-                   top_x: int = 0,
-                   top_y: int = 0,
-                   width: int = 420,
-                   height: int = 40,
-                   background_image: pygame.Surface = None,
-                   background_colour: Tuple[int, int, int] = None,
-                   hover_colour: Tuple[int, int, int] = None,
-                   ):
-        """Draw a button on the output screen and return the clickable border positions absolute."""
+    def _render_face(self,
+                     text: pygame.Surface,
+                     colour: Tuple[int, int, int],
+                     width: int,
+                     height: int,
+                     fill_colour: Optional[Tuple[int, int, int]],
+                     background_image: Optional[pygame.Surface] = None,
+                     ) -> pygame.Surface:
+        """Render one face of a button, the background, the double border and the centered text."""
         _surface = pygame.Surface((width, height))
-        _surface_hover = pygame.Surface((width, height))
         # fill if we got a colour we fill the button with it
-        if background_colour is not None:
-            _surface.fill(background_colour)
+        if fill_colour is not None:
+            _surface.fill(fill_colour)
         # draw an image if we got one
         if background_image is not None:
             _surface.blit(background_image, (0, 0))
@@ -72,31 +144,69 @@ class GUI:
         pygame.draw.rect(_surface, colour, (0, 0, width, height), 1)
         pygame.draw.rect(_surface, colour, (3, 3, width - 6, height - 6), 1)
         # render the text centered
-        text = self.font.render(label, True, colour)
         _text_boundary = text.get_rect()
         _surface.blit(text, ((width / 2) - (_text_boundary.width / 2), (height / 2) - (_text_boundary.height / 2)))
+        return _surface
+
+    def render_button(self,
+                      label: str,
+                      colour: Tuple[int, int, int] = colours.black,
+                      width: int = 420,
+                      height: int = 40,
+                      background_colour: Optional[Tuple[int, int, int]] = None,
+                      hover_colour: Optional[Tuple[int, int, int]] = None,
+                      ) -> Tuple[pygame.Surface, pygame.Surface]:
+        """Return the normal and the hover surface of a button, rendered once per look and then taken from the cache."""
+        def _render():
+            _text = self.font.render(label, True, colour)
+            _surface = self._render_face(_text, colour, width, height, background_colour)
+            _surface_hover = self._render_face(_text, colour, width, height, hover_colour) \
+                if hover_colour is not None else pygame.Surface((width, height))
+            return _surface, _surface_hover
+
+        return self.surface_cache.get((label, tuple(colour), width, height,
+                                       None if background_colour is None else tuple(background_colour),
+                                       None if hover_colour is None else tuple(hover_colour)), _render)
+
+    def add_button(self,
+                   label: str,
+                   colour: Tuple[int, int, int] = colours.black,
+                   top_x: int = 0,
+                   top_y: int = 0,
+                   width: int = 420,
+                   height: int = 40,
+                   background_image: Optional[pygame.Surface] = None,
+                   background_colour: Optional[Tuple[int, int, int]] = None,
+                   hover_colour: Optional[Tuple[int, int, int]] = None,
+                   ):
+        """Draw a button on the output screen and return the clickable border positions absolute."""
+        if background_image is None:
+            _surface, _surface_hover = self.render_button(label, colour, width, height, background_colour,
+                                                          hover_colour)
+        else:
+            # images are not hashable by their looks, buttons with one are rendered every time
+            _text = self.font.render(label, True, colour)
+            _surface = self._render_face(_text, colour, width, height, background_colour, background_image)
+            _surface_hover = self._render_face(_text, colour, width, height, hover_colour) \
+                if hover_colour is not None else pygame.Surface((width, height))
         # draw and return tuple for clickable surface positions
         self.window.blit(_surface, (top_x, top_y))
-        if hover_colour is not None:
-            _surface_hover.fill(hover_colour)
-            pygame.draw.rect(_surface_hover, colour, (0, 0, width, height), 1)
-            pygame.draw.rect(_surface_hover, colour, (3, 3, width - 6, height - 6), 1)
-            _surface_hover.blit(text, ((width / 2) - (_text_boundary.width / 2),
-                                       (height / 2) - (_text_boundary.height / 2)))
-        Button = namedtuple('Button', ['label',
-                                       'colour',
-                                       'top_x',
-                                       'top_y',
-                                       'bottom_x',
-                                       'bottom_y',
-                                       'surface',
-                                       'hover_surface',
-                                       ])
-        return Button(label, colour, top_x, top_y, top_x + width, top_y + height, _surface, _surface_hover)
-
-    def add_surface(self, surface: pygame.Surface, pos_abs: Tuple[int, int]):
-        """Draw a surface onto the internal window class."""
-        self.window.blit(surface, pos_abs)
+        return Button(label, colour, top_x, top_y, top_x + width, top_y + height, _surface, _surface_hover,
+                      pygame.Rect(top_x, top_y, width, height))
+
+    def add_surface(self, surface: pygame.Surface, pos_abs: Tuple[int, int], area: Optional[pygame.Rect] = None):
+        """Draw a surface or only an area of it onto the internal window class."""
+        if area is None:
+            self.window.blit(surface, pos_abs)
+        else:
+            self.window.blit(surface, (pos_abs[0] + area.x, pos_abs[1] + area.y), area)
+
+    def update(self, rects: Optional[List[pygame.Rect]] = None):
+        """Push the given window areas to the screen, the whole window if rects is None."""
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - hashlife
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 12:20
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+HashLife engine.
+
+The universe is stored as a quadtree of canonical nodes, equal sub-patterns are shared and the result of advancing a
+node is memoized, which allows jumping ahead by huge numbers of generations at once.
+"""
+import weakref
+from collections import OrderedDict, namedtuple
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from modules.rules import CONWAY, Rule, neighbourhood_table, parse_rule
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'hit_rate', 'cache_size', 'cache_limit', 'nodes'])
+
+
+class Node:
+    """Canonical quadtree node covering 2 ** level by 2 ** level cells."""
+
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population', '__weakref__')
+
+    def __init__(self, level: int, nw=None, ne=None, sw=None, se=None, population: int = 0):
+        """Initialize the node, leaves (level 0) carry their state as population."""
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLife:
+    """
+    HashLife universe.
+
+    The universe is unbounded, exporting into a playfield crops it to the requested size, so results only match the
+    dead border of modules.simulation.simulation as long as the pattern does not touch the playfield edges.
+    """
+
+    def __init__(self,
+                 cells: Iterable[Tuple[int, int]] = (),
+                 cache_size: int = 1 << 20,
+                 rule: Union[str, Rule] = CONWAY,
+                 ):
+        """Initialize the universe, cells are given as (x, y) tuples, cache_size bounds the memoized results."""
+        self.rule = parse_rule(rule)
+        if 0 in self.rule.birth:
+            raise ValueError(f'{self.rule} gives birth to cells without neighbours, an unbounded universe can not hold '
+                             f'those')
+        # next centre cell state indexed by the bits of its 3x3 neighbourhood
+        self._table = neighbourhood_table(self.rule).tolist()
+        self.generation = 0
+        self._cache_limit = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        # canonical node table, nodes vanish from it as soon as nothing refers to them anymore
+        self._nodes: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+        self._off = Node(0, population=0)
+        self._on = Node(0, population=1)
+        self._zeros: List[Node] = [self._off]
+        self._load(cells)
+
+    @classmethod
+    def from_playfield(cls, playfield, cache_size: int = 1 << 20, rule: Union[str, Rule] = CONWAY) -> 'HashLife':
+        """Create a universe from a dense playfield, its top left cell becomes (0, 0)."""
+        _cells = [(_x, _y) for _y, _row in enumerate(playfield) for _x, _cell in enumerate(_row) if _cell == 1]
+        return cls(_cells, cache_size, rule)
+
+    def to_playfield(self, width: int, height: int, origin_x: int = 0, origin_y: int = 0) -> List[List[int]]:
+        """Create a dense playfield of the given size showing the universe from (origin_x, origin_y) onwards."""
+        _playfield = [[0 for _ in range(width)] for __ in range(height)]
+        for _x, _y in self.cells():
+            if origin_x <= _x < origin_x + width and origin_y <= _y < origin_y + height:
+                _playfield[_y - origin_y][_x - origin_x] = 1
+        return _playfield
+
+    def _join(self, nw: Node, ne: Node, sw: Node, se: Node) -> Node:
+        """Return the canonical node made of four children."""
+        _key = (id(nw), id(ne), id(sw), id(se))
+        _node = self._nodes.get(_key)
+        if _node is None:
+            _node = Node(nw.level + 1, nw, ne, sw, se, nw.population + ne.population + sw.population + se.population)
+            self._nodes[_key] = _node
+        return _node
+
+    def _zero(self, level: int) -> Node:
+        """Return the empty node of a level."""
+        while len(self._zeros) <= level:
+            _zero = self._zeros[-1]
+            self._zeros.append(self._join(_zero, _zero, _zero, _zero))
+        return self._zeros[level]
+
+    def _build(self, cells: List[Tuple[int, int]], x: int, y: int, level: int) -> Node:
+        """Build the node of a level whose top left corner lies at (x, y) from a list of live cells."""
+        if not cells:
+            return self._zero(level)
+        if level == 0:
+            return self._on
+        _half = 1 << (level - 1)
+        _quadrants: Tuple[list, list, list, list] = ([], [], [], [])
+        for _x, _y in cells:
+            _quadrants[(_x >= x + _half) + 2 * (_y >= y + _half)].append((_x, _y))
+        return self._join(self._build(_quadrants[0], x, y, level - 1),
+                          self._build(_quadrants[1], x + _half, y, level - 1),
+                          self._build(_quadrants[2], x, y + _half, level - 1),
+                          self._build(_quadrants[3], x + _half, y + _half, level - 1))
+
+    def _load(self, cells: Iterable[Tuple[int, int]]):
+        """Replace the universe with the given live cells."""
+        _cells = list(set(cells))
+        _x = min((_cell[0] for _cell in _cells), default=0)
+        _y = min((_cell[1] for _cell in _cells), default=0)
+        _extent = max((max(_cell[0] - _x, _cell[1] - _y) for _cell in _cells), default=0) + 1
+        _level = max(3, (_extent - 1).bit_length())
+        self._root = self._build(_cells, _x, _y, _level)
+        self._x = _x
+        self._y = _y
+
+    def cells(self) -> Iterator[Tuple[int, int]]:
+        """Yield the (x, y) coordinates of all live cells."""
+        _stack = [(self._root, self._x, self._y)]
+        while _stack:
+            _node, _x, _y = _stack.pop()
+            if _node.population == 0:
+                continue
+            if _node.level == 0:
+                yield _x, _y
+                continue
+            _half = 1 << (_node.level - 1)
+            _stack.append((_node.nw, _x, _y))
+            _stack.append((_node.ne, _x + _half, _y))
+            _stack.append((_node.sw, _x, _y + _half))
+            _stack.append((_node.se, _x + _half, _y + _half))
+
+    def population(self) -> int:
+        """Return the number of live cells."""
+        return self._root.population
+
+    def get_cell(self, cell_x: int, cell_y: int) -> int:
+        """Return the state of a single cell."""
+        _node = self._root
+        _x = cell_x - self._x
+        _y = cell_y - self._y
+        _size = 1 << _node.level
+        if not 0 <= _x < _size or not 0 <= _y < _size:
+            return 0
+        while _node.level > 0 and _node.population:
+            _size >>= 1
+            _node = (_node.nw, _node.ne, _node.sw, _node.se)[(_x >= _size) + 2 * (_y >= _size)]
+            _x %= _size
+            _y %= _size
+        return _node.population
+
+    def _centre(self, node: Node) -> Node:
+        """Return the node one level up with node in its centre."""
+        _zero = self._zero(node.level - 1)
+        return self._join(self._join(_zero, _zero, _zero, node.nw),
+                          self._join(_zero, _zero, node.ne, _zero),
+                          self._join(_zero, node.sw, _zero, _zero),
+                          self._join(node.se, _zero, _zero, _zero))
+
+    def _expand(self):
+        """Grow the root by one level keeping the universe in place."""
+        self._x -= 1 << (self._root.level - 1)
+        self._y -= 1 << (self._root.level - 1)
+        self._root = self._centre(self._root)
+
+    def _padded(self) -> bool:
+        """Return True if all live cells lie within the central quarter of the root."""
+        _root = self._root
+        return all((_root.nw.population == _root.nw.se.se.population,
+                    _root.ne.population == _root.ne.sw.sw.population,
+                    _root.sw.population == _root.sw.ne.ne.population,
+                    _root.se.population == _root.se.nw.nw.population))
+
+    def _life_4x4(self, node: Node) -> Node:
+        """Return the central 2x2 cells of a level 2 node one generation ahead."""
+        _grid = [[0] * 4 for _ in range(4)]
+        for _qy, _qx, _quadrant in ((0, 0, node.nw), (0, 2, node.ne), (2, 0, node.sw), (2, 2, node.se)):
+            _grid[_qy][_qx] = _quadrant.nw.population
+            _grid[_qy][_qx + 1] = _quadrant.ne.population
+            _grid[_qy + 1][_qx] = _quadrant.sw.population
+            _grid[_qy + 1][_qx + 1] = _quadrant.se.population
+        _result = []
+        for _y, _x in ((1, 1), (1, 2), (2, 1), (2, 2)):
+            _index = 0
+            for _bit, (_dy, _dx) in enumerate((_dy, _dx) for _dy in (-1, 0, 1) for _dx in (-1, 0, 1)):
+                _index |= _grid[_y + _dy][_x + _dx] << _bit
+            _result.append(self._on if self._table[_index] else self._off)
+        return self._join(*_result)
+
+    def _inner(self, node: Node) -> Node:
+        """Return the central node one level down without advancing time."""
+        return self._join(node.nw.se, node.ne.sw, node.sw.ne, node.se.nw)
+
+    def _successor(self, node: Node, step: int) -> Node:
+        """Return the central node one level down advanced by 2 ** step generations, step <= level - 2."""
+        if node.population == 0:
+            return node.nw
+        if node.level == 2:
+            return self._life_4x4(node)
+        _key = (node, step)
+        _result = self._cache.get(_key)
+        if _result is not None:
+            self._hits += 1
+            self._cache.move_to_end(_key)
+            return _result
+        self._misses += 1
+        _nw, _ne, _sw, _se = node.nw, node.ne, node.sw, node.se
+        _parts = [_nw,
+                  self._join(_nw.ne, _ne.nw, _nw.se, _ne.sw),
+                  _ne,
+                  self._join(_nw.sw, _nw.se, _sw.nw, _sw.ne),
+                  self._join(_nw.se, _ne.sw, _sw.ne, _se.nw),
+                  self._join(_ne.sw, _ne.se, _se.nw, _se.ne),
+                  _sw,
+                  self._join(_sw.ne, _se.nw, _sw.se, _se.sw),
+                  _se]
+        if step == node.level - 2:
+            # full speed, both halves of the time step advance by 2 ** (step - 1)
+            _parts = [self._successor(_part, step - 1) for _part in _parts]
+            _step = step - 1
+        else:
+            _parts = [self._inner(_part) for _part in _parts]
+            _step = step
+        _result = self._join(self._successor(self._join(_parts[0], _parts[1], _parts[3], _parts[4]), _step),
+                             self._successor(self._join(_parts[1], _parts[2], _parts[4], _parts[5]), _step),
+                             self._successor(self._join(_parts[3], _parts[4], _parts[6], _parts[7]), _step),
+                             self._successor(self._join(_parts[4], _parts[5], _parts[7], _parts[8]), _step))
+        self._cache[_key] = _result
+        if len(self._cache) > self._cache_limit:
+            self._cache.popitem(last=False)
+        return _result
+
+    def leap(self, step: int):
+        """Advance the universe by 2 ** step generations in a single pass."""
+        if step < 0:
+            raise ValueError('step must be at least zero')
+        while self._root.level < step + 2 or not self._padded():
+            self._expand()
+        self._expand()
+        _quarter = 1 << (self._root.level - 2)
+        self._root = self._successor(self._root, step)
+        self._x += _quarter
+        self._y += _quarter
+        self.generation += 1 << step
+
+    def advance(self, generations: int):
+        """Advance the universe by any number of generations using one power of two leap per set bit."""
+        if generations < 0:
+            raise ValueError('generations must be at least zero')
+        _step = 0
+        while generations:
+            if generations & 1:
+                self.leap(_step)
+            generations >>= 1
+            _step += 1
+
+    def simulate(self):
+        """Simulate one generation step."""
+        self.advance(1)
+
+    def clear_cache(self):
+        """Drop all memoized results, releasing nodes no longer needed by the current universe."""
+        self._cache.clear()
+
+    def cache_info(self) -> CacheInfo:
+        """Return cache statistics and the number of live canonical nodes for sizing memory."""
+        _lookups = self._hits + self._misses
+        _hit_rate: Optional[float] = self._hits / _lookups if _lookups else None
+        return CacheInfo(self._hits, self._misses, _hit_rate, len(self._cache), self._cache_limit, len(self._nodes))
+
+
+if __name__ == '__main__':
+    pass
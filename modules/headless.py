@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - headless
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 20:40
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Headless batch runner.
+
+Runs simulations without a window and writes snapshots and statistics, many seeds can be fanned out across a process
+pool. Nothing in here imports pygame.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+from functools import partial
+from multiprocessing import Pool
+from typing import List, Optional
+
+from modules import core
+from modules.boundary import BOUNDARIES
+from modules.checkpoint import Checkpointer, latest_checkpoint
+from modules.cycle import CycleDetector
+from modules.field import deserialize_playfield, generate_seeded_playfield, serialize_playfield
+from modules.packed import unpack_playfield
+from modules.rules import RULES, parse_rule
+from modules.simulation import ENGINES, get_engine
+from modules.snapshot import load_snapshot
+
+import numpy
+
+RunConfig = namedtuple('RunConfig', ['width',
+                                     'height',
+                                     'density',
+                                     'seed',
+                                     'generations',
+                                     'engine',
+                                     'snapshot_every',
+                                     'output',
+                                     'load',
+                                     'checkpoint_every',
+                                     'checkpoint_seconds',
+                                     'resume',
+                                     'detect_cycles',
+                                     'cycle_history',
+                                     'rule',
+                                     'boundary',
+                                     ], defaults=(0, 0.0, False, False, 1024, 'B3/S23', 'dead'))
+
+
+def load_playfield(config: RunConfig):
+    """Load the playfield of a run from file or seed a random one."""
+    if config.load is not None:
+        _serialized = core.file_to_raw(config.load)
+        assert isinstance(_serialized, str)
+        return deserialize_playfield(_serialized)
+    return generate_seeded_playfield(config.height, config.width, int(config.height * config.width * config.density),
+                                     config.seed)
+
+
+def resume_playfield(config: RunConfig):
+    """
+    Return the generation and playfield of the latest checkpoint of a run or None if there is none.
+
+    Raises ValueError if the checkpoint was written by a run with a different rule or boundary, continuing it under
+    another one would silently mix two simulations. The engine may differ, every engine yields the same generations.
+    """
+    _checkpoint = latest_checkpoint(config.output, f'seed-{config.seed}') if config.output else None
+    if _checkpoint is None:
+        return None
+    _snapshot = load_snapshot(_checkpoint)
+    if parse_rule(_snapshot.rule) != parse_rule(config.rule):
+        raise ValueError(f'{_checkpoint} was written with rule {_snapshot.rule}, resume with --rule {_snapshot.rule}')
+    if _snapshot.boundary != config.boundary:
+        raise ValueError(f'{_checkpoint} was written with the {_snapshot.boundary} boundary, '
+                         f'resume with --boundary {_snapshot.boundary}')
+    return _snapshot.generation, unpack_playfield(_snapshot.field)
+
+
+def run_simulation(config: RunConfig) -> dict:
+    """Run a single simulation, write its snapshots, checkpoints and statistics and return the statistics."""
+    _rule = parse_rule(config.rule)
+    _simulation = partial(get_engine(config.engine), rule=_rule, boundary=config.boundary)
+    _resumed = resume_playfield(config) if config.resume else None
+    _first, _field = _resumed if _resumed is not None else (0, load_playfield(config))
+    _prefix = os.path.join(config.output, f'seed-{config.seed}') if config.output else None
+    _checkpointer = None
+    if _prefix and (config.checkpoint_every or config.checkpoint_seconds):
+        _checkpointer = Checkpointer(config.output,
+                                     f'seed-{config.seed}',
+                                     config.checkpoint_every,
+                                     config.checkpoint_seconds)
+    _detector = CycleDetector(config.cycle_history) if config.detect_cycles else None
+    _cycle = _detector.observe(_field, _first) if _detector is not None else None
+    _populations = [int(numpy.count_nonzero(_field))]
+    _snapshots = []
+    _generation = _first
+    _start = time.perf_counter()
+    try:
+        while _generation < config.generations and _cycle is None:
+            _generation += 1
+            _field = _simulation(_field)
+            _populations.append(int(numpy.count_nonzero(_field)))
+            if _prefix and config.snapshot_every and _generation % config.snapshot_every == 0:
+                _snapshot = f'{_prefix}-gen-{_generation:08d}.txt'
+                core.raw_to_file(_snapshot, serialize_playfield(numpy.asarray(_field).tolist()))
+                _snapshots.append(_snapshot)
+            if _checkpointer is not None:
+                _checkpointer.maybe_checkpoint(_field, _generation, str(_rule), config.engine, config.boundary)
+            if _detector is not None:
+                _cycle = _detector.observe(_field, _generation)
+        if _cycle is not None and _generation < config.generations:
+            # every later generation repeats one of the last period generations, which the detector confirmed cell for
+            # cell, only step on to the phase of the last one
+            _confirmed = _generation - _cycle.period - _first
+            for _skipped in range(_generation + 1, config.generations + 1):
+                _populations.append(_populations[_confirmed + (_skipped - _generation) % _cycle.period])
+            for _ in range((config.generations - _generation) % _cycle.period):
+                _field = _simulation(_field)
+            if _checkpointer is not None:
+                _checkpointer.submit(_field, config.generations, str(_rule), config.engine, config.boundary)
+    finally:
+        if _checkpointer is not None:
+            _checkpointer.close()
+    _seconds = time.perf_counter() - _start
+    _stepped = config.generations - _first
+    _statistics = {'seed': config.seed,
+                   'engine': config.engine,
+                   'rule': str(_rule),
+                   'boundary': config.boundary,
+                   'width': len(_field[0]),
+                   'height': len(_field),
+                   'generations': config.generations,
+                   'seconds': _seconds,
+                   'resumed_from': _first,
+                   'generations_per_second': _stepped / _seconds if _seconds and _stepped > 0 else None,
+                   'initial_population': _populations[0],
+                   'final_population': _populations[-1],
+                   'populations': _populations,
+                   'snapshots': _snapshots,
+                   'checkpoints': _checkpointer.written if _checkpointer is not None else [],
+                   'cycle_start': _cycle.start if _cycle is not None else None,
+                   'cycle_period': _cycle.period if _cycle is not None else None,
+                   }
+    if _prefix:
+        core.dict_to_json(_statistics, f'{_prefix}-stats.json')
+    return _statistics
+
+
+def run_batch(configs: List[RunConfig], processes: int = 1) -> List[dict]:
+    """Run independent simulations, across a process pool if more than one process is requested."""
+    if processes <= 1 or len(configs) <= 1:
+        return [run_simulation(_config) for _config in configs]
+    # shut the workers down gracefully, terminating them hangs if the parent installed a SIGTERM handler they inherit
+    _pool = Pool(min(processes, len(configs)))
+    try:
+        return _pool.map(run_simulation, configs)
+    finally:
+        _pool.close()
+        _pool.join()
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse the command line of the run action."""
+    _parser = argparse.ArgumentParser(prog='game_of_life run', description='Run simulations without a window.')
+    _parser.add_argument('--width', type=int, default=256, help='playfield width in cells')
+    _parser.add_argument('--height', type=int, default=256, help='playfield height in cells')
+    _parser.add_argument('--density', type=float, default=0.5, help='share of live cells in a seeded playfield')
+    _parser.add_argument('--seeds', type=int, nargs='+', default=[0], help='one independent run per seed')
+    _parser.add_argument('--generations', type=int, default=100, help='generations to simulate per run')
+    _parser.add_argument('--engine', choices=sorted(ENGINES), default='vectorized', help='simulation backend')
+    _parser.add_argument('--rule', default='B3/S23', help=f'B/S notation rule or one of {", ".join(RULES)}')
+    _parser.add_argument('--boundary', choices=BOUNDARIES, default='dead', help='what lies beyond the playfield edges')
+    _parser.add_argument('--snapshot-every', type=int, default=0, help='write a snapshot every n generations')
+    _parser.add_argument('--output', default=None, help='directory for snapshots and statistics')
+    _parser.add_argument('--load', default=None, help='start from a serialized playfield instead of a seed')
+    _parser.add_argument('--checkpoint-every', type=int, default=0, help='write a checkpoint every n generations')
+    _parser.add_argument('--checkpoint-seconds', type=float, default=0.0, help='write a checkpoint every t seconds')
+    _parser.add_argument('--resume', action='store_true', help='continue every run from its latest checkpoint')
+    _parser.add_argument('--detect-cycles', action='store_true', help='stop stepping once a run repeats itself')
+    _parser.add_argument('--cycle-history', type=int, default=1024, help='generations remembered by --detect-cycles')
+    _parser.add_argument('--processes', type=int, default=1, help='worker processes for fanning out the seeds')
+    _arguments = _parser.parse_args(argv)
+    if _arguments.engine == 'parallel' and _arguments.processes > 1:
+        _parser.error('the parallel engine runs its own process pool, use --processes 1')
+    try:
+        parse_rule(_arguments.rule)
+    except ValueError as _error:
+        _parser.error(str(_error))
+    if (_arguments.checkpoint_every or _arguments.checkpoint_seconds or _arguments.resume) and not _arguments.output:
+        _parser.error('checkpoints need an --output directory')
+    return _arguments
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """Run the headless batch runner from the command line."""
+    _arguments = parse_arguments(argv)
+    if _arguments.output:
+        core.dir_create(_arguments.output)
+    _configs = [RunConfig(_arguments.width,
+                          _arguments.height,
+                          _arguments.density,
+                          _seed,
+                          _arguments.generations,
+                          _arguments.engine,
+                          _arguments.snapshot_every,
+                          _arguments.output,
+                          _arguments.load,
+                          _arguments.checkpoint_every,
+                          _arguments.checkpoint_seconds,
+                          _arguments.resume,
+                          _arguments.detect_cycles,
+                          _arguments.cycle_history,
+                          _arguments.rule,
+                          _arguments.boundary,
+                          ) for _seed in _arguments.seeds]
+    try:
+        _batch = run_batch(_configs, _arguments.processes)
+    except ValueError as _error:
+        print(f'game_of_life run: error: {_error}', file=sys.stderr)
+        return 2
+    for _statistics in _batch:
+        _cycle = ''
+        if _statistics['cycle_period']:
+            _cycle = f'  period: {_statistics["cycle_period"]} from generation {_statistics["cycle_start"]}'
+        print(f'seed: {_statistics["seed"]}  generations: {_statistics["generations"]}  '
+              f'population: {_statistics["initial_population"]} -> {_statistics["final_population"]}  '
+              f'gen/s: {_statistics["generations_per_second"] or 0:.1f}{_cycle}')
+    return 0
+
+
+if __name__ == '__main__':
+    exit(cli())
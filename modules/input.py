@@ -11,9 +11,16 @@
 # ---------------------------------------------------------------------------
 """Input Handler Class."""
 from collections import namedtuple
+from typing import Optional
 
 import pygame
 
+# longest an idle main loop sleeps waiting for input before it looks around again, in seconds
+IDLE_TIMEOUT = 1.0
+
+# events after which the window content is gone or stale and has to be drawn again as a whole
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN, pygame.WINDOWRESTORED)
+
 
 class InputHandler:
     """Handler Class."""
@@ -26,6 +33,8 @@ class InputHandler:
         self._key_pressed = False
         self._button_pressed = False
         self._locked = False
+        # event taken off the queue while waiting, handled by the next poll
+        self._waited = []
 
     def lock(self):
         """Set internal lock."""
@@ -53,13 +62,29 @@ class InputHandler:
         """Return the internal boolean value."""
         return self._key_pressed
 
+    def wait(self, timeout: Optional[float] = IDLE_TIMEOUT) -> bool:
+        """Sleep until an input event arrives or timeout seconds passed, returns True if an event arrived."""
+        _event = pygame.event.wait() if timeout is None else pygame.event.wait(max(int(timeout * 1000), 1))
+        if _event.type == pygame.NOEVENT:
+            return False
+        self._waited.append(_event)
+        return True
+
     def poll(self):
         """Poll for input events."""
         event_x = 0
         event_y = 0
         event_button = 0
         event_key = ''
-        for event in pygame.event.get():
+        # wheel clicks and the distance dragged with the middle button held, for zooming and panning the playfield
+        wheel = 0
+        drag_x = 0
+        drag_y = 0
+        exposed = False
+        # how many there were tells the main loop whether anything on screen may have to change
+        events = self._waited + pygame.event.get()
+        self._waited = []
+        for event in events:
             if event.type == pygame.QUIT:
                 # set the _running boolean to false.
                 self._running = False
@@ -76,8 +101,27 @@ class InputHandler:
             elif event.type == pygame.KEYUP:
                 self._locked = False
                 self._key_pressed = False
+            if event.type == pygame.MOUSEWHEEL:
+                wheel += event.y
+            elif event.type == pygame.MOUSEMOTION and event.buttons[1]:
+                drag_x += event.rel[0]
+                drag_y += event.rel[1]
+            if event.type in EXPOSE_EVENTS:
+                exposed = True
 
         mouse_x, mouse_y = pygame.mouse.get_pos()
 
-        HandlerPoll = namedtuple('HandlerPoll', ['x', 'y', 'event_x', 'event_y', 'event_button', 'event_key'])
-        return HandlerPoll(mouse_x, mouse_y, event_x, event_y, event_button, event_key)
+        HandlerPoll = namedtuple('HandlerPoll', ['x',
+                                                 'y',
+                                                 'event_x',
+                                                 'event_y',
+                                                 'event_button',
+                                                 'event_key',
+                                                 'wheel',
+                                                 'drag_x',
+                                                 'drag_y',
+                                                 'events',
+                                                 'exposed',
+                                                 ])
+        return HandlerPoll(mouse_x, mouse_y, event_x, event_y, event_button, event_key, wheel, drag_x, drag_y,
+                           len(events), exposed)
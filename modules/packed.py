@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - packed
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 13:45
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Bit-packed playfield factories and simulation.
+
+Every row is stored as an array of uint64 words holding 64 cells each, cell x lives in bit x % 64 of word x // 64.
+The generation step adds up the eight neighbour bit planes with full adders, so one bitwise operation handles 64
+cells at once.
+"""
+from collections import namedtuple
+from typing import List, Union
+
+from modules.boundary import halo_rows
+from modules.rules import CONWAY, Rule, count_groups, parse_rule
+
+import numpy
+
+PackedField = namedtuple('PackedField', ['width', 'words'])
+
+_WORD_BITS = 64
+_ONE = numpy.uint64(1)
+_TOP_BIT = numpy.uint64(_WORD_BITS - 1)
+
+
+def _validate_size(_playfield_height: int, _playfield_width: int):
+    """Raise the same errors as generate_playfield for invalid dimensions."""
+    if _playfield_height <= 0 or _playfield_width <= 0:
+        raise ValueError('Height and width must be positive')
+
+    if _playfield_height == 1 and _playfield_width == 1:
+        raise ValueError('At least one dimension must be greater than one')
+
+
+def _word_count(_playfield_width: int) -> int:
+    """Return the number of words needed for a row."""
+    return (_playfield_width + _WORD_BITS - 1) // _WORD_BITS
+
+
+def _edge_mask(_playfield_width: int) -> numpy.uint64:
+    """Return the mask of valid bits in the last word of a row."""
+    _used = _playfield_width % _WORD_BITS
+    return numpy.uint64((1 << _used) - 1 if _used else (1 << _WORD_BITS) - 1)
+
+
+def generate_packed_playfield(_playfield_height: int, _playfield_width: int) -> PackedField:
+    """Create an empty packed playfield with the specified height and width."""
+    _validate_size(_playfield_height, _playfield_width)
+    return PackedField(_playfield_width, numpy.zeros((_playfield_height, _word_count(_playfield_width)), numpy.uint64))
+
+
+def generate_seeded_packed_playfield(
+    _playfield_height: int,
+    _playfield_width: int,
+    _number_of_seeded_cells: int,
+    _seed: Union[None, int, numpy.random.Generator] = None,
+) -> PackedField:
+    """Create a seeded packed playfield, _seed is an int seed or a numpy Generator to draw from."""
+    _packed = generate_packed_playfield(_playfield_height, _playfield_width)
+
+    # Validate the _number_of_seeded_cells input
+    _number_of_seeded_cells = int(_number_of_seeded_cells)
+    _playfield_size = _playfield_height * _playfield_width
+    if _number_of_seeded_cells < 0:
+        raise ValueError(f'_number_of_seeded_cells too small: must be in the range [0, {_playfield_size}]')
+
+    if _number_of_seeded_cells > _playfield_size:
+        raise ValueError(f'_number_of_seeded_cells too large: must be in the range [0, {_playfield_size}]')
+
+    # Choosing flat indices does not materialize the cells, set the chosen bits in one go
+    _indices = numpy.random.default_rng(_seed).choice(_playfield_size, _number_of_seeded_cells, replace=False)
+    _rows, _columns = numpy.divmod(_indices, _playfield_width)
+    _bits = numpy.left_shift(_ONE, (_columns % _WORD_BITS).astype(numpy.uint64))
+    numpy.bitwise_or.at(_packed.words, (_rows, _columns // _WORD_BITS), _bits)
+    return _packed
+
+
+def pack_playfield(_playfield) -> PackedField:
+    """Pack a dense playfield."""
+    _cells = numpy.asarray(_playfield, dtype=numpy.uint8)
+    _height, _width = _cells.shape
+    _padded = numpy.zeros((_height, _word_count(_width) * _WORD_BITS), numpy.uint8)
+    _padded[:, :_width] = _cells
+    _bytes = numpy.packbits(_padded, axis=1, bitorder='little')
+    return PackedField(_width, _bytes.view('<u8').astype(numpy.uint64))
+
+
+def _unpack_rows(_packed: PackedField) -> numpy.ndarray:
+    """Return the cells of a packed playfield as a 2-D uint8 array."""
+    _bytes = _packed.words.astype('<u8').view(numpy.uint8)
+    return numpy.unpackbits(_bytes, axis=1, bitorder='little')[:, :_packed.width]
+
+
+def unpack_row(_packed: PackedField, _row: int) -> numpy.ndarray:
+    """Return the cells of a single row of a packed playfield as a uint8 array."""
+    return _unpack_rows(PackedField(_packed.width, _packed.words[_row:_row + 1]))[0]
+
+
+def unpack_playfield(_packed: PackedField) -> List[List[int]]:
+    """Unpack a packed playfield into a dense playfield."""
+    return _unpack_rows(_packed).tolist()
+
+
+def serialize_packed_playfield(_packed: PackedField) -> str:
+    """Create the same string representation as serialize_playfield, one row at a time."""
+    if not isinstance(_packed, PackedField):
+        raise ValueError('_packed is not a packed playfield')
+    _rows = []
+    for _row in range(_packed.words.shape[0]):
+        _cells = unpack_row(_packed, _row)
+        _rows.append('  '.join('01'[_cell] for _cell in _cells))
+    return '\n'.join(_rows)
+
+
+def _count_equals(_planes: tuple, _count: int) -> numpy.ndarray:
+    """Return the bits whose neighbour count, given as bit planes lowest first, equals count."""
+    _mask = None
+    for _bit, _plane in enumerate(_planes):
+        _term = _plane if _count >> _bit & 1 else ~_plane
+        _mask = _term if _mask is None else _mask & _term
+    assert _mask is not None
+    return _mask
+
+
+def _match_counts(_rule: Rule, _words: numpy.ndarray, _planes: tuple) -> numpy.ndarray:
+    """Apply the birth and survival counts of a rule to every bit at once."""
+    _groups = count_groups(_rule)
+    _alive = numpy.zeros_like(_words)
+    for _count in _groups.any_state:
+        _alive |= _count_equals(_planes, _count)
+    for _count in _groups.alive_only:
+        _alive |= _words & _count_equals(_planes, _count)
+    for _count in _groups.dead_only:
+        _alive |= ~_words & _count_equals(_planes, _count)
+    return _alive
+
+
+def packed_simulation(_packed: PackedField,
+                      _rule: Union[str, Rule] = CONWAY,
+                      _boundary: str = 'dead',
+                      ) -> PackedField:
+    """Simulate a packed playfield for one generation step, cells outside are filled in by the boundary mode."""
+    _rule = parse_rule(_rule)
+    _rows = halo_rows(_packed.words, 0, _packed.words.shape[0], _boundary)
+
+    # neighbours to the west and east, carrying the edge bits over from the adjacent word
+    _west = _rows << _ONE
+    _west[:, 1:] |= _rows[:, :-1] >> _TOP_BIT
+    _east = _rows >> _ONE
+    _east[:, :-1] |= _rows[:, 1:] << _TOP_BIT
+    if _boundary != 'dead':
+        # shift the ghost columns into the bits which would otherwise read past the playfield edges
+        _last = numpy.uint64((_packed.width - 1) % _WORD_BITS)
+        _first_column = _rows[:, 0] & _ONE
+        _last_column = (_rows[:, -1] >> _last) & _ONE
+        _west[:, 0] |= _last_column if _boundary == 'torus' else _first_column
+        _east[:, -1] |= (_first_column if _boundary == 'torus' else _last_column) << _last
+
+    # full adder across west, centre and east for the rows above and below, half adder for the own row
+    _sum_full = _west ^ _rows ^ _east
+    _carry_full = (_west & _rows) | (_east & (_west ^ _rows))
+    _sum_half = _west[1:-1] ^ _east[1:-1]
+    _carry_half = _west[1:-1] & _east[1:-1]
+
+    _up_sum, _down_sum = _sum_full[:-2], _sum_full[2:]
+    _up_carry, _down_carry = _carry_full[:-2], _carry_full[2:]
+
+    # ones column of the neighbour count, carrying into the twos column
+    _ones = _up_sum ^ _sum_half ^ _down_sum
+    _ones_carry = (_up_sum & _sum_half) | (_down_sum & (_up_sum ^ _sum_half))
+
+    # twos column from four carries, the carries out of it give the fours column
+    _twos_partial = _up_carry ^ _carry_half ^ _down_carry
+    _fours = (_up_carry & _carry_half) | (_down_carry & (_up_carry ^ _carry_half))
+    _twos = _twos_partial ^ _ones_carry
+    _fours_carry = _twos_partial & _ones_carry
+
+    if _rule == CONWAY:
+        # anything carried into the fours column means four or more neighbours
+        _alive = _twos & ~(_fours | _fours_carry) & (_ones | _packed.words)
+    else:
+        _planes = (_ones, _twos, _fours ^ _fours_carry, _fours & _fours_carry)
+        _alive = _match_counts(_rule, _packed.words, _planes)
+    _alive[:, -1] &= _edge_mask(_packed.width)
+    return PackedField(_packed.width, _alive)
+
+
+if __name__ == '__main__':
+    pass
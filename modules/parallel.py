@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - parallel
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 15:05
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Multi-core simulation on shared memory.
+
+The playfield lives in two shared memory buffers, the worker processes step horizontal strips with a one row halo
+from the current buffer into the next one, so only strip boundaries travel between the processes each generation.
+"""
+import atexit
+import os
+import time
+from collections import namedtuple
+from contextlib import suppress
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from modules.boundary import halo_rows, pad_array, validate_boundary
+from modules.rules import CONWAY, Rule, parse_rule
+from modules.vectorized import padded_simulation
+
+import numpy
+
+ScalingResult = namedtuple('ScalingResult', ['workers', 'seconds', 'speedup'])
+
+# shared buffers attached inside every worker process
+_worker_buffers: Dict[str, Tuple[SharedMemory, numpy.ndarray]] = {}
+
+
+def _attach_buffers(names: Tuple[str, str], shape: Tuple[int, int]):
+    """Attach a worker process to the shared buffers."""
+    for _name in names:
+        _memory = SharedMemory(name=_name)
+        _worker_buffers[_name] = (_memory, numpy.ndarray(shape, dtype=numpy.uint8, buffer=_memory.buf))
+
+
+def _step_strip(task: Tuple[str, str, int, int, Rule, str]):
+    """Step rows [start, end) from the source into the target buffer using a one row halo."""
+    _source_name, _target_name, _start, _end, _rule, _boundary = task
+    _source = _worker_buffers[_source_name][1]
+    _target = _worker_buffers[_target_name][1]
+    # the halo rows are real rows except at the top and bottom edge, where the boundary mode fills them in
+    _strip = halo_rows(_source, _start, _end, _boundary)
+    _target[_start:_end] = padded_simulation(pad_array(_strip, _boundary)[1:-1], _rule)
+
+
+class ParallelSimulation:
+    """Double buffered playfield stepped by a pool of worker processes."""
+
+    def __init__(self,
+                 height: int,
+                 width: int,
+                 workers: Optional[int] = None,
+                 rule: Union[str, Rule] = CONWAY,
+                 boundary: str = 'dead',
+                 ):
+        """Allocate the shared buffers and start the worker pool."""
+        self.rule = parse_rule(rule)
+        self.boundary = validate_boundary(boundary)
+        self.height = height
+        self.width = width
+        self.workers = workers or os.cpu_count() or 1
+        self._memory = [SharedMemory(create=True, size=max(height * width, 1)) for _ in range(2)]
+        self._fields = [numpy.ndarray((height, width), dtype=numpy.uint8, buffer=_memory.buf)
+                        for _memory in self._memory]
+        for _field in self._fields:
+            _field.fill(0)
+        self._current = 0
+        _names = (self._memory[0].name, self._memory[1].name)
+        self._pool = Pool(self.workers, initializer=_attach_buffers, initargs=(_names, (height, width)))
+        _bounds = numpy.linspace(0, height, min(self.workers, height) + 1).astype(int)
+        self._strips = [(int(_start), int(_end)) for _start, _end in zip(_bounds[:-1], _bounds[1:]) if _end > _start]
+
+    @property
+    def field(self) -> numpy.ndarray:
+        """Return the current generation, a view onto shared memory valid until the next step."""
+        return self._fields[self._current]
+
+    def load(self, playfield):
+        """Copy a dense playfield into the current buffer."""
+        numpy.copyto(self.field, numpy.asarray(playfield, dtype=numpy.uint8))
+
+    def simulate(self, generations: int = 1):
+        """Simulate generation steps, the workers write into the back buffer which then becomes current."""
+        for _ in range(generations):
+            _source = self._memory[self._current].name
+            _target = self._memory[self._current ^ 1].name
+            _tasks = [(_source, _target, _start, _end, self.rule, self.boundary) for _start, _end in self._strips]
+            self._pool.map(_step_strip, _tasks)
+            self._current ^= 1
+
+    def close(self):
+        """Stop the workers and release the shared memory."""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        self._fields = []
+        for _memory in self._memory:
+            # views handed out through field keep the mapping alive until they are gone
+            with suppress(BufferError):
+                _memory.close()
+            _memory.unlink()
+
+    def __enter__(self):
+        """Enter the context."""
+        return self
+
+    def __exit__(self, *_args):
+        """Release all resources when leaving the context."""
+        self.close()
+
+
+# simulation reused by the parallel engine as long as the playfield size does not change
+_engine: Dict[str, ParallelSimulation] = {}
+
+
+def _close_engine():
+    """Release the engine at interpreter exit."""
+    if 'simulation' in _engine:
+        _engine.pop('simulation').close()
+
+
+atexit.register(_close_engine)
+
+
+def parallel_simulation(playfield, rule: Union[str, Rule] = CONWAY, boundary: str = 'dead') -> numpy.ndarray:
+    """
+    Simulate a playfield for one generation step on all cores.
+
+    Drop-in backend for modules.simulation.simulation, returns a view onto shared memory which is reused by the
+    generation after next.
+    """
+    _playfield = numpy.asarray(playfield, dtype=numpy.uint8)
+    _simulation = _engine.get('simulation')
+    if _simulation is None or _playfield.shape != (_simulation.height, _simulation.width):
+        _close_engine()
+        _simulation = _engine['simulation'] = ParallelSimulation(*_playfield.shape)
+    if not numpy.shares_memory(_playfield, _simulation.field):
+        _simulation.load(_playfield)
+    _simulation.rule = parse_rule(rule)
+    _simulation.boundary = validate_boundary(boundary)
+    _simulation.simulate()
+    return _simulation.field
+
+
+def scaling_benchmark(size: int = 2048,
+                      generations: int = 10,
+                      worker_counts: Iterable[int] = (1, 2, 4, 8),
+                      ) -> List[ScalingResult]:
+    """Time the parallel simulation of a random field for each worker count."""
+    _playfield = (numpy.random.default_rng(0).random((size, size)) < 0.3).astype(numpy.uint8)
+    _results = []
+    _baseline = None
+    for _workers in worker_counts:
+        with ParallelSimulation(size, size, _workers) as _simulation:
+            _simulation.load(_playfield)
+            _simulation.simulate()
+            _start = time.perf_counter()
+            _simulation.simulate(generations)
+            _seconds = time.perf_counter() - _start
+        _baseline = _baseline or _seconds
+        _results.append(ScalingResult(_workers, _seconds, _baseline / _seconds))
+    return _results
+
+
+if __name__ == '__main__':
+    for _result in scaling_benchmark():
+        print(f'workers: {_result.workers:>3}  seconds: {_result.seconds:8.3f}  speedup: {_result.speedup:5.2f}')
@@ -12,76 +12,27 @@
 """Playfield factories and manipulation."""
 
 from collections import namedtuple
-from random import sample
-from typing import List, Tuple
-
+from typing import List, Optional, Tuple, Union
+
+from modules.blocked import blocked_simulation
+from modules.boundary import validate_boundary
+from modules.cycle import Cycle, CycleDetector
+from modules.field import Cell, deserialize_playfield, generate_playfield, generate_random_playfield, \
+    generate_seeded_playfield, load_pattern, read_cells, read_rle, serialize_playfield, write_cells, \
+    write_rle  # noqa: F401
 from modules.gui import colours
-from modules.simulation import simulation
-
-import pygame
-
-
-def generate_playfield(_playfield_height: int, _playfield_width: int) -> List[List[int]]:
-    """
-    Create a matrix from lists, with the specified height and width.
-
-    int _playfield_width : matrix size in x direction
-    int _playfield_height : matrix size in y direction
-    return : list[list[], ...] as a matrix
-    """
-    if _playfield_height <= 0 or _playfield_width <= 0:
-        raise ValueError('Height and width must be positive')
-
-    if _playfield_height == 1 and _playfield_width == 1:
-        raise ValueError('At least one dimension must be greater than one')
-
-    return [[0 for _ in range(_playfield_width)] for __ in range(_playfield_height)]
-
-
-Cell = namedtuple('Cell', ['row', 'cell'])
+from modules.rules import CONWAY, Rule, parse_rule
+from modules.simulation import IN_PLACE_ENGINES, get_engine
+from modules.vectorized import StepBuffers
+from modules.viewport import View, Viewport, density_mipmap
 
+import numpy
 
-def serialize_playfield(_playfield: List[List[int]]) -> str:
-    """Create a string representation of the playfield."""
-    _max_width = 3
-    _field = []
-    if not isinstance(_playfield, list):
-        raise ValueError('_playfield is not a list')
-    for _row in _playfield:
-        if not isinstance(_row, list):
-            raise ValueError('_playfield is not a list of lists')
-        _field.append(''.join([str(_cell).ljust(_max_width) for _cell in _row]).strip())
-
-    return '\n'.join(_field)
-
-
-def generate_seeded_playfield(
-    _playfield_height: int,
-    _playfield_width: int,
-    _number_of_seeded_cells: int,
-) -> List[List[int]]:
-    """Create a seeded playfield."""
-    # Create an initial playfield
-    _playfield = generate_playfield(_playfield_height, _playfield_width)
-
-    # Cast to int to be sure
-    _number_of_seeded_cells = int(_number_of_seeded_cells)
-
-    # Validate the _number_of_seeded_cells input
-    _playfield_size = _playfield_height * _playfield_width
-    if _number_of_seeded_cells < 0:
-        raise ValueError(f'_number_of_seeded_cells too small: must be in the range [0, {_playfield_size}]')
-
-    if _number_of_seeded_cells > (_playfield_height * _playfield_width):
-        raise ValueError(f'_number_of_seeded_cells too large: must be in the range [0, {_playfield_size}]')
+import pygame
 
-    # Determine and activate a random sample of cells
-    _full_set = [Cell(row, cell) for row in range(_playfield_height) for cell in range(_playfield_width)]
-    _cells_to_seed = sample(_full_set, _number_of_seeded_cells)
-    for _cell_to_seed in _cells_to_seed:
-        _playfield[_cell_to_seed.row][_cell_to_seed.cell] = 1
 
-    return _playfield
+# changed cells above which update_surface redraws the whole playfield from a pixel array
+ARRAY_RENDER_THRESHOLD = 64
 
 
 class Playfield:
@@ -90,8 +41,16 @@ class Playfield:
     def __init__(self,
                  playfield_size: Tuple[int, int],
                  surface_size: Tuple[int, int],
+                 engine: str = 'vectorized',
+                 rule: Union[str, Rule] = CONWAY,
+                 boundary: str = 'dead',
                  ):
         """Initialize the playfield class."""
+        self.engine = engine
+        self.rule = parse_rule(rule)
+        self.boundary = validate_boundary(boundary)
+        self._simulation = get_engine(engine)
+        self._simulation_into = IN_PLACE_ENGINES.get(engine)
         self.width = playfield_size[0]
         self.height = playfield_size[1]
         self._flush_colour = colours.black
@@ -99,20 +58,73 @@ class Playfield:
             pygame.init()
         self.surface = pygame.Surface((min(surface_size[0], surface_size[1]) - 20,
                                        min(surface_size[0], surface_size[1]) - 20))
-        self.field = generate_playfield(self.height, self.width)
-        self.cell_size = (min(surface_size[0], surface_size[1]) - 20) // max(self.width, self.height)
+        self._allocate(self.height, self.width)
+        self.viewport = Viewport(self.width, self.height, *self.surface.get_size())
+        # visible cells last drawn onto the surface and the view they were drawn with, None forces a full redraw
+        self._drawn: Optional[numpy.ndarray] = None
+        self._drawn_view: Optional[View] = None
+        # cell image, grid overlay and colour palette of the array renderer for the current size
+        self._render_cache: Optional[tuple] = None
+        # generations simulated since the last edit, watched by the optional cycle detector
+        self.generation = 0
+        self._cycle_detector: Optional[CycleDetector] = None
+
+    @property
+    def field(self) -> numpy.ndarray:
+        """Return the current generation, the front one of the two buffers the playfield steps between."""
+        return self._front
+
+    @field.setter
+    def field(self, playfield):
+        """Copy a playfield into the front buffer and restart from it, a different size resizes the playfield."""
+        _field = numpy.asarray(playfield, dtype=numpy.uint8)
+        if _field.shape != self._front.shape:
+            self._set_size(_field.shape[1], _field.shape[0])
+        numpy.copyto(self._front, _field)
+        self.restart()
+
+    def _allocate(self, height: int, width: int):
+        """Allocate the front and back buffer and the scratch arrays of the in place engines for a playfield size."""
+        self._front = numpy.zeros((height, width), dtype=numpy.uint8)
+        self._back = numpy.zeros((height, width), dtype=numpy.uint8)
+        self._buffers = StepBuffers(height, width)
+
+    @property
+    def cell_size(self) -> int:
+        """Return the size of a cell in pixels, 0 while zoomed out so far that cells are smaller than a pixel."""
+        return self.viewport.cell_size if not self.viewport.level else 0
+
+    @property
+    def cycle(self) -> Optional[Cycle]:
+        """Return the still life or oscillation the playfield settled into, None if none was detected yet."""
+        return self._cycle_detector.cycle if self._cycle_detector is not None else None
+
+    def detect_cycles(self, history: Optional[int] = 1024):
+        """Watch simulate for repeated generations within the given history, None switches the detection off."""
+        self._cycle_detector = CycleDetector(history) if history else None
+        self.restart()
+
+    def restart(self):
+        """Restart counting generations from the current field, called after every edit."""
+        self.generation = 0
+        if self._cycle_detector is not None:
+            self._cycle_detector.reset()
+            self._cycle_detector.observe(self.field, 0)
 
     def flush_surface(self):
-        """Flush the output surface."""
+        """Flush the output surface, the next update_surface call redraws the whole playfield."""
         self.surface.fill(self._flush_colour)
+        self._drawn = None
 
     def flip_cell(self, cell_x, cell_y):
         """Flip a playfield cell from set to unset and vice versa."""
-        self.field[cell_y][cell_x] = self.field[cell_y][cell_x] ^ 1
+        self._front[cell_y, cell_x] ^= 1
+        self.restart()
 
     def clear(self):
         """Clear the playfield, i.e. setting each cell to zero."""
-        self.field = generate_playfield(self.height, self.width)
+        self._front.fill(0)
+        self.restart()
 
     def get_size(self):
         """Return the current field size."""
@@ -125,31 +137,175 @@ class Playfield:
 
     def resize(self, new_x: int, new_y: int):
         """Resize the playfield."""
-        if not new_x < 3 and new_x <= 100 and not new_y < 3 and new_y <= 100:
-            self.width = new_x
-            self.height = new_y
-            _surface_rect = self.surface.get_rect()
-            self.cell_size = (min(_surface_rect.width, _surface_rect.height) - 20) // max(self.width, self.height)
-            self.field = generate_playfield(new_y, new_x)
-
-    def simulate(self):
-        """Simulate one generation step on the playfield."""
-        self.field = simulation(self.field)
-
-    def update_surface(self):
-        """Draw the actual playfield onto the output surface."""
-        # drawing playfield
-        start_x = 0
-        start_y = 0
-        for line in self.field:
-            for cell in line:
-                if cell == 0:
-                    pygame.draw.rect(self.surface, colours.white, (start_x, start_y, self.cell_size, self.cell_size), 1)
-                elif cell == 1:
-                    pygame.draw.rect(self.surface, colours.blue, (start_x, start_y, self.cell_size, self.cell_size))
-                    pygame.draw.rect(self.surface, colours.white, (start_x, start_y, self.cell_size, self.cell_size), 1)
-                else:
-                    pass
-                start_x += self.cell_size
-            start_x = 0
-            start_y += self.cell_size
+        if not new_x < 3 and not new_y < 3:
+            self._set_size(new_x, new_y)
+            self.restart()
+
+    def _set_size(self, width: int, height: int):
+        """Take on a new size with empty buffers, showing the whole playfield."""
+        self.width = width
+        self.height = height
+        self.viewport.set_field_size(width, height)
+        self._allocate(height, width)
+        self.invalidate_surface()
+
+    def set_engine(self, engine: str):
+        """Select the simulation backend used by simulate."""
+        self._simulation = get_engine(engine)
+        self._simulation_into = IN_PLACE_ENGINES.get(engine)
+        self.engine = engine
+
+    def set_rule(self, rule: Union[str, Rule]):
+        """Select the life-like rule used by simulate, given in B/S notation or by name."""
+        self.rule = parse_rule(rule)
+        self.restart()
+
+    def set_boundary(self, boundary: str):
+        """Select what simulate finds beyond the playfield edges, dead cells, the opposite edge or a mirror image."""
+        self.boundary = validate_boundary(boundary)
+        self.restart()
+
+    def simulate(self) -> Optional[Cycle]:
+        """
+        Simulate one generation step on the playfield, returns the cycle once the detector found one.
+
+        The engine writes the next generation into the back buffer which then becomes the front buffer, engines able
+        to do so in place step without allocating anything.
+        """
+        if self._simulation_into is not None:
+            self._simulation_into(self._front, self._back, self._buffers, self.rule, self.boundary)
+        else:
+            numpy.copyto(self._back, self._simulation(self._front, self.rule, self.boundary), casting='unsafe')
+        self._front, self._back = self._back, self._front
+        self.generation += 1
+        if self._cycle_detector is None or self._cycle_detector.cycle is not None:
+            return self.cycle
+        return self._cycle_detector.observe(self.field, self.generation)
+
+    def step(self, generations: int = 1) -> Optional[Cycle]:
+        """
+        Simulate a number of generation steps, returns the cycle once the detector found one.
+
+        Many generations at once go through the time blocked engine, which computes several of them per pass over the
+        playfield, unless the cycle detector has to see every generation.
+        """
+        if generations < 0:
+            raise ValueError('generations must not be negative')
+        if generations == 1 or (self._cycle_detector is not None and self._cycle_detector.cycle is None):
+            for _ in range(generations):
+                self.simulate()
+            return self.cycle
+        if generations:
+            # stepped on, not edited, so the generation count goes on
+            numpy.copyto(self._front, blocked_simulation(self._front, self.rule, self.boundary, generations))
+            self.generation += generations
+        return self.cycle
+
+    def invalidate_surface(self):
+        """Force the next update_surface call to redraw the whole playfield."""
+        self._drawn = None
+
+    def _draw_cell(self, cell_x: int, cell_y: int, cell: int):
+        """Draw a single cell onto the output surface."""
+        _rect = self.viewport.cell_rect(cell_x, cell_y)
+        if cell == 0:
+            pygame.draw.rect(self.surface, colours.white, _rect, 1)
+        elif cell == 1:
+            pygame.draw.rect(self.surface, colours.blue, _rect)
+            pygame.draw.rect(self.surface, colours.white, _rect, 1)
+        else:
+            pass
+
+    def render_cells(self, field: numpy.ndarray):
+        """Draw the visible cells with one or two draw calls per cell."""
+        self.surface.fill(self._flush_colour)
+        _view = self.viewport.view()
+        for _cell_y in range(_view.y0, _view.y1):
+            for _cell_x in range(_view.x0, _view.x1):
+                self._draw_cell(_cell_x, _cell_y, field[_cell_y][_cell_x])
+
+    def render_array(self, field: numpy.ndarray):
+        """Draw the visible cells from a one pixel per cell image scaled up and overlaid with the grid lines."""
+        _view = self.viewport.view()
+        if not _view.cell_size:
+            self.render_density(field)
+            return
+        self.surface.fill(self._flush_colour)
+        _window = field[_view.y0:_view.y1, _view.x0:_view.x1]
+        _height, _width = _window.shape
+        _key = (_width, _height, _view.cell_size)
+        if self._render_cache is None or self._render_cache[0] != _key:
+            _grid_width = _width * _view.cell_size
+            _grid_height = _height * _view.cell_size
+            _image = pygame.Surface((_width, _height), 0, self.surface)
+            _scaled = pygame.Surface((_grid_width, _grid_height), 0, self.surface)
+            _grid = pygame.Surface((_grid_width, _grid_height), 0, self.surface)
+            _grid.fill(self._flush_colour)
+            _grid.set_colorkey(self._flush_colour)
+            # the outlines of all columns and rows together give the outline of every cell
+            for _line in range(_width):
+                pygame.draw.rect(_grid, colours.white, (_line * _view.cell_size, 0, _view.cell_size, _grid_height), 1)
+            for _line in range(_height):
+                pygame.draw.rect(_grid, colours.white, (0, _line * _view.cell_size, _grid_width, _view.cell_size), 1)
+            _palette = numpy.array([_image.map_rgb(self._flush_colour), _image.map_rgb(colours.blue)])
+            self._render_cache = (_key, _image, _scaled, _grid, _palette)
+        _, _image, _scaled, _grid, _palette = self._render_cache
+        # surfarray is indexed [x, y], hence the transposed field
+        pygame.surfarray.blit_array(_image, _palette[(_window.T == 1).astype(numpy.intp)])
+        pygame.transform.scale(_image, _scaled.get_size(), _scaled)
+        self.surface.blit(_scaled, (_view.offset_x, _view.offset_y))
+        self.surface.blit(_grid, (_view.offset_x, _view.offset_y))
+
+    def render_density(self, field: numpy.ndarray):
+        """Draw the visible cells zoomed out, one pixel per block of cells shaded by the share of live cells in it."""
+        self.surface.fill(self._flush_colour)
+        _view = self.viewport.view()
+        _density = density_mipmap(numpy.asarray(field)[_view.y0:_view.y1, _view.x0:_view.x1], _view.level)
+        # any live cell at all keeps a block visible against the background
+        _shade = numpy.where(_density > 0, 64 + _density * 191, 0).astype(numpy.uint8)
+        _image = pygame.Surface(_density.shape[::-1], 0, self.surface)
+        _pixels = pygame.surfarray.pixels3d(_image)
+        _pixels[..., 2] = _shade.T
+        del _pixels
+        self.surface.blit(_image, (_view.offset_x, _view.offset_y))
+
+    def _view_rect(self, view: View) -> pygame.Rect:
+        """Return the surface area covered by the visible cells of a view."""
+        if view.cell_size:
+            _width = (view.x1 - view.x0) * view.cell_size
+            _height = (view.y1 - view.y0) * view.cell_size
+        else:
+            _width = -(-(view.x1 - view.x0) >> view.level)
+            _height = -(-(view.y1 - view.y0) >> view.level)
+        return pygame.Rect(view.offset_x, view.offset_y, _width, _height).clip(self.surface.get_rect())
+
+    def update_surface(self) -> List[pygame.Rect]:
+        """
+        Draw the visible part of the playfield onto the output surface.
+
+        Only cells which differ from the last drawn field are redrawn, returns the changed areas in surface
+        coordinates for passing on to pygame.display.update. Full redraws, larger changes and zoomed out views render
+        the visible cells from a pixel array instead of drawing cell by cell.
+        """
+        _view = self.viewport.view()
+        _window = self.field[_view.y0:_view.y1, _view.x0:_view.x1]
+        if self._drawn is None or self._drawn_view != _view:
+            # drawing playfield
+            self.render_array(self.field)
+            self._drawn = _window.copy()
+            self._drawn_view = _view
+            return [self.surface.get_rect()]
+        _changed = numpy.argwhere(_window != self._drawn)
+        if len(_changed) > ARRAY_RENDER_THRESHOLD or (len(_changed) and not _view.cell_size):
+            self.render_array(self.field)
+            self._drawn[...] = _window
+            return [self._view_rect(_view)]
+        _dirty = []
+        _bounds = self.surface.get_rect()
+        for _cell_y, _cell_x in _changed:
+            _rect = pygame.Rect(self.viewport.cell_rect(_view.x0 + _cell_x, _view.y0 + _cell_y))
+            self.surface.fill(self._flush_colour, _rect)
+            self._draw_cell(_view.x0 + _cell_x, _view.y0 + _cell_y, _window[_cell_y, _cell_x])
+            _dirty.append(_rect.clip(_bounds))
+        self._drawn[...] = _window
+        return _dirty
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - rules
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 18.10.26 - 00:40
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Life-like rules in B/S notation.
+
+A rule lists the neighbour counts giving birth to a dead cell and the ones letting a live cell survive, B3/S23 being
+Conways game of life. Every rule compiles once into lookup tables shared by all engines, a 2x9 table indexed by cell
+state and neighbour count and a 512 entry table indexed by the bits of a whole 3x3 neighbourhood.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, Union
+
+import numpy
+
+_NOTATION = re.compile(r'^B(?P<birth>[0-8]*)/S(?P<survival>[0-8]*)$', re.IGNORECASE)
+_NOTATION_SURVIVAL_FIRST = re.compile(r'^S(?P<survival>[0-8]*)/B(?P<birth>[0-8]*)$', re.IGNORECASE)
+_NOTATION_LEGACY = re.compile(r'^(?P<survival>[0-8]*)/(?P<birth>[0-8]*)$')
+
+# bit of the centre cell in a 3x3 neighbourhood index, the bits run row by row from the top left cell
+CENTRE_BIT = 4
+
+
+# neighbour counts setting a cell regardless of its state, only if it is alive and only if it is dead
+CountGroups = namedtuple('CountGroups', ['any_state', 'alive_only', 'dead_only'])
+
+
+class Rule(namedtuple('Rule', ['birth', 'survival'])):
+    """Neighbour counts of birth and survival as frozensets."""
+
+    __slots__ = ()
+
+    def __str__(self) -> str:
+        """Return the rule in B/S notation."""
+        return f'B{"".join(map(str, sorted(self.birth)))}/S{"".join(map(str, sorted(self.survival)))}'
+
+
+CONWAY = Rule(frozenset({3}), frozenset({2, 3}))
+
+# well known rules selectable by name instead of notation
+RULES: Dict[str, Rule] = {
+    'life': CONWAY,
+    'highlife': Rule(frozenset({3, 6}), frozenset({2, 3})),
+    'daynight': Rule(frozenset({3, 6, 7, 8}), frozenset({3, 4, 6, 7, 8})),
+    'seeds': Rule(frozenset({2}), frozenset()),
+    'lifewithoutdeath': Rule(frozenset({3}), frozenset(range(9))),
+}
+
+
+@lru_cache(maxsize=None)
+def _parse_notation(notation: str) -> Rule:
+    """Parse a rule name or a rule in B/S, S/B or legacy survival/birth notation."""
+    _notation = notation.strip()
+    if _notation.lower() in RULES:
+        return RULES[_notation.lower()]
+    for _pattern in (_NOTATION, _NOTATION_SURVIVAL_FIRST, _NOTATION_LEGACY):
+        _match = _pattern.match(_notation)
+        if _match:
+            return Rule(frozenset(map(int, _match['birth'])), frozenset(map(int, _match['survival'])))
+    raise ValueError(f'Invalid rule {notation!r}: must be B/S notation like B3/S23 or one of {", ".join(RULES)}')
+
+
+def parse_rule(rule: Union[str, Rule]) -> Rule:
+    """Return the rule for a notation or rule name, rules are passed through unchanged."""
+    if isinstance(rule, Rule):
+        return rule
+    return _parse_notation(rule)
+
+
+@lru_cache(maxsize=None)
+def transition_table(rule: Rule) -> numpy.ndarray:
+    """Return the read-only 2x9 table of the next cell state indexed by current state and neighbour count."""
+    _table = numpy.zeros((2, 9), dtype=numpy.uint8)
+    _table[0, sorted(rule.birth)] = 1
+    _table[1, sorted(rule.survival)] = 1
+    _table.flags.writeable = False
+    return _table
+
+
+@lru_cache(maxsize=None)
+def count_groups(rule: Rule) -> CountGroups:
+    """Split the neighbour counts of a rule by the cell states they apply to, for engines comparing whole arrays."""
+    _table = transition_table(rule)
+    return CountGroups(tuple(numpy.flatnonzero(_table[0] & _table[1]).tolist()),
+                       tuple(numpy.flatnonzero(_table[1] & ~_table[0]).tolist()),
+                       tuple(numpy.flatnonzero(_table[0] & ~_table[1]).tolist()))
+
+
+@lru_cache(maxsize=None)
+def neighbourhood_table(rule: Rule) -> numpy.ndarray:
+    """Return the read-only 512 entry table of the next centre cell state indexed by the bits of its neighbourhood."""
+    _index = numpy.arange(512)
+    _bits = (_index[:, None] >> numpy.arange(9)) & 1
+    _centre = _bits[:, CENTRE_BIT]
+    _table = transition_table(rule)[_centre, _bits.sum(axis=1) - _centre]
+    _table.flags.writeable = False
+    return _table
+
+
+if __name__ == '__main__':
+    pass
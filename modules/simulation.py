@@ -10,50 +10,66 @@
 # ---------------------------------------------------------------------------
 
 """Conways game of life simulation function."""
+from typing import Callable, Dict, Union
 
+from modules.active import active_simulation
+from modules.blocked import blocked_simulation
+from modules.boundary import pad_rows
+from modules.parallel import parallel_simulation
+from modules.rules import CONWAY, Rule, parse_rule, transition_table
+from modules.vectorized import vectorized_simulation, vectorized_simulation_into
 
-def simulation(playfield: list) -> list:
-    """Simulate a playfield for one generation step."""
+
+def simulation(playfield: list, rule: Union[str, Rule] = CONWAY, boundary: str = 'dead') -> list:
+    """Simulate a playfield for one generation step under a life-like rule, Conways game of life by default."""
+    # next cell state indexed by current state and neighbour count
+    _table = transition_table(parse_rule(rule)).tolist()
     _playfield_height = len(playfield)
     _playfield_width = len(playfield[0])
+    # surrounding the playfield with ghost cells filled in by the boundary mode saves checking the edges
+    _padded = pad_rows(playfield, boundary)
     new_playfield = []
     for _line in range(_playfield_height):
+        _above = _padded[_line]
+        _row = _padded[_line + 1]
+        _below = _padded[_line + 2]
         _new_line = []
         for _cell in range(_playfield_width):
-            _cell_current = playfield[_line][_cell]
-            _neighbours = 0
-
-            # evaluate neighbours if existent/possible
-            if not _line - 1 < 0 and not _cell - 1 < 0:
-                _neighbours += playfield[_line - 1][_cell - 1]
-            if not _line - 1 < 0 and not _cell < 0:
-                _neighbours += playfield[_line - 1][_cell]
-            if not _line - 1 < 0 and not _cell + 1 > _playfield_width - 1:
-                _neighbours += playfield[_line - 1][_cell + 1]
-            if not _line < 0 and not _cell - 1 < 0:
-                _neighbours += playfield[_line][_cell - 1]
-            if not _line < 0 and not _cell + 1 > _playfield_width - 1:
-                _neighbours += playfield[_line][_cell + 1]
-            if not _line + 1 > _playfield_height - 1 and not _cell - 1 < 0:
-                _neighbours += playfield[_line + 1][_cell - 1]
-            if not _line + 1 > _playfield_height - 1 and not _cell < 0:
-                _neighbours += playfield[_line + 1][_cell]
-            if not _line + 1 > _playfield_height - 1 and not _cell + 1 > _playfield_width - 1:
-                _neighbours += playfield[_line + 1][_cell + 1]
+            # evaluate neighbours, cell x of the playfield is cell x + 1 of the padded rows
+            _neighbours = _above[_cell] + _above[_cell + 1] + _above[_cell + 2] + \
+                _row[_cell] + _row[_cell + 2] + \
+                _below[_cell] + _below[_cell + 1] + _below[_cell + 2]
 
             # evaluate cell survival
-            if _cell_current == 1 and _neighbours < 2:
-                cell_out = 0
-            elif _cell_current == 1 and _neighbours > 3:
-                cell_out = 0
-            elif _cell_current == 0 and _neighbours == 3:
-                cell_out = 1
-            else:
-                cell_out = _cell_current
-            _new_line.append(cell_out)
+            _new_line.append(_table[_row[_cell + 1]][_neighbours])
         new_playfield.append(_new_line)
     return new_playfield
 
 
+# simulation backends selectable by name, each takes a playfield and optionally a rule and a boundary mode and returns
+# the next generation
+ENGINES: Dict[str, Callable] = {
+    'reference': simulation,
+    'vectorized': vectorized_simulation,
+    'parallel': parallel_simulation,
+    'active': active_simulation,
+    'blocked': blocked_simulation,
+}
+
+
+# backends writing the next generation into a preallocated array from preallocated scratch buffers, they take the
+# playfield, the output array, a modules.vectorized.StepBuffers and optionally a rule and a boundary mode
+IN_PLACE_ENGINES: Dict[str, Callable] = {
+    'vectorized': vectorized_simulation_into,
+}
+
+
+def get_engine(name: str) -> Callable:
+    """Return the simulation backend registered under name."""
+    if name not in ENGINES:
+        raise ValueError(f'Unknown engine {name!r}: must be one of {", ".join(sorted(ENGINES))}')
+    return ENGINES[name]
+
+
 if __name__ == '__main__':
     pass
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - snapshot
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 22:05
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Binary playfield snapshots.
+
+A snapshot is an 80 byte header holding dimensions, generation, rule, engine and boundary followed by the cells
+bit-packed in the layout of modules.packed, uncompressed snapshots are memory mapped on load so reopening them is
+instant no matter their size.
+"""
+import struct
+import zlib
+from collections import namedtuple
+
+from modules import core
+from modules.packed import PackedField, pack_playfield
+from modules.sparse import SparseField
+
+import numpy
+
+Snapshot = namedtuple('Snapshot', ['width', 'height', 'generation', 'rule', 'engine', 'field', 'boundary'])
+
+SNAPSHOT_MAGIC = b'GOLS'
+SNAPSHOT_VERSION = 1
+
+# magic, version, compression, width, height, generation, rule, engine, boundary, padding to 80 bytes, the rule field
+# fits the longest B/S notation B012345678/S012345678
+_HEADER = struct.Struct('<4sBBQQQ24s16s8s2x')
+_RAW = 0
+_ZLIB = 1
+
+
+def _to_packed(_playfield) -> PackedField:
+    """Convert any playfield representation into a packed playfield."""
+    if isinstance(_playfield, PackedField):
+        return _playfield
+    if isinstance(_playfield, SparseField):
+        _playfield = _playfield.to_playfield()
+    return pack_playfield(_playfield)
+
+
+def save_snapshot(filename: str,
+                  playfield,
+                  generation: int = 0,
+                  rule: str = 'B3/S23',
+                  engine: str = 'reference',
+                  compress: bool = False,
+                  boundary: str = 'dead',
+                  ) -> bool:
+    """Save a playfield of any representation as binary snapshot, compressed snapshots can not be memory mapped."""
+    _packed = _to_packed(playfield)
+    _payload = _packed.words.astype('<u8', copy=False).tobytes()
+    if compress:
+        _payload = zlib.compress(_payload)
+    _fields = {'rule': (rule, 24), 'engine': (engine, 16), 'boundary': (boundary, 8)}
+    for _name, (_value, _size) in _fields.items():
+        if len(_value.encode('ascii')) > _size:
+            raise ValueError(f'{_name} {_value} is longer than the {_size} characters a snapshot holds')
+    _header = _HEADER.pack(SNAPSHOT_MAGIC,
+                           SNAPSHOT_VERSION,
+                           _ZLIB if compress else _RAW,
+                           _packed.width,
+                           _packed.words.shape[0],
+                           generation,
+                           rule.encode('ascii'),
+                           engine.encode('ascii'),
+                           boundary.encode('ascii'))
+    return core.raw_to_file(filename, _header + _payload)
+
+
+def load_snapshot(filename: str) -> Snapshot:
+    """
+    Load a binary snapshot.
+
+    The cells of an uncompressed snapshot are a read-only numpy.memmap onto the file, nothing beyond the header is
+    read until the cells are accessed.
+    """
+    _map = core.file_to_mmap(filename)
+    try:
+        _magic, _version, _compression, _width, _height, _generation, _rule, _engine, _boundary = \
+            _HEADER.unpack_from(_map)
+    except struct.error as _error:
+        raise ValueError(f'{filename} is too short to be a snapshot') from _error
+    finally:
+        _map.close()
+    if _magic != SNAPSHOT_MAGIC:
+        raise ValueError(f'{filename} is not a snapshot')
+    if _version != SNAPSHOT_VERSION:
+        raise ValueError(f'Unsupported snapshot version {_version}')
+    _shape = (_height, -(-_width // 64))
+    _words: numpy.ndarray
+    if _compression == _RAW:
+        _words = numpy.memmap(filename, dtype='<u8', mode='r', offset=_HEADER.size, shape=_shape)
+    elif _compression == _ZLIB:
+        _raw = core.file_to_raw(filename, binary=True)
+        assert isinstance(_raw, bytes)
+        _words = numpy.frombuffer(zlib.decompress(_raw[_HEADER.size:]), dtype='<u8').reshape(_shape)
+    else:
+        raise ValueError(f'Unknown snapshot compression {_compression}')
+    return Snapshot(_width,
+                    _height,
+                    _generation,
+                    _rule.rstrip(b'\0').decode('ascii'),
+                    _engine.rstrip(b'\0').decode('ascii'),
+                    PackedField(_width, _words),
+                    _boundary.rstrip(b'\0').decode('ascii'))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - sparse
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 11:02
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""Sparse playfield storing only the live cells."""
+from collections import Counter, namedtuple
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from modules.boundary import validate_boundary
+from modules.rules import CONWAY, Rule, parse_rule
+from modules.vectorized import NEIGHBOUR_OFFSETS
+
+
+class SparseField:
+    """
+    Playfield holding the coordinates of its live cells in a set.
+
+    The cost of a generation step depends on the live population only, so huge and mostly empty fields are cheap.
+    With width and height given the field is bounded and behaves like the dense playfield, i.e. everything outside
+    counts as dead, leaving them as None makes the universe unbounded.
+    """
+
+    def __init__(self,
+                 width: Optional[int] = None,
+                 height: Optional[int] = None,
+                 cells: Iterable[Tuple[int, int]] = (),
+                 ):
+        """Initialize the sparse field, cells are given as (x, y) tuples."""
+        self.width = width
+        self.height = height
+        self.cells: Set[Tuple[int, int]] = set()
+        for _x, _y in cells:
+            if self.inside(_x, _y):
+                self.cells.add((_x, _y))
+
+    @classmethod
+    def from_playfield(cls, playfield) -> 'SparseField':
+        """Create a bounded sparse field from a dense playfield."""
+        _cells = [(_x, _y) for _y, _row in enumerate(playfield) for _x, _cell in enumerate(_row) if _cell == 1]
+        return cls(len(playfield[0]), len(playfield), _cells)
+
+    def to_playfield(self) -> List[List[int]]:
+        """Create a dense playfield from a bounded sparse field."""
+        if self.width is None or self.height is None:
+            raise ValueError('An unbounded field can not be converted into a playfield')
+        _playfield = [[0 for _ in range(self.width)] for __ in range(self.height)]
+        for _x, _y in self.cells:
+            _playfield[_y][_x] = 1
+        return _playfield
+
+    def inside(self, cell_x: int, cell_y: int) -> bool:
+        """Return True if the coordinate lies within the field bounds."""
+        if self.width is not None and not 0 <= cell_x < self.width:
+            return False
+        if self.height is not None and not 0 <= cell_y < self.height:
+            return False
+        return True
+
+    def get_cell(self, cell_x: int, cell_y: int) -> int:
+        """Return the state of a single cell."""
+        return int((cell_x, cell_y) in self.cells)
+
+    def flip_cell(self, cell_x: int, cell_y: int):
+        """Flip a cell from set to unset and vice versa."""
+        if not self.inside(cell_x, cell_y):
+            raise ValueError(f'Cell ({cell_x}, {cell_y}) is outside the field')
+        self.cells ^= {(cell_x, cell_y)}
+
+    def clear(self):
+        """Clear the field, i.e. removing all live cells."""
+        self.cells = set()
+
+    def get_size(self):
+        """Return the current field size, None stands for an unbounded dimension."""
+        FieldSize = namedtuple('FieldSize', ['width', 'height'])
+        return FieldSize(self.width, self.height)
+
+    def population(self) -> int:
+        """Return the number of live cells."""
+        return len(self.cells)
+
+    def bounding_box(self) -> Optional[Tuple[int, int, int, int]]:
+        """Return (min_x, min_y, max_x, max_y) of the live cells or None if the field is empty."""
+        if not self.cells:
+            return None
+        _xs = [_x for _x, _ in self.cells]
+        _ys = [_y for _, _y in self.cells]
+        return min(_xs), min(_ys), max(_xs), max(_ys)
+
+    def _ghost_cells(self, boundary: str) -> Iterator[Tuple[int, int]]:
+        """Yield the copies of the live edge cells seen from across the edges of a bounded field."""
+        _width, _height = self.width, self.height
+        # simulate asks bounded fields only for ghost cells
+        assert _width is not None and _height is not None
+        for _x, _y in self.cells:
+            if 0 < _x < _width - 1 and 0 < _y < _height - 1:
+                continue
+            if boundary == 'torus':
+                _xs = [_x] + [_x + _width] * (_x == 0) + [_x - _width] * (_x == _width - 1)
+                _ys = [_y] + [_y + _height] * (_y == 0) + [_y - _height] * (_y == _height - 1)
+            else:
+                _xs = [_x] + [-1] * (_x == 0) + [_width] * (_x == _width - 1)
+                _ys = [_y] + [-1] * (_y == 0) + [_height] * (_y == _height - 1)
+            for _ghost_y in _ys:
+                for _ghost_x in _xs:
+                    if (_ghost_x, _ghost_y) != (_x, _y):
+                        yield _ghost_x, _ghost_y
+
+    def simulate(self, rule: Union[str, Rule] = CONWAY, boundary: str = 'dead'):
+        """Simulate one generation step, only the surroundings of live cells are visited."""
+        _rule = parse_rule(rule)
+        if 0 in _rule.birth:
+            raise ValueError(f'{_rule} gives birth to cells without neighbours, a sparse field can not hold those')
+        if validate_boundary(boundary) != 'dead' and (self.width is None or self.height is None):
+            raise ValueError(f'The {boundary} boundary needs a bounded field')
+        _cells = self.cells
+        _sources = chain(_cells, self._ghost_cells(boundary)) if boundary != 'dead' else _cells
+        _neighbours: Counter = Counter()
+        for _x, _y in _sources:
+            for _dy, _dx in NEIGHBOUR_OFFSETS:
+                _neighbours[(_x + _dx, _y + _dy)] += 1
+        _next = {_cell for _cell, _count in _neighbours.items()
+                 if _count in (_rule.survival if _cell in _cells else _rule.birth)}
+        if 0 in _rule.survival:
+            # live cells without neighbours never show up in the counts
+            _next.update(_cell for _cell in _cells if _cell not in _neighbours)
+        if self.width is not None or self.height is not None:
+            _next = {(_x, _y) for _x, _y in _next if self.inside(_x, _y)}
+        self.cells = _next
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - stepper
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 19:20
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Background simulation thread.
+
+The worker steps the playfield at its own pace and hands finished generations to the render loop through three
+buffers: the worker fills the back buffer, swaps it with the ready buffer and the render loop swaps the ready buffer
+with its front buffer whenever it wants a new frame. Neither side ever waits for the other beyond a pointer swap.
+"""
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+from modules.timer import RateMeter
+
+import numpy
+
+
+class SimulationThread(threading.Thread):
+    """Thread stepping a playfield continuously at a target number of generations per second."""
+
+    def __init__(self,
+                 playfield,
+                 simulation: Callable,
+                 generations_per_second: Optional[float] = None,
+                 ):
+        """Initialize the paused worker, a rate of None steps as fast as possible."""
+        super().__init__(name='simulation', daemon=True)
+        self.simulation = simulation
+        self.generations_per_second = generations_per_second
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._running = False
+        self._stopped = False
+        self._rate = RateMeter()
+        self.generation = 0
+        self._allocate(numpy.asarray(playfield, dtype=numpy.uint8))
+
+    def _allocate(self, field: numpy.ndarray):
+        """Create the three buffers holding field, must be called with the lock held or before start."""
+        self._pending: Optional[numpy.ndarray] = field.copy()
+        self._back = field.copy()
+        self._ready = field.copy()
+        self._front = field.copy()
+        self._ready_generation = self.generation
+        self._front_generation = self.generation
+        self._fresh = False
+
+    def load(self, playfield, generation: int = 0):
+        """Restart the simulation from a playfield, e.g. after the user edited it, called from the render side."""
+        _field = numpy.asarray(playfield, dtype=numpy.uint8)
+        with self._lock:
+            self.generation = generation
+            if _field.shape != self._front.shape:
+                self._allocate(_field)
+            else:
+                self._pending = _field.copy()
+                numpy.copyto(self._front, _field)
+                self._front_generation = generation
+                self._fresh = False
+
+    def acquire(self) -> Tuple[int, numpy.ndarray]:
+        """Return the latest completed generation and its number, the array is owned by the caller until next call."""
+        with self._lock:
+            if self._fresh:
+                self._front, self._ready = self._ready, self._front
+                self._front_generation = self._ready_generation
+                self._fresh = False
+        return self._front_generation, self._front
+
+    def running(self) -> bool:
+        """Return True while the worker steps the playfield."""
+        return self._running
+
+    def resume(self):
+        """Start stepping the playfield."""
+        self._running = True
+        self._wake.set()
+
+    def pause(self):
+        """Stop stepping the playfield after the current generation."""
+        self._running = False
+
+    def toggle(self):
+        """Pause a running and resume a paused worker."""
+        if self._running:
+            self.pause()
+        else:
+            self.resume()
+
+    def stop(self):
+        """End the worker thread."""
+        self._stopped = True
+        self._wake.set()
+
+    def rate(self) -> float:
+        """Return the achieved generations per second."""
+        return self._rate.rate()
+
+    def run(self):
+        """Step generations until stopped."""
+        _current = None
+        _deadline = time.perf_counter()
+        while not self._stopped:
+            if not self._running:
+                self._wake.wait()
+                self._wake.clear()
+                _deadline = time.perf_counter()
+                continue
+            with self._lock:
+                if self._pending is not None:
+                    _current, self._pending = self._pending, None
+                _generation = self.generation
+                _back = self._back
+            _next = self.simulation(_current)
+            # the back buffer belongs to the worker, only the swap needs the lock
+            numpy.copyto(_back, _next)
+            with self._lock:
+                if self._pending is None and self._back is _back:
+                    self._back, self._ready = self._ready, self._back
+                    self.generation = self._ready_generation = _generation + 1
+                    self._fresh = True
+                    _current = _next
+            self._rate.tick()
+            if self.generations_per_second:
+                _deadline += 1 / self.generations_per_second
+                _delay = _deadline - time.perf_counter()
+                if _delay > 0:
+                    if self._wake.wait(_delay):
+                        self._wake.clear()
+                else:
+                    _deadline = time.perf_counter()
+
+
+if __name__ == '__main__':
+    pass
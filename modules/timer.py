@@ -11,17 +11,65 @@
 # ---------------------------------------------------------------------------
 
 """Timer class."""
+import csv
+import io
 import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from modules import core
+
+import numpy
+
+Percentiles = namedtuple('Percentiles', ['p50', 'p95', 'p99'])
+
+# phases of the main loop recorded by default
+PROFILE_PHASES = ('poll', 'simulate', 'update_surface', 'buttons', 'flip')
+
+
+class RingBuffer:
+    """Keep the most recent samples in a fixed size array."""
+
+    def __init__(self, capacity: int):
+        """Initialize the buffer with room for capacity samples."""
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+        self._samples = numpy.zeros(capacity)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._count
+
+    def append(self, value: float):
+        """Add a sample, overwriting the oldest one once the buffer is full."""
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+
+    def values(self) -> numpy.ndarray:
+        """Return the samples held, oldest first."""
+        if self._count < len(self._samples):
+            return self._samples[:self._count].copy()
+        return numpy.roll(self._samples, -self._next)
 
 
 class Timer:
-    """Timer class."""
+    """Timer class, doubling as a profiler of the phases of each frame."""
 
-    def __init__(self):
-        """Initialize the timer object."""
+    def __init__(self, capacity: int = 600, phases: Iterable[str] = PROFILE_PHASES):
+        """Initialize the timer object, the profiler keeps the last capacity frames."""
         self._last_time = time.time()
         self._current_time = time.time()
         self._last_frame_time = 0.001
+        # phase timings are summed up over a frame and pushed into the ring buffers when the frame ends
+        self._pending = dict.fromkeys(phases, 0.0)
+        self._phases = {_phase: RingBuffer(capacity) for _phase in self._pending}
+        self._frames = RingBuffer(capacity)
+        self._generations = RingBuffer(capacity)
+        self._frame_start = time.perf_counter()
 
     def poll(self, frame_limit: float):
         """Wait if to fast, skip (return True) if to slow."""
@@ -39,6 +87,80 @@ class Timer:
         else:
             return False
 
+    def wake(self):
+        """Restart the frame clock after sleeping idle, the time slept is neither a slow frame nor profiled."""
+        self._last_time = time.time()
+        self._frame_start = time.perf_counter()
+
     def last_frame_time(self):
         """Return last frame time."""
         return self._last_frame_time
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the with block to a phase of the current frame."""
+        _start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._pending[name] += time.perf_counter() - _start
+
+    def frame(self, generations: int = 0):
+        """End the current frame, recording its length, its phases and the generations it advanced."""
+        _now = time.perf_counter()
+        self._frames.append(_now - self._frame_start)
+        self._frame_start = _now
+        for _phase, _seconds in self._pending.items():
+            self._phases[_phase].append(_seconds)
+            self._pending[_phase] = 0.0
+        self._generations.append(generations)
+
+    def percentiles(self, phase: str = 'frame') -> Percentiles:
+        """Return the 50th, 95th and 99th percentile in seconds of the frame time or of a phase."""
+        _samples = self._frames.values() if phase == 'frame' else self._phases[phase].values()
+        if not len(_samples):
+            return Percentiles(0.0, 0.0, 0.0)
+        return Percentiles(*numpy.percentile(_samples, (50, 95, 99)).tolist())
+
+    def generations_per_second(self) -> float:
+        """Return the generations per second over the recorded frames."""
+        _seconds = self._frames.values().sum()
+        return float(self._generations.values().sum() / _seconds) if _seconds else 0.0
+
+    def to_csv(self, filename: str) -> bool:
+        """Write one row per recorded frame with its length, its phases in seconds and its generations."""
+        _stream = io.StringIO()
+        _writer = csv.writer(_stream)
+        _writer.writerow(['frame', 'frame_time', *self._phases, 'generations'])
+        _columns = [self._frames.values(), *(_ring.values() for _ring in self._phases.values())]
+        for _index, _row in enumerate(zip(*_columns, self._generations.values())):
+            _writer.writerow([_index, *(repr(float(_value)) for _value in _row[:-1]), int(_row[-1])])
+        return core.raw_to_file(filename, _stream.getvalue())
+
+
+class RateMeter:
+    """Count events per second, the rate is updated once per window."""
+
+    def __init__(self, window: float = 1.0):
+        """Initialize the meter with the window length in seconds."""
+        self._window = window
+        self._start = time.perf_counter()
+        self._count = 0
+        self._rate = 0.0
+
+    def _roll(self, now: float):
+        """Close the current window once it is over."""
+        if now - self._start >= self._window:
+            self._rate = self._count / (now - self._start)
+            self._start = now
+            self._count = 0
+
+    def tick(self, count: int = 1):
+        """Record events."""
+        self._count += count
+        self._roll(time.perf_counter())
+
+    def rate(self) -> float:
+        """Return the events per second of the last complete window."""
+        self._roll(time.perf_counter())
+        return self._rate
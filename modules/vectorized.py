@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - vectorized
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 17.10.26 - 10:12
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""Conways game of life simulation on numpy arrays."""
+from typing import Tuple, Union
+
+from modules.boundary import fill_ghost_cells, pad_array
+from modules.rules import CONWAY, Rule, count_groups, parse_rule
+
+import numpy
+
+# relative (row, column) positions of the eight neighbours of a cell
+NEIGHBOUR_OFFSETS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def _padded_neighbour_count(padded: numpy.ndarray) -> numpy.ndarray:
+    """Count the live neighbours of every cell inside a playfield surrounded by one ring of ghost cells."""
+    _height = padded.shape[-2] - 2
+    _width = padded.shape[-1] - 2
+    _neighbours = numpy.zeros(padded.shape[:-2] + (_height, _width), dtype=numpy.uint8)
+    for _dy, _dx in NEIGHBOUR_OFFSETS:
+        _neighbours += padded[..., 1 + _dy:1 + _dy + _height, 1 + _dx:1 + _dx + _width]
+    return _neighbours
+
+
+def neighbour_count(playfield: numpy.ndarray, boundary: str = 'dead') -> numpy.ndarray:
+    """Count the live neighbours of every cell, cells outside the playfield are filled in by the boundary mode."""
+    return _padded_neighbour_count(pad_array(playfield, boundary))
+
+
+def _count_in(neighbours: numpy.ndarray, counts: Tuple[int, ...]) -> numpy.ndarray:
+    """Return the mask of cells whose neighbour count is one of counts."""
+    if not counts:
+        return numpy.zeros(neighbours.shape, dtype=bool)
+    _mask = neighbours == counts[0]
+    for _count in counts[1:]:
+        _mask |= neighbours == _count
+    return _mask
+
+
+def padded_simulation(padded: numpy.ndarray, rule: Union[str, Rule] = CONWAY) -> numpy.ndarray:
+    """Simulate the inside of a uint8 playfield surrounded by one ring of ghost cells for one generation step."""
+    _playfield = padded[..., 1:-1, 1:-1]
+    _neighbours = _padded_neighbour_count(padded)
+    # comparing whole arrays against the few counts of a rule beats a per cell table lookup
+    _groups = count_groups(parse_rule(rule))
+    _alive = _count_in(_neighbours, _groups.any_state)
+    if _groups.alive_only:
+        _alive |= (_playfield == 1) & _count_in(_neighbours, _groups.alive_only)
+    if _groups.dead_only:
+        _alive |= (_playfield == 0) & _count_in(_neighbours, _groups.dead_only)
+    return _alive.astype(numpy.uint8)
+
+
+class StepBuffers:
+    """Scratch arrays for stepping playfields of one size without allocating."""
+
+    def __init__(self, height: int, width: int):
+        """Allocate the padded copy of the playfield, the neighbour counts and the masks of one step."""
+        self.shape = (height, width)
+        self.padded = numpy.zeros((height + 2, width + 2), dtype=numpy.uint8)
+        # counts and masks cover the padded rows of the playfield, the two ghost cells of every row are dropped
+        _cells = height * (width + 2)
+        self.neighbours = numpy.empty(_cells, dtype=numpy.uint8)
+        self.alive = numpy.empty(_cells, dtype=bool)
+        self.group = numpy.empty(_cells, dtype=bool)
+        self.match = numpy.empty(_cells, dtype=bool)
+
+
+def _count_in_into(neighbours: numpy.ndarray, counts: Tuple[int, ...], out: numpy.ndarray, match: numpy.ndarray):
+    """Write the mask of cells whose neighbour count is one of counts into out."""
+    out[...] = False
+    for _count in counts:
+        numpy.equal(neighbours, _count, out=match)
+        numpy.logical_or(out, match, out=out)
+
+
+def vectorized_simulation_into(playfield: numpy.ndarray,
+                               out: numpy.ndarray,
+                               buffers: StepBuffers,
+                               rule: Union[str, Rule] = CONWAY,
+                               boundary: str = 'dead',
+                               ) -> numpy.ndarray:
+    """
+    Simulate a uint8 playfield for one generation step writing the next generation into out.
+
+    Every intermediate result goes into the preallocated buffers, so stepping does not allocate any arrays. Returns out,
+    which must not be the playfield itself.
+    """
+    _height, _width = buffers.shape
+    _stride = _width + 2
+    _padded = buffers.padded
+    numpy.copyto(_padded[1:-1, 1:-1], playfield)
+    fill_ghost_cells(_padded, boundary)
+
+    # in the flattened padded playfield every neighbour is a fixed distance away, so all operands below are contiguous
+    # runs, strided 2-D operands would make numpy allocate iterator buffers
+    _flat = _padded.reshape(-1)
+    _first = _stride + 1
+    _length = _height * _stride - 2
+    _neighbours = buffers.neighbours[:_length]
+    numpy.copyto(_neighbours, _flat[:_length])
+    for _dy, _dx in NEIGHBOUR_OFFSETS[1:]:
+        _start = _first + _dy * _stride + _dx
+        numpy.add(_neighbours, _flat[_start:_start + _length], out=_neighbours)
+
+    _groups = count_groups(parse_rule(rule))
+    _alive, _group, _match = buffers.alive[:_length], buffers.group[:_length], buffers.match[:_length]
+    # cells are 0 or 1, viewed as booleans the masks combine with them without casting
+    _cells = _flat[_first:_first + _length].view(bool)
+    _count_in_into(_neighbours, _groups.any_state, _alive, _match)
+    if _groups.alive_only:
+        _count_in_into(_neighbours, _groups.alive_only, _group, _match)
+        numpy.logical_and(_group, _cells, out=_group)
+        numpy.logical_or(_alive, _group, out=_alive)
+    if _groups.dead_only:
+        # the group mask is greater than the cell exactly where the cell is dead
+        _count_in_into(_neighbours, _groups.dead_only, _group, _match)
+        numpy.greater(_group, _cells, out=_group)
+        numpy.logical_or(_alive, _group, out=_alive)
+    numpy.copyto(out.view(bool), buffers.alive.reshape(_height, _stride)[:, :_width])
+    return out
+
+
+def vectorized_simulation(playfield, rule: Union[str, Rule] = CONWAY, boundary: str = 'dead') -> numpy.ndarray:
+    """
+    Simulate a playfield for one generation step using whole array operations.
+
+    Accepts a list of lists or a 2-D array and returns a new 2-D uint8 array, the result is cell for cell
+    identical to modules.simulation.simulation. A 3-D array is a stack of independent playfields stepped at once.
+    """
+    return padded_simulation(pad_array(numpy.asarray(playfield, dtype=numpy.uint8), boundary), rule)
+
+
+if __name__ == '__main__':
+    pass
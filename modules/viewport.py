@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: UTF-8 -*-
+# ---------------------------------------------------------------------------
+# game-of-life - viewport
+# ---------------------------------------------------------------------------
+# Author: Videonauth <videonauth@googlemail.com>
+# License: MIT (see LICENSE file)
+# Date: 18.10.26 - 05:40
+# Written for: Python 3.9.5
+# ---------------------------------------------------------------------------
+
+"""
+Viewport onto playfields larger than the window.
+
+Zoomed in every cell is a square of cell_size pixels. Zoomed out every pixel shows a square block of 2**level cells,
+drawn from the density of live cells in that block, the matching level of a density mipmap. Only the cells in view are
+ever looked at, so drawing costs the same for a million cell playfield as for a small one.
+"""
+import math
+from collections import namedtuple
+from typing import Optional, Tuple
+
+import numpy
+
+# the visible cells [x0, x1) and [y0, y1), the zoom and the surface position of cell (x0, y0)
+View = namedtuple('View', ['x0', 'y0', 'x1', 'y1', 'cell_size', 'level', 'offset_x', 'offset_y'])
+
+# largest cell size zooming in goes up to
+MAX_CELL_SIZE = 64
+
+
+def density_mipmap(playfield: numpy.ndarray, level: int) -> numpy.ndarray:
+    """Return the share of live cells in every square block of 2**level cells, cells beyond the edges count as dead."""
+    _block = 1 << level
+    _height, _width = playfield.shape
+    _rows, _columns = -(-_height // _block), -(-_width // _block)
+    _cells = playfield
+    if (_rows * _block, _columns * _block) != playfield.shape:
+        _cells = numpy.zeros((_rows * _block, _columns * _block), dtype=playfield.dtype)
+        _cells[:_height, :_width] = playfield
+    _counts = _cells.reshape(_rows, _block, _columns, _block).sum(axis=(1, 3), dtype=numpy.uint32)
+    return _counts / numpy.float32(_block * _block)
+
+
+class Viewport:
+    """Camera onto a playfield, panned in pixels and zoomed in steps of two."""
+
+    def __init__(self, field_width: int, field_height: int, width: int, height: int):
+        """Initialize the viewport of width x height pixels showing the whole playfield."""
+        self.width = width
+        self.height = height
+        self.field_width = field_width
+        self.field_height = field_height
+        self.cell_size = 1
+        self.level = 0
+        # cell coordinates of the top left pixel
+        self.left = 0.0
+        self.top = 0.0
+        self.fit()
+
+    @property
+    def scale(self) -> float:
+        """Return the pixels per cell, below one when zoomed out."""
+        return float(self.cell_size) if self.level == 0 else 2.0 ** -self.level
+
+    def _fit_level(self) -> int:
+        """Return the level at which the whole playfield fits into the viewport."""
+        _cells = max(math.ceil(self.field_width / self.width), math.ceil(self.field_height / self.height))
+        return max(_cells - 1, 0).bit_length()
+
+    def fit(self):
+        """Zoom to the largest scale showing the whole playfield."""
+        _cell_size = min(self.width // self.field_width, self.height // self.field_height)
+        self.cell_size = max(_cell_size, 1)
+        self.level = 0 if _cell_size else self._fit_level()
+        self.left = self.top = 0.0
+
+    def set_field_size(self, field_width: int, field_height: int):
+        """Show a playfield of a new size as a whole."""
+        self.field_width = field_width
+        self.field_height = field_height
+        self.fit()
+
+    def zoom(self, steps: int, pixel_x: Optional[float] = None, pixel_y: Optional[float] = None):
+        """Zoom in for positive steps and out for negative ones, keeping the cell under a pixel in place."""
+        _pixel_x = self.width / 2 if pixel_x is None else pixel_x
+        _pixel_y = self.height / 2 if pixel_y is None else pixel_y
+        _cell_x = self.left + _pixel_x / self.scale
+        _cell_y = self.top + _pixel_y / self.scale
+        for _ in range(abs(steps)):
+            if steps > 0 and self.level:
+                self.level -= 1
+            elif steps > 0:
+                self.cell_size = max(min(self.cell_size * 2, MAX_CELL_SIZE), self.cell_size)
+            elif self.cell_size > 1:
+                self.cell_size //= 2
+            else:
+                # zooming out further than showing the whole playfield only shrinks it
+                self.level = min(self.level + 1, self._fit_level())
+        self.left = _cell_x - _pixel_x / self.scale
+        self.top = _cell_y - _pixel_y / self.scale
+        self._clamp()
+
+    def pan(self, pixels_x: float, pixels_y: float):
+        """Move the playfield by a number of pixels, e.g. the distance the mouse was dragged."""
+        self.left -= pixels_x / self.scale
+        self.top -= pixels_y / self.scale
+        self._clamp()
+
+    def _clamp(self):
+        """Keep the playfield in view, a playfield smaller than the viewport sticks to the top left corner."""
+        self.left = min(max(self.left, 0.0), max(self.field_width - self.width / self.scale, 0.0))
+        self.top = min(max(self.top, 0.0), max(self.field_height - self.height / self.scale, 0.0))
+
+    def view(self) -> View:
+        """Return the visible cells and where they go, zoomed out aligned to whole blocks of cells."""
+        _block = 1 << self.level
+        _x0 = math.floor(self.left / _block) * _block
+        _y0 = math.floor(self.top / _block) * _block
+        _x1 = min(math.ceil(self.left + self.width / self.scale), self.field_width)
+        _y1 = min(math.ceil(self.top + self.height / self.scale), self.field_height)
+        return View(_x0, _y0, _x1, _y1, self.cell_size if not self.level else 0, self.level,
+                    round((_x0 - self.left) * self.scale), round((_y0 - self.top) * self.scale))
+
+    def cell_at(self, pixel_x: float, pixel_y: float) -> Optional[Tuple[int, int]]:
+        """Return the (x, y) cell under a pixel of the viewport, None outside the playfield."""
+        if not (0 <= pixel_x < self.width and 0 <= pixel_y < self.height):
+            return None
+        _view = self.view()
+        _cell_x = _view.x0 + math.floor((pixel_x - _view.offset_x) / self.scale)
+        _cell_y = _view.y0 + math.floor((pixel_y - _view.offset_y) / self.scale)
+        if not (0 <= _cell_x < self.field_width and 0 <= _cell_y < self.field_height):
+            return None
+        return _cell_x, _cell_y
+
+    def cell_rect(self, cell_x: int, cell_y: int) -> Tuple[int, int, int, int]:
+        """Return the pixel rectangle of a cell as (x, y, width, height), zoomed in only."""
+        _view = self.view()
+        return (_view.offset_x + (cell_x - _view.x0) * self.cell_size,
+                _view.offset_y + (cell_y - _view.y0) * self.cell_size,
+                self.cell_size,
+                self.cell_size)
+
+
+if __name__ == '__main__':
+    pass
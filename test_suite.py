@@ -11,12 +11,55 @@
 # ---------------------------------------------------------------------------
 
 """Testsuite for generate_playfield."""
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from random import Random
 
-from modules.playfield import generate_playfield, generate_seeded_playfield, serialize_playfield
+from modules import core
+from modules.active import ActiveRegionSimulation
+from modules.benchmark import compare_results, suite_benchmark, write_results
+from modules.blocked import blocked_simulation
+from modules.boundary import BOUNDARIES, halo_rows, pad_array, pad_rows
+from modules.checkpoint import Checkpointer, latest_checkpoint, list_checkpoints
+from modules.cycle import Cycle, CycleDetector, ZobristHash
+from modules.ensemble import Ensemble, generate_ensemble
+from modules.field import deserialize_playfield, load_pattern, read_rle, write_cells, write_rle
+from modules.gui import GUI, Label, SurfaceCache, colours
+from modules.hashlife import HashLife
+from modules.headless import RunConfig, load_playfield, run_batch, run_simulation
+from modules.input import InputHandler
+from modules.packed import generate_packed_playfield, generate_seeded_packed_playfield, pack_playfield, \
+    packed_simulation, serialize_packed_playfield, unpack_playfield
+from modules.parallel import ParallelSimulation
+from modules.playfield import Playfield, generate_playfield, generate_random_playfield, generate_seeded_playfield, \
+    serialize_playfield
+from modules.rules import CONWAY, RULES, neighbourhood_table, parse_rule, transition_table
+from modules.simulation import get_engine, simulation
+from modules.snapshot import load_snapshot, save_snapshot
+from modules.sparse import SparseField
+from modules.stepper import SimulationThread
+from modules.timer import RingBuffer, Timer
+from modules.vectorized import StepBuffers, vectorized_simulation, vectorized_simulation_into
+from modules.viewport import View, Viewport, density_mipmap
+
+import numpy
+
+import pygame
 
 import pytest
 
 
+def random_playfield(_height: int, _width: int, _seed: int, _density: float = 0.4) -> list:
+    """Create a reproducible random playfield for comparing engines."""
+    _random = Random(_seed)
+    return [[int(_random.random() < _density) for _ in range(_width)] for __ in range(_height)]
+
+
 class TestPlayingFieldFactory:
     """Testsuite for generate_playfield factory."""
 
@@ -120,6 +163,34 @@ class TestSeededPlayingFieldFactory:
         actual = sum([1 for _row in _playfield for _cell in _row if _cell == 1])
         assert actual == expected
 
+    def test_same_seed_yields_same_playfield(self):
+        """Test seeded playfields are reproducible and differ between seeds."""
+        assert generate_seeded_playfield(32, 32, 300, 7) == generate_seeded_playfield(32, 32, 300, 7)
+        assert generate_seeded_playfield(32, 32, 300, 7) != generate_seeded_playfield(32, 32, 300, 8)
+
+    def test_generator_is_drawn_from(self):
+        """Test a numpy Generator can be passed instead of a seed and advances between playfields."""
+        _generator = numpy.random.default_rng(3)
+        _first = generate_seeded_playfield(16, 16, 40, _generator)
+        _second = generate_seeded_playfield(16, 16, 40, _generator)
+        assert _first == generate_seeded_playfield(16, 16, 40, 3)
+        assert _first != _second
+        assert sum(map(sum, _second)) == 40
+
+    @pytest.mark.parametrize('_density', [0.0, 0.25, 1.0])
+    def test_random_playfield_density(self, _density):
+        """Test Bernoulli seeding yields roughly the requested share of live cells, reproducibly."""
+        _playfield = generate_random_playfield(64, 64, _density, 1)
+        assert _playfield == generate_random_playfield(64, 64, _density, 1)
+        assert abs(sum(map(sum, _playfield)) / (64 * 64) - _density) < 0.03
+
+    @pytest.mark.parametrize('_density', [-0.1, 1.5])
+    def test_random_playfield_density_out_of_range_yields_value_error(self, _density):
+        """Test the density is a probability."""
+        with pytest.raises(ValueError) as ex:
+            generate_random_playfield(4, 4, _density)
+        assert str(ex.value) == '_density out of range: must be in the range [0, 1]'
+
 
 class TestPlayingSerialization:
     """Test-suite for serialize_playfield."""
@@ -150,3 +221,1206 @@ class TestPlayingSerialization:
         """Test the serialized playfields yield expected output."""
         actual = serialize_playfield(_playfield)
         assert actual == expected_output
+
+
+class TestVectorizedSimulation:
+    """Test-suite for the numpy simulation backend."""
+
+    @pytest.mark.parametrize('_height,_width', [[1, 2], [2, 1], [3, 3], [5, 8], [17, 9], [32, 32]])
+    @pytest.mark.parametrize('_seed', [0, 1, 2])
+    def test_parity_with_reference_on_random_fields(self, _height, _width, _seed):
+        """Test the vectorized step matches the reference step including the dead border."""
+        _playfield = random_playfield(_height, _width, _seed)
+        assert vectorized_simulation(_playfield).tolist() == simulation(_playfield)
+
+    def test_parity_over_several_generations(self):
+        """Test the engines stay in lockstep when fed their own output."""
+        _reference = random_playfield(24, 30, 7)
+        _vectorized = vectorized_simulation(_reference)
+        _reference = simulation(_reference)
+        for _ in range(20):
+            assert _vectorized.tolist() == _reference
+            _reference = simulation(_reference)
+            _vectorized = vectorized_simulation(_vectorized)
+
+    def test_unknown_engine_yields_value_error(self):
+        """Test selecting an engine which does not exist."""
+        with pytest.raises(ValueError):
+            get_engine('nonexistent')
+
+    def test_playfield_simulates_with_selected_engine(self):
+        """Test Playfield.simulate uses the chosen backend."""
+        _playfield = Playfield((5, 5), (200, 200), engine='vectorized')
+        _playfield.field = [[0, 0, 0, 0, 0], [0, 0, 1, 0, 0], [0, 0, 1, 0, 0], [0, 0, 1, 0, 0], [0, 0, 0, 0, 0]]
+        _playfield.simulate()
+        assert _playfield.field.tolist() == [[0, 0, 0, 0, 0], [0, 0, 0, 0, 0], [0, 1, 1, 1, 0],
+                                             [0, 0, 0, 0, 0], [0, 0, 0, 0, 0]]
+
+
+class TestSparseField:
+    """Test-suite for the sparse live cell engine."""
+
+    @pytest.mark.parametrize('_height,_width', [[1, 2], [2, 1], [6, 6], [9, 14]])
+    @pytest.mark.parametrize('_seed', [0, 1, 2])
+    def test_bounded_field_matches_reference(self, _height, _width, _seed):
+        """Test a bounded sparse field keeps the dead border of the reference simulation."""
+        _playfield = random_playfield(_height, _width, _seed)
+        _sparse = SparseField.from_playfield(_playfield)
+        for _ in range(5):
+            _playfield = simulation(_playfield)
+            _sparse.simulate()
+            assert _sparse.to_playfield() == _playfield
+
+    def test_glider_travels_in_unbounded_field(self):
+        """Test a glider moves one cell diagonally every four generations across negative coordinates."""
+        _glider = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+        _sparse = SparseField(cells=_glider)
+        for _ in range(4 * 50):
+            _sparse.simulate()
+        assert _sparse.cells == {(_x + 50, _y + 50) for _x, _y in _glider}
+        _sparse = SparseField(cells={(-_x, -_y) for _x, _y in _glider})
+        for _ in range(4):
+            _sparse.simulate()
+        assert _sparse.population() == 5
+        assert _sparse.bounding_box() == (-3, -3, -1, -1)
+
+    def test_query_api(self):
+        """Test flipping, querying and clearing single cells."""
+        _sparse = SparseField(10000, 10000)
+        _sparse.flip_cell(9999, 0)
+        assert _sparse.get_cell(9999, 0) == 1
+        assert _sparse.get_size() == (10000, 10000)
+        _sparse.flip_cell(9999, 0)
+        assert _sparse.population() == 0
+        with pytest.raises(ValueError):
+            _sparse.flip_cell(10000, 0)
+
+    def test_unbounded_field_can_not_be_made_dense(self):
+        """Test converting an unbounded field yields a value error."""
+        with pytest.raises(ValueError):
+            SparseField(cells={(0, 0)}).to_playfield()
+
+
+class TestHashLife:
+    """Test-suite for the HashLife engine."""
+
+    @pytest.mark.parametrize('_generations', [1, 2, 3, 7, 16, 45])
+    @pytest.mark.parametrize('_seed', [0, 1])
+    def test_advance_matches_sparse_engine(self, _generations, _seed):
+        """Test advancing n generations equals n single steps of the unbounded sparse engine."""
+        _playfield = random_playfield(12, 12, _seed)
+        _hashlife = HashLife.from_playfield(_playfield)
+        _sparse = SparseField(cells=SparseField.from_playfield(_playfield).cells)
+        _hashlife.advance(_generations)
+        for _ in range(_generations):
+            _sparse.simulate()
+        assert set(_hashlife.cells()) == _sparse.cells
+        assert _hashlife.generation == _generations
+
+    def test_playfield_round_trip(self):
+        """Test a pattern away from the edges matches the reference simulation after export."""
+        _playfield = generate_playfield(16, 16)
+        for _x, _y in ((6, 7), (7, 7), (8, 7), (7, 5), (9, 6)):
+            _playfield[_y][_x] = 1
+        _hashlife = HashLife.from_playfield(_playfield)
+        assert _hashlife.to_playfield(16, 16) == _playfield
+        _hashlife.simulate()
+        assert _hashlife.to_playfield(16, 16) == simulation(_playfield)
+
+    def test_glider_leaps_a_million_generations(self):
+        """Test a power of two leap moves a glider by a quarter of the generations."""
+        _glider = {(1, 0), (2, 1), (0, 2), (1, 2), (2, 2)}
+        _hashlife = HashLife(_glider)
+        _hashlife.leap(20)
+        _offset = (1 << 20) // 4
+        assert set(_hashlife.cells()) == {(_x + _offset, _y + _offset) for _x, _y in _glider}
+        assert _hashlife.get_cell(1 + _offset, _offset) == 1
+        assert _hashlife.get_cell(0, 0) == 0
+
+    def test_cache_is_bounded_and_reported(self):
+        """Test the memo cache never exceeds its limit and statistics are reported."""
+        _hashlife = HashLife.from_playfield(random_playfield(8, 8, 3), cache_size=256)
+        _hashlife.advance(100)
+        _info = _hashlife.cache_info()
+        assert _info.cache_size <= 256
+        assert _info.hits + _info.misses > 0
+        assert 0 <= _info.hit_rate <= 1
+        assert _info.nodes > 0
+
+
+class TestPackedPlayfield:
+    """Test-suite for the bit-packed playfield factories and simulation."""
+
+    @pytest.mark.parametrize('_height,_width', [[1, 2], [2, 1], [3, 63], [4, 64], [5, 65], [9, 130]])
+    @pytest.mark.parametrize('_seed', [0, 1])
+    def test_parity_with_reference_on_random_fields(self, _height, _width, _seed):
+        """Test the packed step matches the reference step including the dead border and word boundaries."""
+        _playfield = random_playfield(_height, _width, _seed)
+        _packed = pack_playfield(_playfield)
+        for _ in range(4):
+            _playfield = simulation(_playfield)
+            _packed = packed_simulation(_packed)
+            assert unpack_playfield(_packed) == _playfield
+
+    @pytest.mark.parametrize('_height,_width', [[0, 1], [1, 0], [-1, 1], [1, -2], [0, 0], [1, 1]])
+    def test_invalid_dimensions_yield_value_error(self, _height, _width):
+        """Test the packed factories validate like the dense ones."""
+        with pytest.raises(ValueError):
+            generate_packed_playfield(_height, _width)
+
+    @pytest.mark.parametrize('_seed', [0, 1, 37, 100, 200])
+    def test_seeded_packed_playfield_has_correct_population(self, _seed):
+        """Test the number of seeded cells and that no bits beyond the width are set."""
+        _packed = generate_seeded_packed_playfield(2, 100, _seed)
+        _cells = unpack_playfield(_packed)
+        assert sum(map(sum, _cells)) == _seed
+        assert pack_playfield(_cells).words.tolist() == _packed.words.tolist()
+
+    def test_seeded_packed_playfield_matches_dense(self):
+        """Test the packed factory sets the same cells as the dense one for the same seed."""
+        _packed = generate_seeded_packed_playfield(9, 70, 200, 5)
+        assert unpack_playfield(_packed) == generate_seeded_playfield(9, 70, 200, 5)
+
+    def test_seed_value_out_of_range_yields_value_error(self):
+        """Test the same messages as the dense seeded factory."""
+        with pytest.raises(ValueError) as ex:
+            generate_seeded_packed_playfield(2, 2, 5)
+        assert str(ex.value) == '_number_of_seeded_cells too large: must be in the range [0, 4]'
+
+    @pytest.mark.parametrize('_height,_width', [[1, 2], [3, 3], [4, 70]])
+    def test_serialization_matches_dense(self, _height, _width):
+        """Test serialize_packed_playfield yields the same text as serialize_playfield."""
+        _playfield = random_playfield(_height, _width, 5)
+        assert serialize_packed_playfield(pack_playfield(_playfield)) == serialize_playfield(_playfield)
+        with pytest.raises(ValueError):
+            serialize_packed_playfield(_playfield)
+
+
+class TestParallelSimulation:
+    """Test-suite for the multi-core shared memory simulation."""
+
+    @pytest.mark.parametrize('_height,_width,_workers', [[2, 3, 2], [9, 7, 2], [20, 33, 3], [5, 5, 8]])
+    def test_parity_with_reference(self, _height, _width, _workers):
+        """Test strips with halos produce the reference result including the dead border."""
+        _playfield = random_playfield(_height, _width, _height)
+        with ParallelSimulation(_height, _width, _workers) as _parallel:
+            _parallel.load(_playfield)
+            for _ in range(3):
+                _playfield = simulation(_playfield)
+                _parallel.simulate()
+                assert _parallel.field.tolist() == _playfield
+
+    def test_playfield_simulates_with_parallel_engine(self):
+        """Test the parallel backend is selectable from Playfield."""
+        _playfield = Playfield((6, 6), (200, 200), engine='parallel')
+        _playfield.field = random_playfield(6, 6, 4)
+        _expected = simulation(simulation(_playfield.field))
+        _playfield.simulate()
+        _playfield.simulate()
+        assert _playfield.field.tolist() == _expected
+
+
+class TestActiveRegionSimulation:
+    """Test-suite for the active region tracking simulation."""
+
+    @pytest.mark.parametrize('_height,_width,_tile_size', [[2, 3, 1], [10, 10, 3], [33, 20, 8], [16, 16, 16]])
+    def test_parity_with_reference(self, _height, _width, _tile_size):
+        """Test skipping tiles never changes the result."""
+        _playfield = random_playfield(_height, _width, _width)
+        _active = ActiveRegionSimulation(_playfield, _tile_size)
+        for _ in range(30):
+            _playfield = simulation(_playfield)
+            _active.simulate()
+            assert _active.field.tolist() == _playfield
+
+    def test_still_life_tiles_are_skipped(self):
+        """Test a block in a large empty field leaves almost every tile skipped."""
+        _playfield = generate_playfield(64, 64)
+        for _x, _y in ((10, 10), (11, 10), (10, 11), (11, 11)):
+            _playfield[_y][_x] = 1
+        _active = ActiveRegionSimulation(_playfield, 8)
+        _active.simulate()
+        assert _active.statistics().evaluated == 64
+        _active.simulate()
+        assert _active.statistics().evaluated == 0
+        assert _active.statistics().skipped == 64
+        _active.flip_cell(40, 40)
+        _active.simulate()
+        assert _active.statistics().evaluated == 9
+        assert _active.field.tolist() == simulation(_playfield)
+
+    def test_external_changes_are_picked_up(self):
+        """Test cells changed between calls are found by comparing against the last generation."""
+        _playfield = Playfield((12, 12), (200, 200), engine='active')
+        _playfield.field = random_playfield(12, 12, 9)
+        _playfield.simulate()
+        _playfield.flip_cell(5, 5)
+        _expected = simulation(_playfield.field.tolist())
+        _playfield.simulate()
+        assert _playfield.field.tolist() == _expected
+
+
+class TestPlayfieldRendering:
+    """Test-suite for the incremental playfield renderer."""
+
+    def test_only_changed_cells_are_redrawn(self):
+        """Test the first frame redraws everything and later frames only the changed cells."""
+        _playfield = Playfield((10, 10), (220, 220))
+        assert _playfield.update_surface() == [_playfield.surface.get_rect()]
+        assert _playfield.update_surface() == []
+        _playfield.flip_cell(3, 4)
+        _size = _playfield.cell_size
+        assert _playfield.update_surface() == [(3 * _size, 4 * _size, _size, _size)]
+        assert _playfield.surface.get_at((3 * _size + _size // 2, 4 * _size + _size // 2))[:3] == (0, 0, 255)
+        _playfield.flip_cell(3, 4)
+        _playfield.update_surface()
+        assert _playfield.surface.get_at((3 * _size + _size // 2, 4 * _size + _size // 2))[:3] == (0, 0, 0)
+
+    @pytest.mark.parametrize('_width,_height,_seed', [[10, 10, 0], [7, 13, 1], [100, 100, 2], [3, 50, 3]])
+    def test_array_renderer_matches_cell_renderer(self, _width, _height, _seed):
+        """Test the pixel array renderer yields the same pixels as drawing cell by cell."""
+        _playfield = Playfield((_width, _height), (620, 620))
+        _field = numpy.array(random_playfield(_height, _width, _seed), dtype=numpy.uint8)
+        _playfield.render_cells(_field)
+        _expected = pygame.image.tostring(_playfield.surface, 'RGB')
+        _playfield.render_array(_field)
+        assert pygame.image.tostring(_playfield.surface, 'RGB') == _expected
+
+    def test_large_changes_use_a_single_rect(self):
+        """Test many changed cells collapse into one rect covering the grid."""
+        _playfield = Playfield((20, 20), (420, 420))
+        _playfield.update_surface()
+        _playfield.field = random_playfield(20, 20, 1, 0.9)
+        _size = _playfield.cell_size
+        assert _playfield.update_surface() == [(0, 0, 20 * _size, 20 * _size)]
+
+    def test_resize_forces_full_redraw(self):
+        """Test a new playfield size redraws the whole surface."""
+        _playfield = Playfield((10, 10), (220, 220))
+        _playfield.update_surface()
+        _playfield.resize(12, 10)
+        assert _playfield.update_surface() == [_playfield.surface.get_rect()]
+
+
+class TestSimulationThread:
+    """Test-suite for the background simulation thread."""
+
+    def _wait_for(self, _stepper, _generation):
+        """Wait until the worker has finished a generation."""
+        _deadline = time.perf_counter() + 10
+        while _stepper.acquire()[0] < _generation and time.perf_counter() < _deadline:
+            time.sleep(0.001)
+
+    def test_handed_over_generations_match_reference(self):
+        """Test every generation taken over by the render side equals the reference result."""
+        _playfield = random_playfield(16, 16, 11)
+        _stepper = SimulationThread(_playfield, vectorized_simulation)
+        _stepper.start()
+        _stepper.resume()
+        self._wait_for(_stepper, 10)
+        _stepper.pause()
+        _generation, _field = _stepper.acquire()
+        _stepper.stop()
+        _expected = _playfield
+        for _ in range(_generation):
+            _expected = simulation(_expected)
+        assert _generation >= 10
+        assert _field.tolist() == _expected
+
+    def test_load_restarts_from_edited_playfield(self):
+        """Test loading a playfield replaces the running simulation immediately."""
+        _stepper = SimulationThread(random_playfield(8, 8, 1), vectorized_simulation)
+        _stepper.start()
+        _stepper.resume()
+        _blinker = generate_playfield(8, 8)
+        for _x in (3, 4, 5):
+            _blinker[4][_x] = 1
+        _stepper.load(_blinker)
+        self._wait_for(_stepper, 3)
+        _stepper.stop()
+        _generation, _field = _stepper.acquire()
+        assert _field.tolist() == (simulation(_blinker) if _generation % 2 else _blinker)
+
+    def test_target_rate_is_respected(self):
+        """Test the worker does not run faster than requested."""
+        _stepper = SimulationThread(random_playfield(8, 8, 2), vectorized_simulation, generations_per_second=20)
+        _stepper.start()
+        _stepper.resume()
+        time.sleep(0.5)
+        _stepper.stop()
+        assert _stepper.generation <= 12
+
+
+class TestHeadlessRunner:
+    """Test-suite for the headless batch runner."""
+
+    def test_runner_does_not_import_pygame(self):
+        """Test the headless entry point can be imported without pulling in pygame."""
+        _output = subprocess.check_output([sys.executable, '-c',
+                                           'import sys, modules.headless; print("pygame" in sys.modules)'])
+        assert _output.decode().strip() == 'False'
+
+    def test_run_writes_snapshots_and_statistics(self, tmp_path):
+        """Test a run writes its snapshots and statistics and the snapshots load back."""
+        _config = RunConfig(16, 12, 0.4, 3, 10, 'vectorized', 5, str(tmp_path), None)
+        _statistics = run_simulation(_config)
+        assert len(_statistics['populations']) == 11
+        assert json.loads((tmp_path / 'seed-3-stats.json').read_text())['final_population'] == \
+            _statistics['final_population']
+        _snapshot = deserialize_playfield((tmp_path / 'seed-3-gen-00000005.txt').read_text())
+        _resumed = run_simulation(RunConfig(16, 12, 0.4, 3, 5, 'reference', 0, None,
+                                            str(tmp_path / 'seed-3-gen-00000005.txt')))
+        assert len(_snapshot) == 12
+        assert _resumed['final_population'] == _statistics['final_population']
+
+    def test_batch_fans_out_seeds_reproducibly(self):
+        """Test runs across a process pool give the same results as sequential runs."""
+        _configs = [RunConfig(20, 20, 0.5, _seed, 8, 'vectorized', 0, None, None) for _seed in range(3)]
+        _parallel = [_statistics['populations'] for _statistics in run_batch(_configs, processes=2)]
+        _sequential = [_statistics['populations'] for _statistics in run_batch(_configs)]
+        assert _parallel == _sequential
+
+    @pytest.mark.parametrize('_playfield', [[[0, 1]], [[1, 0, 0], [0, 1, 0]], [[1], [0], [1]]])
+    def test_deserialize_reverses_serialize(self, _playfield):
+        """Test serialized playfields load back unchanged."""
+        assert deserialize_playfield(serialize_playfield(_playfield)) == _playfield
+
+
+class TestPatternFiles:
+    """Test-suite for the run length encoded and plaintext pattern readers and writers."""
+
+    _glider_rle = '#N Glider\nx = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n'
+    _glider = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+
+    def test_read_glider(self):
+        """Test reading a well known pattern."""
+        _pattern = read_rle(io.StringIO(self._glider_rle))
+        assert (_pattern.width, _pattern.height, _pattern.rule) == (3, 3, 'B3/S23')
+        assert list(_pattern.rows) == [(0, [(1, 1)]), (1, [(2, 1)]), (2, [(0, 3)])]
+        assert load_pattern(io.StringIO(self._glider_rle)) == self._glider
+
+    def test_write_glider(self):
+        """Test writing a well known pattern."""
+        _stream = io.StringIO()
+        write_rle(self._glider, _stream)
+        assert _stream.getvalue() == 'x = 3, y = 3, rule = B3/S23\nbo$2bo$3o!\n'
+
+    def test_empty_rows_and_long_runs(self):
+        """Test repeated row ends and multi digit run counts."""
+        _playfield = generate_playfield(5, 30)
+        _playfield[0][2:27] = [1] * 25
+        _playfield[3][29] = 1
+        _stream = io.StringIO()
+        write_rle(_playfield, _stream)
+        assert _stream.getvalue().splitlines()[1] == '2b25o3$29bo!'
+        _stream.seek(0)
+        assert load_pattern(_stream) == _playfield
+
+    @pytest.mark.parametrize('_representation', ['list', 'array', 'packed', 'sparse'])
+    @pytest.mark.parametrize('_format,_writer', [['rle', write_rle], ['cells', write_cells]])
+    def test_round_trip_into_every_representation(self, _representation, _format, _writer):
+        """Test written patterns load back into each playfield representation."""
+        _playfield = random_playfield(37, 150, 8)
+        _stream = io.StringIO()
+        _writer(_playfield, _stream)
+        _stream.seek(0)
+        _loaded = load_pattern(_stream, _format, _representation)
+        if _representation == 'array':
+            _loaded = _loaded.tolist()
+        elif _representation == 'packed':
+            _loaded = unpack_playfield(_loaded)
+        elif _representation == 'sparse':
+            _loaded = _loaded.to_playfield()
+        assert _loaded == _playfield
+
+    def test_rle_lines_are_wrapped(self):
+        """Test no output line of a run length encoded pattern exceeds 70 characters."""
+        _stream = io.StringIO()
+        write_rle(random_playfield(20, 200, 4), _stream)
+        assert max(len(_line) for _line in _stream.getvalue().splitlines()[1:]) <= 70
+
+    def test_pattern_larger_than_header_yields_value_error(self):
+        """Test live cells outside the declared size are rejected."""
+        with pytest.raises(ValueError):
+            load_pattern(io.StringIO('x = 2, y = 2\n3o!\n'))
+
+
+class TestBinarySnapshot:
+    """Test-suite for the binary snapshot format."""
+
+    @pytest.mark.parametrize('_compress', [False, True])
+    @pytest.mark.parametrize('_height,_width', [[1, 2], [7, 64], [33, 130]])
+    def test_round_trip_matches_serialized_playfield(self, tmp_path, _compress, _height, _width):
+        """Test a saved and loaded snapshot serializes like the original playfield."""
+        _playfield = random_playfield(_height, _width, _width)
+        _filename = str(tmp_path / 'snapshot.gol')
+        assert save_snapshot(_filename, _playfield, 1234, 'B36/S23', 'packed', _compress)
+        _snapshot = load_snapshot(_filename)
+        assert (_snapshot.width, _snapshot.height, _snapshot.generation) == (_width, _height, 1234)
+        assert (_snapshot.rule, _snapshot.engine) == ('B36/S23', 'packed')
+        assert serialize_packed_playfield(_snapshot.field) == serialize_playfield(_playfield)
+
+    def test_uncompressed_snapshot_is_memory_mapped(self, tmp_path):
+        """Test the cells of an uncompressed snapshot are mapped instead of read."""
+        _filename = str(tmp_path / 'snapshot.gol')
+        save_snapshot(_filename, generate_packed_playfield(64, 640))
+        _snapshot = load_snapshot(_filename)
+        assert isinstance(_snapshot.field.words, numpy.memmap)
+        assert packed_simulation(_snapshot.field).words.sum() == 0
+
+    def test_longest_rule_is_kept_whole(self, tmp_path):
+        """Test the longest B/S notation survives a round trip and longer fields are refused."""
+        _filename = str(tmp_path / 'snapshot.gol')
+        save_snapshot(_filename, generate_packed_playfield(3, 3), rule='B012345678/S012345678')
+        assert load_snapshot(_filename).rule == 'B012345678/S012345678'
+        with pytest.raises(ValueError):
+            save_snapshot(_filename, generate_packed_playfield(3, 3), engine='e' * 17)
+
+    def test_other_versions_are_refused(self, tmp_path):
+        """Test a snapshot of an unknown version is not loaded."""
+        _filename = tmp_path / 'snapshot.gol'
+        save_snapshot(str(_filename), generate_packed_playfield(3, 3))
+        _raw = bytearray(_filename.read_bytes())
+        _raw[4] = 2
+        _filename.write_bytes(bytes(_raw))
+        with pytest.raises(ValueError, match='version 2'):
+            load_snapshot(str(_filename))
+
+    def test_other_files_yield_value_error(self, tmp_path):
+        """Test loading a file which is no snapshot."""
+        _filename = tmp_path / 'other.txt'
+        _filename.write_text('0  1\n1  0' * 10)
+        with pytest.raises(ValueError):
+            load_snapshot(str(_filename))
+
+
+class TestCheckpoints:
+    """Test-suite for periodic checkpoints and resuming runs."""
+
+    def test_checkpoints_every_n_generations_keep_the_latest(self, tmp_path):
+        """Test checkpoints are written at their interval and only the latest ones are kept."""
+        _playfield = numpy.array(random_playfield(10, 70, 2), dtype=numpy.uint8)
+        _fields = {}
+        with Checkpointer(str(tmp_path), 'run', every_generations=2, keep=2) as _checkpointer:
+            for _generation in range(1, 10):
+                _playfield = _fields[_generation] = vectorized_simulation(_playfield)
+                _checkpointer.maybe_checkpoint(_playfield, _generation)
+                _checkpointer.flush()
+        assert [_name[-20:] for _name in list_checkpoints(str(tmp_path), 'run')] == \
+            ['gen-000000000006.gol', 'gen-000000000008.gol']
+        _snapshot = load_snapshot(latest_checkpoint(str(tmp_path), 'run'))
+        assert _snapshot.generation == 8
+        assert unpack_playfield(_snapshot.field) == _fields[8].tolist()
+
+    def test_submitted_field_is_copied(self, tmp_path):
+        """Test changes made to the playfield after submitting do not reach the checkpoint."""
+        _playfield = numpy.zeros((4, 4), dtype=numpy.uint8)
+        with Checkpointer(str(tmp_path)) as _checkpointer:
+            _checkpointer.submit(_playfield, 1)
+            _playfield[:] = 1
+        assert unpack_playfield(load_snapshot(latest_checkpoint(str(tmp_path), 'checkpoint')).field) == \
+            [[0] * 4] * 4
+
+    def test_atomic_write_keeps_old_file_on_error(self, tmp_path):
+        """Test a failing write leaves the previous content and no temporary file behind."""
+        _filename = str(tmp_path / 'stats.json')
+        core.dict_to_json({'a': 1}, _filename)
+
+        def _failing(_file):
+            _file.write('{"broken')
+            raise RuntimeError('disk full')
+
+        with pytest.raises(RuntimeError):
+            core.atomic_write(_filename, _failing)
+        assert json.loads((tmp_path / 'stats.json').read_text()) == {'a': 1}
+        assert [_path.name for _path in tmp_path.iterdir()] == ['stats.json']
+
+    def test_failed_write_is_reported(self, tmp_path, monkeypatch):
+        """Test a write bailing out with SystemExit is raised on close and later checkpoints are refused."""
+        def _denied(*_arguments):
+            raise PermissionError('denied')
+
+        monkeypatch.setattr(os, 'replace', _denied)
+        _checkpointer = Checkpointer(str(tmp_path), every_generations=1)
+        _checkpointer.submit(generate_playfield(4, 4), 1)
+        with pytest.raises(SystemExit):
+            _checkpointer.flush()
+        _checkpointer.submit(generate_playfield(4, 4), 2)
+        with pytest.raises(SystemExit):
+            _checkpointer.close()
+        assert _checkpointer.written == []
+
+    def test_dead_writer_thread_is_not_waited_for(self, tmp_path):
+        """Test flush and submit raise instead of waiting on a writer thread which is gone."""
+        _checkpointer = Checkpointer(str(tmp_path))
+        _checkpointer.close()
+        _checkpointer._closed = False
+        with pytest.raises(RuntimeError):
+            _checkpointer.submit(generate_playfield(4, 4), 1)
+        _checkpointer._pending = (generate_playfield(4, 4), 1, 'B3/S23', 'reference', 'dead')
+        with pytest.raises(RuntimeError):
+            _checkpointer.flush()
+
+    def test_atomic_write_keeps_file_mode(self, tmp_path):
+        """Test new files get the mode open() would give them and replaced files keep theirs."""
+        _filename = tmp_path / 'stats.json'
+        core.dict_to_json({'a': 1}, str(_filename))
+        assert _filename.stat().st_mode & 0o777 == 0o666 & ~core._UMASK
+        _filename.chmod(0o640)
+        core.dict_to_json({'a': 2}, str(_filename))
+        assert _filename.stat().st_mode & 0o777 == 0o640
+
+    def test_resumed_run_matches_uninterrupted_run(self, tmp_path):
+        """Test a run resumed from its latest checkpoint ends like a run going through in one go."""
+        _complete = run_simulation(RunConfig(24, 16, 0.4, 5, 12, 'vectorized', 0, None, None))
+        _interrupted = RunConfig(24, 16, 0.4, 5, 7, 'vectorized', 0, str(tmp_path), None, 3)
+        assert run_simulation(_interrupted)['checkpoints'][-1].endswith('gen-000000000006.gol')
+        _resumed = run_simulation(_interrupted._replace(generations=12, resume=True))
+        assert _resumed['resumed_from'] == 6
+        assert _resumed['populations'] == _complete['populations'][6:]
+
+    def test_resume_refuses_a_different_rule(self, tmp_path):
+        """Test a checkpoint written under one rule is not continued under another one."""
+        _config = RunConfig(16, 16, 0.4, 2, 6, 'vectorized', 0, str(tmp_path), None, 3, rule='highlife')
+        run_simulation(_config)
+        with pytest.raises(ValueError, match='B36/S23'):
+            run_simulation(_config._replace(generations=9, resume=True, rule='B3/S23'))
+        assert run_simulation(_config._replace(generations=9, resume=True, engine='reference'))['resumed_from'] == 6
+
+    def test_resume_refuses_a_different_boundary(self, tmp_path):
+        """Test a checkpoint records its boundary and is not continued with another one."""
+        _config = RunConfig(16, 16, 0.4, 2, 6, 'vectorized', 0, str(tmp_path), None, 3, boundary='torus')
+        run_simulation(_config)
+        assert load_snapshot(latest_checkpoint(str(tmp_path), 'seed-2')).boundary == 'torus'
+        with pytest.raises(ValueError, match='--boundary torus'):
+            run_simulation(_config._replace(generations=9, resume=True, boundary='dead'))
+        assert run_simulation(_config._replace(generations=9, resume=True))['resumed_from'] == 6
+
+
+class TestCycleDetection:
+    """Test-suite for still life and oscillator detection."""
+
+    def test_incremental_hash_matches_full_hash(self):
+        """Test updating the hash from the changed cells gives the hash of the whole new playfield."""
+        _hasher = ZobristHash(20, 30)
+        _previous = numpy.array(random_playfield(20, 30, 6), dtype=numpy.uint8)
+        _current = vectorized_simulation(_previous)
+        assert _hasher.update(_hasher.compute(_previous), _previous, _current) == _hasher.compute(_current)
+
+    @pytest.mark.parametrize('_cells,_period', [[[(1, 1), (1, 2), (2, 1), (2, 2)], 1],
+                                                [[(2, 1), (2, 2), (2, 3)], 2],
+                                                [[], 1]])
+    def test_still_life_and_oscillators(self, _cells, _period):
+        """Test a block, a blinker and an empty playfield report their periods."""
+        _playfield = generate_playfield(6, 6)
+        for _x, _y in _cells:
+            _playfield[_y][_x] = 1
+        _detector = CycleDetector()
+        _cycle = _detector.observe(_playfield, 0)
+        for _generation in range(1, 5):
+            if _cycle is not None:
+                break
+            _playfield = simulation(_playfield)
+            _cycle = _detector.observe(_playfield, _generation)
+        assert _cycle == Cycle(0, _period)
+
+    def test_history_bounds_the_period(self):
+        """Test generations dropped from the history are no longer recognized."""
+        _blinker = numpy.zeros((5, 5), dtype=numpy.uint8)
+        _blinker[2, 1:4] = 1
+        _detector = CycleDetector(history=1)
+        assert _detector.observe(_blinker, 0) is None
+        assert _detector.observe(_blinker.T, 1) is None
+        assert _detector.observe(_blinker, 2) is None
+
+    def test_hash_collisions_are_not_reported(self):
+        """Test a repeated hash of a different playfield is not taken for a cycle."""
+        _detector = CycleDetector()
+        _first = numpy.zeros((4, 4), dtype=numpy.uint8)
+        _second = _first.copy()
+        _second[1, 1] = 1
+        _detector.observe(_first, 0)
+        # a hasher whose keys are all zero gives every playfield the same hash
+        _detector._hasher._keys[...] = 0
+        for _generation, _field in enumerate((_second, _first, _second, _first, _second), 1):
+            assert _detector.observe(_field, _generation) is None
+        assert _detector.observe(_second, 6).period == 1
+
+    def test_playfield_detects_cycles_and_restarts_on_edits(self):
+        """Test Playfield.simulate reports the cycle and edits forget it."""
+        _playfield = Playfield((6, 6), (200, 200))
+        _playfield.detect_cycles()
+        for _x in range(1, 4):
+            _playfield.flip_cell(_x, 2)
+        for _ in range(3):
+            assert _playfield.simulate() is None
+        assert _playfield.simulate() == Cycle(0, 2)
+        _playfield.flip_cell(0, 0)
+        assert _playfield.cycle is None and _playfield.generation == 0
+
+    def test_run_skips_ahead_once_settled(self, tmp_path):
+        """Test a run stopping at a cycle reports the same populations and final field as a full run."""
+        _config = RunConfig(12, 12, 0.3, 14, 500, 'vectorized', 0, None, None)
+        _complete = run_simulation(_config)
+        _detected = run_simulation(_config._replace(detect_cycles=True, output=str(tmp_path), checkpoint_every=1000))
+        assert (_detected['cycle_start'], _detected['cycle_period']) == (69, 2)
+        assert _detected['populations'] == _complete['populations']
+        _snapshot = load_snapshot(latest_checkpoint(str(tmp_path), 'seed-14'))
+        _field = numpy.array(load_playfield(_config), dtype=numpy.uint8)
+        for _ in range(500):
+            _field = vectorized_simulation(_field)
+        assert _snapshot.generation == 500
+        assert unpack_playfield(_snapshot.field) == _field.tolist()
+
+
+class TestBenchmarkSuite:
+    """Test-suite for the benchmark suite."""
+
+    def test_suite_covers_the_matrix_and_round_trips_through_json(self, tmp_path):
+        """Test every case of the size and density matrix is timed, written and compared."""
+        _results = suite_benchmark(sizes=(8, 16), densities=(0.2, 0.5), rounds=3, max_time=1.0)
+        assert {(_result.name, _result.size, _result.density) for _result in _results} == \
+            {(_name, _size, _density) for _name in ('simulation', 'generate_seeded_playfield', 'serialize_playfield',
+                                                    'update_surface') for _size in (8, 16) for _density in (0.2, 0.5)}
+        assert all(0 < _result.minimum <= _result.median <= _result.maximum for _result in _results)
+        _filename = str(tmp_path / 'bench.json')
+        assert write_results(_results, _filename)
+        assert set(compare_results(_filename, _results).values()) == {1.0}
+
+
+class TestFrameProfiler:
+    """Test-suite for the ring buffers and per-phase profiling of Timer."""
+
+    def test_ring_buffer_keeps_the_latest_samples(self):
+        """Test a full ring buffer returns its latest samples oldest first."""
+        _buffer = RingBuffer(3)
+        for _value in range(5):
+            _buffer.append(_value)
+        assert len(_buffer) == 3
+        assert _buffer.values().tolist() == [2, 3, 4]
+
+    def test_phases_are_summed_per_frame(self):
+        """Test phase timings add up within a frame and frames are recorded with their generations."""
+        _timer = Timer(capacity=10, phases=('simulate', 'flip'))
+        for _ in range(2):
+            with _timer.phase('simulate'):
+                time.sleep(0.002)
+        _timer.frame(generations=4)
+        _timer.frame()
+        assert _timer.percentiles('simulate').p99 >= 0.004
+        assert _timer.percentiles('flip') == (0.0, 0.0, 0.0)
+        assert 0 < _timer.generations_per_second() <= 4 / 0.004
+        assert _timer.percentiles().p50 <= _timer.percentiles().p99
+
+    def test_csv_has_one_row_per_frame(self, tmp_path):
+        """Test the CSV dump holds a header and one row per recorded frame."""
+        _timer = Timer(capacity=2)
+        for _generations in range(3):
+            _timer.frame(_generations)
+        _filename = tmp_path / 'profile.csv'
+        assert _timer.to_csv(str(_filename))
+        _rows = _filename.read_text().splitlines()
+        assert _rows[0] == 'frame,frame_time,poll,simulate,update_surface,buttons,flip,generations'
+        assert [_row.split(',')[-1] for _row in _rows[1:]] == ['1', '2']
+
+
+class TestLifeLikeRules:
+    """Test-suite for B/S rule parsing and the rule generic engines."""
+
+    @pytest.mark.parametrize('_notation', ['B3/S23', 'b3/s23', 'S23/B3', '23/3', 'life', ' Life '])
+    def test_notations_of_conways_rule(self, _notation):
+        """Test every accepted spelling of B3/S23 parses to the same rule."""
+        assert parse_rule(_notation) == CONWAY
+        assert str(parse_rule(_notation)) == 'B3/S23'
+
+    @pytest.mark.parametrize('_notation', ['B9/S23', 'B3S23', 'B3/S2/3', 'conway', ''])
+    def test_invalid_notation_yields_value_error(self, _notation):
+        """Test malformed rules are rejected."""
+        with pytest.raises(ValueError):
+            parse_rule(_notation)
+
+    def test_tables(self):
+        """Test the transition and neighbourhood tables of B36/S23."""
+        _rule = parse_rule('B36/S23')
+        assert transition_table(_rule).tolist() == [[0, 0, 0, 1, 0, 0, 1, 0, 0], [0, 0, 1, 1, 0, 0, 0, 0, 0]]
+        # centre bit set plus two neighbours survives, centre bit clear with six neighbours is born
+        assert neighbourhood_table(_rule)[0b000010011] == 1
+        assert neighbourhood_table(_rule)[0b111001011] == 1
+        assert neighbourhood_table(_rule)[0b000010001] == 0
+
+    @pytest.mark.parametrize('_rule', [*RULES, 'B0/S8', 'B1357/S1357'])
+    def test_engines_agree(self, _rule):
+        """Test the dense, packed, active and sparse engines agree under the rule."""
+        _reference = _vectorized = _active = random_playfield(30, 70, 11)
+        _packed = pack_playfield(_reference)
+        _sparse = SparseField.from_playfield(_reference)
+        for _ in range(4):
+            _reference = simulation(_reference, _rule)
+            _vectorized = vectorized_simulation(_vectorized, _rule)
+            _active = get_engine('active')(_active, _rule)
+            _packed = packed_simulation(_packed, _rule)
+            assert _vectorized.tolist() == _reference
+            assert _active.tolist() == _reference
+            assert unpack_playfield(_packed) == _reference
+            if 0 not in parse_rule(_rule).birth:
+                _sparse.simulate(_rule)
+                assert _sparse.to_playfield() == _reference
+
+    def test_hashlife_under_highlife(self):
+        """Test HashLife follows the rule it was created with, the B36 replicator grows unlike under B3/S23."""
+        _playfield = generate_playfield(64, 64)
+        for _x, _y in ((31, 30), (32, 30), (33, 30), (30, 31), (33, 31), (29, 32), (33, 32), (29, 33), (32, 33),
+                       (29, 34), (31, 34)):
+            _playfield[_y][_x] = 1
+        _expected = _playfield
+        for _ in range(12):
+            _expected = simulation(_expected, 'highlife')
+        _universe = HashLife.from_playfield(_playfield, rule='highlife')
+        _universe.advance(12)
+        assert _universe.to_playfield(64, 64) == _expected
+
+    def test_unbounded_engines_reject_birth_without_neighbours(self):
+        """Test B0 rules can not run on an unbounded universe."""
+        with pytest.raises(ValueError):
+            HashLife(rule='B0/S8')
+        with pytest.raises(ValueError):
+            SparseField(cells=[(0, 0)]).simulate('B0/S8')
+
+    def test_playfield_and_runner_use_the_rule(self):
+        """Test Playfield.simulate and the headless runner step under the selected rule."""
+        _playfield = Playfield((5, 5), (200, 200), 'vectorized', 'seeds')
+        _playfield.flip_cell(1, 2)
+        _playfield.flip_cell(2, 2)
+        _playfield.simulate()
+        assert numpy.asarray(_playfield.field).tolist() == simulation(
+            [[0] * 5, [0] * 5, [0, 1, 1, 0, 0], [0] * 5, [0] * 5], 'B2/S')
+        _config = RunConfig(20, 20, 0.3, 1, 5, 'vectorized', 0, None, None, rule='daynight')
+        _statistics = run_simulation(_config)
+        _field = load_playfield(_config)
+        for _ in range(5):
+            _field = simulation(_field, 'B3678/S34678')
+        assert _statistics['rule'] == 'B3678/S34678'
+        assert _statistics['final_population'] == sum(map(sum, _field))
+
+
+class TestBoundaryModes:
+    """Test-suite for the dead, toroidal and reflective playfield edges."""
+
+    @pytest.mark.parametrize('_boundary', BOUNDARIES)
+    def test_ghost_cells_agree(self, _boundary):
+        """Test the list, array and halo row padding fill in the same ghost cells."""
+        _playfield = numpy.arange(20).reshape(4, 5)
+        _padded = pad_array(_playfield, _boundary)
+        assert pad_rows(_playfield.tolist(), _boundary) == _padded.tolist()
+        assert halo_rows(_playfield, 1, 3, _boundary).tolist() == _padded[1:5, 1:-1].tolist()
+        assert halo_rows(_playfield, 0, 4, _boundary).tolist() == _padded[:, 1:-1].tolist()
+
+    def test_unknown_boundary_yields_value_error(self):
+        """Test unknown boundary modes are rejected."""
+        with pytest.raises(ValueError):
+            simulation([[0, 1]], boundary='sphere')
+        with pytest.raises(ValueError):
+            vectorized_simulation([[0, 1]], boundary='sphere')
+
+    def test_glider_wraps_around_the_torus(self):
+        """Test a glider on a torus is back in place after four generations per cell of playfield width."""
+        _playfield = generate_playfield(8, 8)
+        for _x, _y in ((1, 0), (2, 1), (0, 2), (1, 2), (2, 2)):
+            _playfield[_y][_x] = 1
+        _field = _playfield
+        for _ in range(32):
+            _field = simulation(_field, boundary='torus')
+        assert _field == _playfield
+
+    @pytest.mark.parametrize('_boundary', ['torus', 'reflect'])
+    @pytest.mark.parametrize('_height,_width', [[1, 5], [2, 2], [9, 70], [40, 33]])
+    def test_engines_agree(self, _boundary, _height, _width):
+        """Test every bounded engine agrees with the reference engine across the edges."""
+        _reference = _vectorized = random_playfield(_height, _width, _width, 0.35)
+        _packed = pack_playfield(_reference)
+        _sparse = SparseField.from_playfield(_reference)
+        _active = ActiveRegionSimulation(_reference, tile_size=8, boundary=_boundary)
+        for _ in range(4):
+            _reference = simulation(_reference, boundary=_boundary)
+            _vectorized = vectorized_simulation(_vectorized, boundary=_boundary)
+            _packed = packed_simulation(_packed, _boundary=_boundary)
+            _sparse.simulate(boundary=_boundary)
+            _active.simulate()
+            assert _vectorized.tolist() == _reference
+            assert unpack_playfield(_packed) == _reference
+            assert _sparse.to_playfield() == _reference
+            assert _active.field.tolist() == _reference
+
+    def test_parallel_strips_see_across_the_edges(self):
+        """Test the strips at the top and bottom of the parallel engine take their halo from the boundary."""
+        _playfield = random_playfield(17, 23, 4)
+        with ParallelSimulation(17, 23, workers=3, boundary='torus') as _parallel:
+            _parallel.load(_playfield)
+            _parallel.simulate(3)
+            for _ in range(3):
+                _playfield = simulation(_playfield, boundary='torus')
+            assert _parallel.field.tolist() == _playfield
+
+    def test_unbounded_sparse_field_rejects_wrapping(self):
+        """Test an unbounded sparse field can not wrap around."""
+        with pytest.raises(ValueError):
+            SparseField(cells=[(0, 0)]).simulate(boundary='torus')
+
+    def test_playfield_uses_the_boundary(self):
+        """Test Playfield.simulate steps across the edges once a boundary is selected."""
+        _playfield = Playfield((5, 5), (200, 200))
+        _playfield.set_boundary('torus')
+        for _y in (4, 0, 1):
+            _playfield.flip_cell(0, _y)
+        _playfield.simulate()
+        assert [_row[4] for _row in numpy.asarray(_playfield.field).tolist()] == [1, 0, 0, 0, 0]
+
+
+class TestEnsemble:
+    """Test-suite for the batched ensemble simulation."""
+
+    def test_generated_ensemble_is_reproducible_with_exact_counts(self):
+        """Test every seeded field has the requested population and the same seed yields the same stack."""
+        _fields = generate_ensemble(20, 8, 9, 0.25, 4)
+        assert _fields.shape == (20, 8, 9)
+        assert numpy.count_nonzero(_fields, axis=(1, 2)).tolist() == [18] * 20
+        assert numpy.array_equal(_fields, generate_ensemble(20, 8, 9, 0.25, 4))
+        assert len({_field.tobytes() for _field in _fields}) == 20
+
+    @pytest.mark.parametrize('_boundary', BOUNDARIES)
+    def test_ensemble_agrees_with_single_fields(self, _boundary):
+        """Test stepping the stack gives the same fields as stepping each field on its own."""
+        _fields = generate_ensemble(6, 12, 10, 0.4, 1)
+        _ensemble = Ensemble(_fields, rule='highlife', boundary=_boundary)
+        _singles = list(_fields)
+        for _ in range(30):
+            _populations = _ensemble.step()
+            _singles = [vectorized_simulation(_field, 'highlife', _boundary) for _field in _singles]
+            assert numpy.array_equal(_ensemble.fields, numpy.stack(_singles))
+            assert _populations.tolist() == [int(_field.sum()) for _field in _singles]
+
+    def test_settled_fields_report_their_cycle(self):
+        """Test a block, a blinker and a glider settle as still life, oscillator and not at all."""
+        _fields = numpy.zeros((3, 8, 8), dtype=numpy.uint8)
+        _fields[0, 3:5, 3:5] = 1
+        _fields[1, 4, 2:5] = 1
+        for _x, _y in ((1, 0), (2, 1), (0, 2), (1, 2), (2, 2)):
+            _fields[2, _y, _x] = 1
+        _result = Ensemble(_fields, boundary='torus').run(10)
+        assert _result.generations == 10
+        assert _result.settled_at.tolist() == [0, 0, -1]
+        assert _result.periods.tolist() == [1, 2, 0]
+        assert _result.populations.shape == (11, 3)
+        assert _result.populations[:, :2].tolist() == [[4, 3]] * 11
+
+    def test_carried_cycles_match_a_full_simulation(self):
+        """Test oscillators no longer simulated stay in phase with stepping them."""
+        _fields = generate_ensemble(50, 16, 16, 0.3, 2)
+        _ensemble = Ensemble(_fields)
+        _result = _ensemble.run(150)
+        assert _result.settled_at.max() > 0 and (_result.periods == 2).any()
+        for _ in range(150):
+            _fields = vectorized_simulation(_fields)
+        assert numpy.array_equal(_ensemble.fields, _fields)
+
+    def test_invalid_ensembles_yield_value_error(self):
+        """Test a single playfield or an empty stack is rejected."""
+        with pytest.raises(ValueError):
+            Ensemble(numpy.zeros((4, 4)))
+        with pytest.raises(ValueError):
+            generate_ensemble(0, 4, 4, 0.5)
+
+
+class TestTimeBlocking:
+    """Test-suite for the time blocked simulation."""
+
+    @pytest.mark.parametrize('_boundary', BOUNDARIES)
+    @pytest.mark.parametrize('_height,_width,_tile_size', [[40, 33, 8], [23, 70, 16], [5, 300, 64], [64, 64, 32]])
+    def test_blocked_agrees_with_single_steps(self, _boundary, _height, _width, _tile_size):
+        """Test tiles advanced several generations per pass match stepping the playfield one generation at a time."""
+        _playfield = numpy.array(random_playfield(_height, _width, _height + _width, 0.35), dtype=numpy.uint8)
+        _expected = _playfield
+        for _generations in (1, 3, 11):
+            for _ in range(_generations):
+                _expected = vectorized_simulation(_expected, 'highlife', _boundary)
+            _playfield = blocked_simulation(_playfield, 'highlife', _boundary, _generations, _tile_size, depth=4)
+            assert numpy.array_equal(_playfield, _expected)
+
+    def test_halo_deeper_than_the_playfield(self):
+        """Test blocks deeper than small tiles and playfields still see the right ghost cells."""
+        _playfield = numpy.array(random_playfield(6, 9, 2), dtype=numpy.uint8)
+        for _boundary in BOUNDARIES:
+            _expected = _playfield
+            for _ in range(12):
+                _expected = vectorized_simulation(_expected, boundary=_boundary)
+            _blocked = blocked_simulation(_playfield, boundary=_boundary, generations=12, tile_size=2, depth=12)
+            assert numpy.array_equal(_blocked, _expected)
+
+    def test_invalid_arguments_yield_value_error(self):
+        """Test negative generations and empty tiles are rejected."""
+        with pytest.raises(ValueError):
+            blocked_simulation([[0, 1]], generations=-1)
+        with pytest.raises(ValueError):
+            blocked_simulation([[0, 1]], tile_size=0)
+        assert get_engine('blocked') is blocked_simulation
+
+    @pytest.mark.parametrize('_engine', ['reference', 'vectorized'])
+    def test_playfield_step_matches_simulate(self, _engine):
+        """Test Playfield.step of many generations matches as many simulate calls and keeps the field type."""
+        _stepped = Playfield((30, 20), (200, 200), engine=_engine)
+        _simulated = Playfield((30, 20), (200, 200), engine=_engine)
+        _simulated.field = _stepped.field = random_playfield(20, 30, 7)
+        if _engine == 'vectorized':
+            _simulated.field = _stepped.field = numpy.array(_stepped.field, dtype=numpy.uint8)
+        _stepped.step(25)
+        for _ in range(25):
+            _simulated.simulate()
+        assert type(_stepped.field) is type(_simulated.field)
+        assert numpy.asarray(_stepped.field).tolist() == numpy.asarray(_simulated.field).tolist()
+        assert _stepped.generation == _simulated.generation == 25
+
+    def test_playfield_step_feeds_the_cycle_detector(self):
+        """Test Playfield.step still shows every generation to the cycle detector."""
+        _playfield = Playfield((6, 6), (200, 200))
+        _playfield.detect_cycles()
+        for _x in range(1, 4):
+            _playfield.flip_cell(_x, 2)
+        assert _playfield.step(5) == Cycle(0, 2)
+
+
+class TestDoubleBuffering:
+    """Test-suite for stepping the playfield in place between two buffers."""
+
+    @pytest.mark.parametrize('_boundary', BOUNDARIES)
+    @pytest.mark.parametrize('_rule', ['life', 'highlife', 'daynight', 'seeds', 'B0/S8'])
+    @pytest.mark.parametrize('_height,_width', [[1, 7], [3, 2], [23, 41]])
+    def test_in_place_engine_agrees(self, _boundary, _rule, _height, _width):
+        """Test the in place engine writes the same generation the allocating one returns."""
+        _playfield = numpy.array(random_playfield(_height, _width, _width), dtype=numpy.uint8)
+        _out = numpy.full_like(_playfield, 7)
+        _buffers = StepBuffers(_height, _width)
+        for _ in range(3):
+            _expected = vectorized_simulation(_playfield, _rule, _boundary)
+            assert vectorized_simulation_into(_playfield, _out, _buffers, _rule, _boundary) is _out
+            assert numpy.array_equal(_out, _expected)
+            _playfield, _out = _out, _playfield
+
+    def test_steady_state_stepping_does_not_allocate(self):
+        """Test stepping a warmed up playfield allocates nothing near the size of a buffer."""
+        _playfield = Playfield((200, 200), (300, 300), rule='highlife', boundary='torus')
+        _playfield.randomize(0.3)
+        _buffers = (id(_playfield.field), id(_playfield._back))
+        _playfield.simulate()
+        tracemalloc.start()
+        try:
+            _before = tracemalloc.get_traced_memory()[0]
+            for _ in range(20):
+                _playfield.simulate()
+            _stepping = tracemalloc.get_traced_memory()[1] - _before
+            tracemalloc.reset_peak()
+            _before = tracemalloc.get_traced_memory()[0]
+            vectorized_simulation(_playfield.field)
+            _allocating = tracemalloc.get_traced_memory()[1] - _before
+        finally:
+            tracemalloc.stop()
+        # a single allocating step is seen by tracemalloc, stepping in place stays below the size of one buffer row
+        assert _allocating > 200 * 200
+        assert _stepping < 200 * 10
+        assert {id(_playfield.field), id(_playfield._back)} == set(_buffers)
+
+    def test_edits_keep_the_buffers(self):
+        """Test assigning, clearing and flipping reuse the front buffer and resizing replaces it."""
+        _playfield = Playfield((8, 6), (200, 200))
+        _front = _playfield.field
+        _playfield.field = random_playfield(6, 8, 3)
+        assert _playfield.field is _front and _front.tolist() == random_playfield(6, 8, 3)
+        _playfield.flip_cell(0, 0)
+        _playfield.clear()
+        assert _playfield.field is _front and not _front.any()
+        _playfield.resize(10, 12)
+        assert _playfield.field.shape == (12, 10) and _playfield._back.shape == (12, 10)
+
+    def test_assigning_another_size_resizes(self):
+        """Test a field of another size resizes the playfield and its view and restarts the generation count."""
+        _playfield = Playfield((10, 10), (420, 420))
+        _playfield.detect_cycles()
+        _playfield.simulate()
+        _playfield.field = numpy.ones((20, 30), dtype=numpy.uint8)
+        assert tuple(_playfield.get_size()) == (30, 20)
+        assert (_playfield.viewport.field_width, _playfield.viewport.field_height) == (30, 20)
+        assert _playfield._back.shape == (20, 30) and _playfield._drawn is None
+        assert _playfield.generation == 0 and _playfield.cycle is None
+        _playfield.randomize()
+        assert _playfield.field.shape == (20, 30)
+
+
+class TestViewport:
+    """Test-suite for panning and zooming large playfields."""
+
+    def test_small_playfields_fit_as_before(self):
+        """Test a playfield smaller than the view keeps whole pixel cells at the top left corner."""
+        _viewport = Viewport(20, 10, 400, 400)
+        assert (_viewport.cell_size, _viewport.level) == (20, 0)
+        assert _viewport.view() == View(0, 0, 20, 10, 20, 0, 0, 0)
+        assert _viewport.cell_at(39, 199) == (1, 9) and _viewport.cell_at(0, 200) is None
+
+    @pytest.mark.parametrize('_size,_level', [[400, 0], [401, 1], [800, 1], [1000, 2], [100000, 8]])
+    def test_large_playfields_fit_zoomed_out(self, _size, _level):
+        """Test playfields larger than the view fit at the smallest sufficient level of the mipmap."""
+        _viewport = Viewport(_size, 3, 400, 400)
+        assert _viewport.level == _level
+        assert -(-_size >> _level) <= 400
+
+    def test_zoom_keeps_the_cell_under_the_pointer(self):
+        """Test zooming in and out at a pixel leaves the cell under it in place."""
+        _viewport = Viewport(4000, 4000, 400, 400)
+        _viewport.zoom(4, 200, 200)
+        assert (_viewport.cell_size, _viewport.level) == (1, 0)
+        _cell = _viewport.cell_at(123, 321)
+        for _steps in (1, 2, -2, 3):
+            _viewport.zoom(_steps, 123, 321)
+            assert _viewport.cell_at(123, 321) == _cell
+        assert _viewport.cell_size == 16
+        _view = _viewport.view()
+        assert {_view.x1 - _view.x0, _view.y1 - _view.y0} <= {25, 26}
+
+    def test_pan_stays_on_the_playfield(self):
+        """Test panning moves the view by whole pixels and stops at the playfield edges."""
+        _viewport = Viewport(1000, 1000, 400, 400)
+        _viewport.zoom(4)
+        _left = _viewport.left
+        _viewport.pan(-40, 0)
+        assert _viewport.left == _left + 40 / _viewport.cell_size
+        _viewport.pan(10 ** 6, 10 ** 6)
+        assert (_viewport.left, _viewport.top) == (0.0, 0.0)
+        _viewport.pan(-10 ** 6, -10 ** 6)
+        assert _viewport.view()[2:4] == (1000, 1000)
+        _viewport.fit()
+        assert (_viewport.left, _viewport.top, _viewport.level) == (0.0, 0.0, 2)
+
+    def test_cell_rect_and_cell_at_agree(self):
+        """Test the pixel rectangle of a cell maps back to that cell with a fractional view offset."""
+        _viewport = Viewport(300, 300, 200, 200)
+        _viewport.zoom(3)
+        _viewport.pan(-13, -7)
+        _view = _viewport.view()
+        for _x, _y in ((_view.x0 + 1, _view.y0 + 2), (_view.x0 + 20, _view.y0 + 31)):
+            _rect = _viewport.cell_rect(_x, _y)
+            assert _viewport.cell_at(_rect[0], _rect[1]) == (_x, _y)
+            assert _viewport.cell_at(_rect[0] + _rect[2] - 1, _rect[1] + _rect[3] - 1) == (_x, _y)
+
+    def test_density_mipmap(self):
+        """Test every block reports its share of live cells, partial blocks counting missing cells as dead."""
+        _field = numpy.zeros((5, 6), dtype=numpy.uint8)
+        _field[0:2, 0:2] = 1
+        _field[4, 5] = 1
+        assert density_mipmap(_field, 0).tolist() == _field.tolist()
+        assert density_mipmap(_field, 1).tolist() == [[1.0, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, 0.25]]
+        assert density_mipmap(_field, 3).tolist() == [[5 / 64]]
+
+    def test_million_cell_playfield_draws_only_the_visible_cells(self):
+        """Test a playfield far larger than the surface renders zoomed out and zoomed in from the visible cells."""
+        _playfield = Playfield((1000, 1000), (420, 420))
+        _playfield.field[::2, ::2] = 1
+        assert _playfield.cell_size == 0 and _playfield.viewport.level == 2
+        assert _playfield.update_surface() == [_playfield.surface.get_rect()]
+        assert _playfield._drawn.shape == (1000, 1000)
+        assert _playfield.surface.get_at((10, 10))[:3] == (0, 0, 64 + 191 // 4)
+        _playfield.flip_cell(999, 999)
+        assert _playfield.update_surface() == [pygame.Rect(0, 0, 250, 250)]
+        _playfield.viewport.zoom(5, 200, 200)
+        assert _playfield.cell_size == 8
+        assert _playfield.update_surface() == [_playfield.surface.get_rect()]
+        assert _playfield._drawn.size <= 51 * 51
+        _x, _y = _playfield.viewport.view()[:2]
+        _playfield.flip_cell(_x + 1, _y + 1)
+        _rect = pygame.Rect(_playfield.viewport.cell_rect(_x + 1, _y + 1))
+        assert _playfield.update_surface() == [_rect]
+        assert _playfield.surface.get_at(_rect.center)[:3] == (0, 0, 0)
+
+    def test_resize_is_no_longer_capped(self):
+        """Test playfields larger than 100 cells a side can be created."""
+        _playfield = Playfield((10, 10), (220, 220))
+        _playfield.resize(2048, 512)
+        assert _playfield.field.shape == (512, 2048) and _playfield.viewport.level == 4
+
+
+class TestGuiWidgets:
+    """Test-suite for the cached button and label surfaces of the GUI."""
+
+    def test_surface_cache_evicts_least_recently_used(self):
+        """Test the cache renders each key once and drops the entry used longest ago once full."""
+        _cache = SurfaceCache(2)
+        _rendered = []
+        _render = (lambda _key: lambda: _rendered.append(_key) or _key)
+        assert _cache.get('a', _render('a')) == 'a'
+        assert _cache.get('b', _render('b')) == 'b'
+        assert _cache.get('a', _render('a')) == 'a'
+        _cache.get('c', _render('c'))
+        assert len(_cache) == 2 and 'a' in _cache and 'b' not in _cache
+        assert _rendered == ['a', 'b', 'c']
+        assert (_cache.hits, _cache.misses) == (1, 3)
+        with pytest.raises(ValueError):
+            SurfaceCache(0)
+
+    def test_buttons_render_once_per_look(self):
+        """Test drawing the same button again reuses its surfaces and a different look renders new ones."""
+        _gui = GUI('test', (640, 480), 60)
+        _button = _gui.add_button('Clear', colours.white, 10, 10, hover_colour=colours.medium_grey)
+        assert _gui.add_button('Clear', colours.white, 10, 60, hover_colour=colours.medium_grey).surface \
+            is _button.surface
+        assert _gui.add_button('Clear', colours.white, 10, 60).surface is not _button.surface
+        assert (_gui.surface_cache.hits, _gui.surface_cache.misses) == (1, 2)
+        assert _button.rect == pygame.Rect(10, 10, 420, 40)
+        assert _gui.window.get_at((10, 10))[:3] == colours.white
+
+    def test_label_draws_only_changed_text(self):
+        """Test a label is drawn on its first frame, again only for a new text or when forced."""
+        _gui = GUI('test', (640, 480), 60)
+        _label = Label(_gui, colours.white, 10, 10, 200, 40)
+        assert _label.draw('FPS: 60.0') == pygame.Rect(10, 10, 200, 40)
+        assert _label.draw('FPS: 60.0') is None
+        assert _label.draw('FPS: 59.9') == pygame.Rect(10, 10, 200, 40)
+        assert _label.draw('FPS: 59.9', force=True) == pygame.Rect(10, 10, 200, 40)
+        assert _gui.surface_cache.misses == 2
+
+
+class TestIdleWaiting:
+    """Test-suite for sleeping on input while the game is idle."""
+
+    def test_wait_times_out_without_input(self):
+        """Test waiting returns False after the timeout when no event arrives."""
+        _handler = InputHandler()
+        pygame.event.clear()
+        _start = time.perf_counter()
+        assert not _handler.wait(0.05)
+        assert time.perf_counter() - _start >= 0.04
+        assert _handler.poll().events == 0
+
+    def test_event_waited_for_is_handled_by_the_next_poll(self):
+        """Test the event ending a wait is not lost but handled by the following poll."""
+        _handler = InputHandler()
+        pygame.event.clear()
+        pygame.event.post(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=2))
+        assert _handler.wait(1.0)
+        _result = _handler.poll()
+        assert _result.events == 1 and _result.wheel == 2
+        assert _handler.poll().events == 0
+
+    def test_exposing_the_window_is_reported(self):
+        """Test uncovering or restoring the window is reported so the main loop draws everything again."""
+        _handler = InputHandler()
+        pygame.event.clear()
+        assert not _handler.poll().exposed
+        pygame.event.post(pygame.event.Event(pygame.WINDOWEXPOSED))
+        assert _handler.wait(1.0)
+        assert _handler.poll().exposed
+
+    def test_wake_does_not_count_the_time_slept(self):
+        """Test a frame after sleeping idle is neither skipped as slow nor profiled with the time slept."""
+        _timer = Timer(capacity=4)
+        time.sleep(0.05)
+        _timer.wake()
+        assert not _timer.poll(0.02)
+        _timer.frame()
+        assert _timer.percentiles().p99 < 0.05